@@ -0,0 +1,32 @@
+"""
+Benchmarks de Fractales
+Mide cada generador en vistas canónicas y detecta regresiones frente a una línea base
+
+Uso: ``python -m benchmarks run`` y ``python -m benchmarks compare``.
+"""
+
+from .cases import BenchmarkCase, BenchmarkResources, available_backends, build_cases
+from .compare import (
+    DEFAULT_THRESHOLD,
+    compare_results,
+    format_comparison,
+    has_regressions,
+    machine_differences
+)
+from .runner import load_results, run_suite, save_results, time_case
+
+__all__ = [
+    'BenchmarkCase',
+    'BenchmarkResources',
+    'available_backends',
+    'build_cases',
+    'DEFAULT_THRESHOLD',
+    'compare_results',
+    'format_comparison',
+    'has_regressions',
+    'machine_differences',
+    'load_results',
+    'run_suite',
+    'save_results',
+    'time_case'
+]
@@ -0,0 +1,141 @@
+"""
+Línea de Comandos de los Benchmarks
+python -m benchmarks {list,run,compare}
+"""
+
+import argparse
+import sys
+
+from .cases import BenchmarkResources, available_backends, build_cases
+from .compare import (
+    DEFAULT_THRESHOLD,
+    METRICS,
+    compare_results,
+    format_comparison,
+    format_ms,
+    has_regressions,
+    machine_differences
+)
+from .runner import (
+    DEFAULT_REPEAT,
+    baseline_path,
+    default_results_path,
+    latest_results,
+    load_results,
+    run_suite,
+    save_results
+)
+
+DEFAULT_BASELINE = "referencia"
+
+
+def build_parser():
+    """Crea el analizador de argumentos."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mide los generadores de fractales y detecta regresiones"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Muestra los casos disponibles")
+    list_parser.add_argument("-k", "--filter", default="*",
+                             help="Patrón de nombres de caso (p. ej. 'julia/*/cpu')")
+
+    run_parser = commands.add_parser("run", help="Ejecuta los casos y guarda los resultados")
+    run_parser.add_argument("-k", "--filter", default="*",
+                            help="Patrón de nombres de caso (p. ej. 'julia/*/cpu')")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                            help="Mediciones por caso (tras una de calentamiento)")
+    run_parser.add_argument("--backends", default=None,
+                            help="Backends separados por comas (por defecto, todos los disponibles)")
+    run_parser.add_argument("-o", "--output", default=None,
+                            help="Archivo JSON de resultados (por defecto, en benchmarks/results/)")
+    run_parser.add_argument("--save-baseline", metavar="NOMBRE", default=None,
+                            help="Guarda además los resultados como línea base")
+    run_parser.add_argument("--compare", metavar="NOMBRE", nargs="?", const=DEFAULT_BASELINE,
+                            default=None, help="Compara al terminar con una línea base")
+    _add_comparison_options(run_parser)
+
+    compare_parser = commands.add_parser("compare", help="Compara resultados con una línea base")
+    compare_parser.add_argument("results", nargs="?", default=None,
+                                help="Resultados a comparar (por defecto, los más recientes)")
+    compare_parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                                help="Nombre de la línea base o ruta a un JSON")
+    _add_comparison_options(compare_parser)
+    return parser
+
+
+def _add_comparison_options(parser):
+    """Opciones comunes de la comparación."""
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Aumento relativo que cuenta como regresión (0.1 = 10%%)")
+    parser.add_argument("--metric", choices=METRICS, default="median",
+                        help="Estadístico que se compara")
+
+
+def print_progress(index, total, name, result):
+    """Muestra el resultado de cada caso según termina."""
+    if 'error' in result:
+        print(f"[{index}/{total}] {name}: ❌ {result['error']}")
+    else:
+        print(f"[{index}/{total}] {name}: {format_ms(result['median'])} "
+              f"(mín. {format_ms(result['min'])})")
+
+
+def list_cases(args):
+    """Comando ``list``."""
+    from fnmatch import fnmatch
+
+    backends = available_backends()
+    print(f"Backends disponibles: {', '.join(backends)}")
+    for case in build_cases(BenchmarkResources(), backends):
+        if fnmatch(case.name, args.filter):
+            print(case.name)
+    return 0
+
+
+def run(args):
+    """Comando ``run``."""
+    backends = args.backends.split(",") if args.backends else None
+    results = run_suite(args.filter, args.repeat, backends, progress=print_progress)
+    path = save_results(results, args.output or default_results_path(results))
+    print(f"Resultados guardados en {path}")
+    if args.save_baseline:
+        print(f"Línea base guardada en {save_results(results, baseline_path(args.save_baseline))}")
+    if args.compare:
+        return report_comparison(load_results(baseline_path(args.compare)), results, args)
+    return 0
+
+
+def compare(args):
+    """Comando ``compare``."""
+    path = args.results or latest_results()
+    if path is None:
+        print("No hay resultados: ejecuta antes 'python -m benchmarks run'")
+        return 2
+    print(f"Comparando {path} con {baseline_path(args.baseline)}")
+    return report_comparison(load_results(baseline_path(args.baseline)), load_results(path), args)
+
+
+def report_comparison(baseline, current, args):
+    """Muestra la comparación; devuelve 1 si hay regresiones."""
+    for key, old, new in machine_differences(baseline, current):
+        print(f"⚠️ La máquina difiere de la línea base ({key}: {old} → {new})")
+    rows = compare_results(baseline, current, args.threshold, args.metric)
+    print(format_comparison(rows, args.threshold))
+    return 1 if has_regressions(rows) else 0
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    args = build_parser().parse_args(argv)
+    commands = {"list": list_cases, "run": run, "compare": compare}
+    try:
+        return commands[args.command](args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
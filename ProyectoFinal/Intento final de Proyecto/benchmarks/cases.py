@@ -0,0 +1,215 @@
+"""
+Casos de Benchmark
+Vistas canónicas de cada generador en cada backend disponible
+"""
+
+import os
+
+# Tamaño de las vistas de tiempo de escape
+VIEW_WIDTH = 800
+VIEW_HEIGHT = 600
+
+# Vistas canónicas de Mandelbrot: nombre -> (zoom, offset_x, offset_y, max_iter)
+MANDELBROT_VIEWS = {
+    "vista_general": (200.0, -0.5, 0.0, 256),
+    "valle_caballitos": (40000.0, -0.7453, 0.1127, 1000),
+}
+
+# Vista de los presets de Julia
+JULIA_VIEW = (250.0, 0.0, 0.0, 256)
+
+# Niveles de los fractales geométricos
+KOCH_LEVELS = (2, 4, 6)
+SIERPINSKI_LEVELS = (3, 5, 7)
+TREE_LEVELS = (6, 9, 12)
+
+
+class BenchmarkCase:
+    """Un caso del benchmark: un fractal, una vista o nivel y un backend.
+
+    ``setup()`` prepara el caso (fuera del tiempo medido) y devuelve la
+    función sin argumentos que se cronometra.
+    """
+
+    def __init__(self, fractal, view, backend, setup):
+        self.fractal = fractal
+        self.view = view
+        self.backend = backend
+        self.setup = setup
+
+    @property
+    def name(self):
+        """Identificador estable del caso (clave en los resultados)."""
+        return f"{self.fractal}/{self.view}/{self.backend}"
+
+    def __repr__(self):
+        return f"BenchmarkCase({self.name!r})"
+
+
+class BenchmarkResources:
+    """Recursos compartidos entre casos: pool de teselas, aplicación y ventanas Qt."""
+
+    def __init__(self):
+        self._tiled_renderer = None
+        self._app = None
+        self._windows = {}
+
+    def tiled_renderer(self):
+        """Renderizador por teselas en procesos (se arranca una sola vez)."""
+        if self._tiled_renderer is None:
+            from fractales.generators import TiledRenderer
+            self._tiled_renderer = TiledRenderer().start()
+        return self._tiled_renderer
+
+    def window(self, window_class):
+        """Ventana de la aplicación (una por clase), creada sin mostrarse."""
+        if window_class not in self._windows:
+            if self._app is None:
+                os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+                from PyQt6.QtWidgets import QApplication
+                self._app = QApplication.instance() or QApplication([])
+            self._windows[window_class] = window_class()
+        return self._windows[window_class]
+
+    def close(self):
+        """Libera el pool de procesos y las ventanas."""
+        if self._tiled_renderer is not None:
+            self._tiled_renderer.shutdown()
+            self._tiled_renderer = None
+        for window in self._windows.values():
+            window.close()
+        self._windows = {}
+
+
+def available_backends():
+    """Backends utilizables en esta máquina."""
+    from fractales.generators import cuda_available
+
+    backends = ["cpu", "tiled"]
+    if cuda_available():
+        backends.append("cuda")
+    try:
+        import PyQt6.QtWidgets  # noqa: F401
+        backends.append("qt")
+    except ImportError:
+        pass
+    return backends
+
+
+def build_cases(resources, backends=None):
+    """Devuelve todos los casos para los backends indicados (por defecto, los disponibles)."""
+    from fractales.generators import JULIA_PRESETS
+
+    backends = available_backends() if backends is None else backends
+    cases = []
+
+    # Fractales de tiempo de escape: campo de iteraciones + coloreado
+    escape_views = [("mandelbrot", name, None, view) for name, view in MANDELBROT_VIEWS.items()]
+    escape_views += [("julia", _slug(name), c, JULIA_VIEW) for name, c in JULIA_PRESETS.items()]
+    for fractal, view_name, c, view in escape_views:
+        for backend in ("cpu", "cuda", "tiled"):
+            if backend in backends:
+                cases.append(BenchmarkCase(fractal, view_name, backend,
+                                           _escape_time_setup(resources, fractal, c, view, backend)))
+
+    # Fractales geométricos
+    for level in SIERPINSKI_LEVELS:
+        if "cpu" in backends:
+            cases.append(BenchmarkCase("sierpinski", f"nivel_{level}", "cpu",
+                                       _sierpinski_generator_setup(level)))
+        if "qt" in backends:
+            cases.append(BenchmarkCase("sierpinski", f"nivel_{level}", "qt",
+                                       _sierpinski_window_setup(resources, level)))
+    for level in KOCH_LEVELS:
+        if "cpu" in backends:
+            cases.append(BenchmarkCase("koch", f"nivel_{level}", "cpu", _koch_curve_setup(level)))
+        if "qt" in backends:
+            cases.append(BenchmarkCase("koch", f"nivel_{level}", "qt",
+                                       _slider_window_setup(resources, "KochMainWindow", level)))
+    if "qt" in backends:
+        for level in TREE_LEVELS:
+            cases.append(BenchmarkCase("arbol", f"nivel_{level}", "qt",
+                                       _slider_window_setup(resources, "TreeMainWindow", level)))
+    return cases
+
+
+def _slug(name):
+    """Nombre de preset apto para una clave ("Clásico" -> "clasico")."""
+    import unicodedata
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return ascii_name.lower().replace(" ", "_")
+
+
+def _escape_time_setup(resources, fractal, c, view, backend):
+    """Prepara el render de una vista de Mandelbrot o Julia."""
+    def setup():
+        from fractales.generators import JuliaGenerator, MandelbrotGenerator
+
+        zoom, offset_x, offset_y, max_iter = view
+        if c is None:
+            generator = MandelbrotGenerator()
+        else:
+            generator = JuliaGenerator()
+            generator.set_julia_constant(*c)
+        generator.set_max_iterations(max_iter)
+
+        if backend == "cuda":
+            return lambda: generator.generate_fractal(VIEW_WIDTH, VIEW_HEIGHT,
+                                                      zoom, offset_x, offset_y)
+        if backend == "tiled":
+            renderer = resources.tiled_renderer()
+            return lambda: renderer.render(generator, VIEW_WIDTH, VIEW_HEIGHT,
+                                           zoom, offset_x, offset_y)
+        # CPU: los mismos kernels numba que usa el render sin CUDA
+        return lambda: generator.colorize_field(
+            generator.compute_field(VIEW_WIDTH, VIEW_HEIGHT, zoom, offset_x, offset_y))
+    return setup
+
+
+def _sierpinski_generator_setup(level):
+    """Prepara el triángulo de Sierpinski rasterizado por ``KochGenerator``."""
+    def setup():
+        from fractales.generators import KochGenerator
+
+        generator = KochGenerator()
+        generator.set_koch_type(6)
+        generator.set_iterations(level)
+        return lambda: generator.generate_fractal(VIEW_WIDTH, VIEW_HEIGHT)
+    return setup
+
+
+def _koch_curve_setup(level):
+    """Prepara la geometría de la curva de Koch de ``KochGenerator``."""
+    def setup():
+        from fractales.generators import KochGenerator
+
+        generator = KochGenerator()
+        return lambda: generator.generate_koch_curve(level)
+    return setup
+
+
+def _sierpinski_window_setup(resources, level):
+    """Prepara un cuadro de la ventana de Sierpinski navegable."""
+    def setup():
+        from fractales.interfaces.sierpinski_navegable import SierpinskiNavigableWindow
+
+        window = resources.window(SierpinskiNavigableWindow)
+        window.zoom_level = 1.0
+        window.base_level = level
+        return window.generate_fractal
+    return setup
+
+
+def _slider_window_setup(resources, class_name, level):
+    """Prepara un cuadro de una ventana cuyo nivel se elige con ``level_slider``."""
+    def setup():
+        from fractales.interfaces import ventanas_fractales
+
+        window = resources.window(getattr(ventanas_fractales, class_name))
+        # Sin señales: mover el deslizador marcaría el cuadro como interactivo
+        window.level_slider.blockSignals(True)
+        window.level_slider.setValue(level)
+        window.level_slider.blockSignals(False)
+        window.frame_scheduler.interactive = False
+        return window.generate_fractal
+    return setup
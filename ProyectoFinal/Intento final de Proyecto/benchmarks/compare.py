@@ -0,0 +1,108 @@
+"""
+Comparación de Benchmarks
+Detecta regresiones de tiempo entre unos resultados y una línea base
+"""
+
+from collections import namedtuple
+from fnmatch import fnmatch
+
+# Aumento relativo del tiempo a partir del cual un caso es una regresión
+DEFAULT_THRESHOLD = 0.10
+METRICS = ("min", "median", "mean")
+
+# Estado de cada caso
+REGRESSION = "regresión"
+IMPROVEMENT = "mejora"
+UNCHANGED = "igual"
+NEW = "nuevo"
+MISSING = "ausente"
+FAILED = "error"
+
+# Datos de la máquina que hacen poco comparables dos resultados si cambian
+_MACHINE_KEYS = ("host", "platform", "processor", "cpu_count", "python",
+                 "numpy", "numba", "cuda_device")
+
+ComparisonRow = namedtuple("ComparisonRow", "name baseline current ratio status")
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, metric="median"):
+    """Compara caso a caso y devuelve una lista de ``ComparisonRow``.
+
+    ``ratio`` es tiempo actual / tiempo base; por encima de ``1 + threshold``
+    el caso es una regresión y por debajo de ``1 / (1 + threshold)`` una
+    mejora. Los casos que solo están en uno de los dos resultados (por
+    ejemplo, un backend que no existe en esta máquina) no se comparan; si
+    ``current`` se ejecutó con un filtro, solo se listan los casos de la
+    línea base que lo cumplen.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Métrica desconocida: {metric}")
+    pattern = current.get('settings', {}).get('pattern', "*")
+    base_results = {name: result for name, result in baseline['results'].items()
+                    if fnmatch(name, pattern)}
+    current_results = current['results']
+    rows = []
+    for name in sorted(set(base_results) | set(current_results)):
+        base = base_results.get(name)
+        new = current_results.get(name)
+        base_time = base.get(metric) if base else None
+        new_time = new.get(metric) if new else None
+        if new is None:
+            status, ratio = MISSING, None
+        elif 'error' in new:
+            status, ratio = FAILED, None
+        elif base is None or base_time is None:
+            status, ratio = NEW, None
+        else:
+            ratio = new_time / base_time if base_time > 0 else float("inf")
+            if ratio > 1 + threshold:
+                status = REGRESSION
+            elif ratio < 1 / (1 + threshold):
+                status = IMPROVEMENT
+            else:
+                status = UNCHANGED
+        rows.append(ComparisonRow(name, base_time, new_time, ratio, status))
+    return rows
+
+
+def has_regressions(rows):
+    """Indica si algún caso empeoró o dejó de funcionar."""
+    return any(row.status in (REGRESSION, FAILED) for row in rows)
+
+
+def machine_differences(baseline, current):
+    """Devuelve ``[(dato, base, actual)]`` de los datos de la máquina que cambiaron."""
+    base = baseline['metadata']
+    new = current['metadata']
+    return [(key, base.get(key), new.get(key)) for key in _MACHINE_KEYS
+            if base.get(key) != new.get(key)]
+
+
+def format_comparison(rows, threshold=DEFAULT_THRESHOLD):
+    """Tabla de texto con la comparación y un resumen final."""
+    width = max([len(row.name) for row in rows] + [4])
+    lines = [f"{'Caso':<{width}}  {'Base':>10}  {'Actual':>10}  {'Cambio':>8}  Estado"]
+    for row in rows:
+        change = f"{(row.ratio - 1) * 100:+.1f}%" if row.ratio is not None else "-"
+        marker = "❌ " if row.status in (REGRESSION, FAILED) else "✅ " if row.status == IMPROVEMENT else ""
+        lines.append(f"{row.name:<{width}}  {format_ms(row.baseline):>10}  "
+                     f"{format_ms(row.current):>10}  {change:>8}  {marker}{row.status}")
+
+    counts = {}
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + 1
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    lines.append(f"Umbral: {threshold * 100:.0f}% — {summary}")
+    return "\n".join(lines)
+
+
+def format_ms(seconds):
+    """Tiempo en milisegundos con precisión legible también para casos muy rápidos."""
+    if seconds is None:
+        return "-"
+    ms = seconds * 1000
+    if ms >= 100:
+        return f"{ms:.0f} ms"
+    if ms >= 1:
+        return f"{ms:.1f} ms"
+    return f"{ms:.3f} ms"
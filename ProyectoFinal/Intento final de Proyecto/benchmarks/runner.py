@@ -0,0 +1,166 @@
+"""
+Ejecución de Benchmarks
+Cronometra los casos y guarda los resultados en JSON con los datos de la máquina
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+
+from .cases import BenchmarkResources, available_backends, build_cases
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINES_DIR = BENCHMARKS_DIR / "baselines"
+
+# Versión del formato de los archivos de resultados
+RESULTS_FORMAT = 1
+
+DEFAULT_REPEAT = 5
+
+# Duración mínima de cada medición: los casos muy rápidos se repiten en bucle
+MIN_SAMPLE_TIME = 0.02
+
+
+def machine_metadata(backends):
+    """Describe la máquina y el software con que se midió."""
+    metadata = {
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'backends': list(backends),
+        'commit': _git_commit(),
+    }
+    for key, module, attribute in (("numpy", "numpy", "__version__"),
+                                   ("numba", "numba", "__version__"),
+                                   ("pyqt6", "PyQt6.QtCore", "PYQT_VERSION_STR")):
+        metadata[key] = _module_version(module, attribute)
+    if "cuda" in backends:
+        from numba import cuda
+        name = cuda.get_current_device().name
+        metadata['cuda_device'] = name.decode() if isinstance(name, bytes) else name
+    return metadata
+
+
+def _module_version(module, attribute):
+    """Versión de un módulo instalado (o None si no lo está)."""
+    try:
+        return getattr(importlib.import_module(module), attribute)
+    except ImportError:
+        return None
+
+
+def _git_commit():
+    """Commit actual del proyecto (o None fuera de git)."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def time_case(function, repeat=DEFAULT_REPEAT):
+    """Cronometra ``function`` en ``repeat`` mediciones tras una de calentamiento.
+
+    El calentamiento absorbe la compilación JIT, el arranque de procesos y
+    el primer pintado de Qt, que no forman parte del coste por cuadro. Si
+    una llamada dura menos de ``MIN_SAMPLE_TIME`` cada medición encadena
+    varias y se divide entre ellas. Los tiempos son segundos por llamada.
+    """
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    loops = 1
+    while elapsed * loops < MIN_SAMPLE_TIME:
+        loops *= 2
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        times.append((time.perf_counter() - start) / loops)
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'loops': loops,
+        'runs': times,
+    }
+
+
+def run_suite(pattern="*", repeat=DEFAULT_REPEAT, backends=None, progress=print):
+    """Ejecuta los casos cuyo nombre coincide con ``pattern`` y devuelve los resultados."""
+    backends = available_backends() if backends is None else backends
+    resources = BenchmarkResources()
+    results = {}
+    try:
+        cases = [case for case in build_cases(resources, backends) if fnmatch(case.name, pattern)]
+        for index, case in enumerate(cases, 1):
+            try:
+                # Algunas ventanas informan de cada cuadro por consola
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results[case.name] = time_case(case.setup(), repeat)
+            except Exception as e:
+                results[case.name] = {'error': f"{type(e).__name__}: {e}"}
+            if progress is not None:
+                progress(index, len(cases), case.name, results[case.name])
+    finally:
+        resources.close()
+    return {
+        'format': RESULTS_FORMAT,
+        'metadata': machine_metadata(backends),
+        'settings': {'repeat': repeat, 'pattern': pattern},
+        'results': results,
+    }
+
+
+def default_results_path(results):
+    """Ruta por defecto de unos resultados: ``results/<fecha>-<máquina>.json``."""
+    metadata = results['metadata']
+    stamp = metadata['timestamp'].replace(":", "").replace("-", "")
+    return RESULTS_DIR / f"{stamp}-{metadata['host'] or 'maquina'}.json"
+
+
+def baseline_path(name):
+    """Ruta de una línea base por nombre (o la ruta tal cual si ya es un archivo)."""
+    path = Path(name)
+    if path.suffix == ".json":
+        return path
+    return BASELINES_DIR / f"{name}.json"
+
+
+def save_results(results, path):
+    """Guarda unos resultados en JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def load_results(path):
+    """Carga unos resultados guardados con ``save_results``."""
+    results = json.loads(Path(path).read_text(encoding="utf-8"))
+    if results.get('format') != RESULTS_FORMAT:
+        raise ValueError(f"Formato de resultados no soportado en {path}")
+    return results
+
+
+def latest_results():
+    """Ruta de los resultados más recientes en ``results/``, o None."""
+    paths = sorted(RESULTS_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    return paths[-1] if paths else None
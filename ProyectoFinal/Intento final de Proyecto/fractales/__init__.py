@@ -3,28 +3,37 @@ Módulo Principal de Fractales
 Aplicación completa de generación y visualización de fractales
 """
 
-from .generators import (
-    PaletteGenerator,
-    FractalGenerator, 
-    MandelbrotGenerator,
-    JuliaGenerator,
-    KochGenerator
-)
-
-from .interfaces import (
-    SimpleFractalMenu
-)
-
-from .utils import (
-    config,
-    performance_monitor,
-    setup_project_path,
-    ensure_directories
-)
-
-# Configurar el entorno al importar
-setup_project_path()
-ensure_directories()
+import importlib
+
+# Subpaquete que define cada nombre público. Se importan al primer uso para
+# que ``import fractales`` no cargue numba, PyQt6 ni toque el disco.
+_EXPORTS = {
+    'PaletteGenerator': 'generators',
+    'FractalGenerator': 'generators',
+    'MandelbrotGenerator': 'generators',
+    'JuliaGenerator': 'generators',
+    'FormulaGenerator': 'generators',
+    'KochGenerator': 'generators',
+    'SimpleFractalMenu': 'interfaces',
+    'config': 'utils',
+    'performance_monitor': 'utils',
+    'setup_project_path': 'utils',
+    'ensure_directories': 'utils',
+}
+
+
+def __getattr__(name):
+    """Carga generadores, interfaces y utilidades solo cuando se usan."""
+    package = _EXPORTS.get(name)
+    if package is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{package}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     # Generadores
@@ -32,6 +41,7 @@ __all__ = [
     'FractalGenerator',
     'MandelbrotGenerator', 
     'JuliaGenerator',
+    'FormulaGenerator',
     'KochGenerator',
     # Interfaces
     'SimpleFractalMenu',
@@ -1,20 +1,68 @@
 """
 Módulo de Generadores de Fractales
 Contiene todos los algoritmos de generación consolidados
+
+Los submódulos (y numba) se cargan al usar por primera vez uno de sus nombres.
 """
 
-from .fractal_generators import (
-    PaletteGenerator,
-    FractalGenerator,
-    MandelbrotGenerator,
-    JuliaGenerator,
-    KochGenerator
-)
-
-__all__ = [
-    'PaletteGenerator',
-    'FractalGenerator', 
-    'MandelbrotGenerator',
-    'JuliaGenerator',
-    'KochGenerator'
-]
+import importlib
+import os
+import sys
+
+# Los kernels paralelos se lanzan desde hilos de render; con la capa TBB
+# el proceso queda bloqueado al salir, así que se prefiere OpenMP. La
+# variable de entorno evita importar numba aquí y la heredan los procesos
+# hijos; si numba ya estaba cargado se ajusta también su configuración.
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+if "numba" in sys.modules:
+    sys.modules["numba"].config.THREADING_LAYER_PRIORITY = \
+        os.environ["NUMBA_THREADING_LAYER_PRIORITY"].split()
+
+# Submódulo que define cada nombre público
+_EXPORTS = {
+    'PaletteGenerator': 'fractal_generators',
+    'FractalGenerator': 'fractal_generators',
+    'EscapeTimeGenerator': 'fractal_generators',
+    'MandelbrotGenerator': 'fractal_generators',
+    'JuliaGenerator': 'fractal_generators',
+    'JULIA_PRESETS': 'fractal_generators',
+    'FormulaGenerator': 'fractal_generators',
+    'KochGenerator': 'fractal_generators',
+    'RenderCancelled': 'fractal_generators',
+    'cuda_available': 'fractal_generators',
+    'FORMULA_PRESETS': 'formulas',
+    'FormulaError': 'formulas',
+    'CompiledFormula': 'formulas',
+    'compile_formula': 'formulas',
+    'TiledRenderer': 'tiled_renderer',
+    'TileCache': 'tile_cache',
+    'TileKey': 'tile_cache',
+    'render_view_field': 'tile_cache',
+    'cached_view_field': 'tile_cache',
+    'DiskTileStore': 'disk_tile_store',
+    'get_disk_tile_store': 'disk_tile_store',
+    'export_png': 'streaming_export',
+    'export_field_png': 'streaming_export',
+    'submit_export_png': 'streaming_export',
+    'CheckpointedRender': 'checkpoint',
+    'TilePyramid': 'tile_pyramid',
+    'warm_up_kernels': 'warmup',
+    'start_kernel_warmup': 'warmup',
+}
+
+
+def __getattr__(name):
+    """Importa el submódulo de un nombre público la primera vez que se usa."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
@@ -0,0 +1,223 @@
+"""
+Renders con Puntos de Control
+Campos de iteraciones en archivos np.memmap que se pueden reanudar y recolorear
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.config import (CHECKPOINT_INTERVAL, CHECKPOINT_TILE_SIZE, STAGE_EXPORT,
+                            performance_monitor)
+from .fractal_generators import FormulaGenerator, RenderCancelled
+from .streaming_export import export_field_png
+
+# Versión del formato del manifiesto
+CHECKPOINT_VERSION = 1
+
+FIELD_FILE = "field.int32"
+MANIFEST_FILE = "render.json"
+
+
+def describe_view(generator, width, height, zoom=None, offset_x=None, offset_y=None,
+                  tile_size=CHECKPOINT_TILE_SIZE):
+    """Parámetros que determinan el campo de iteraciones de una vista."""
+    julia, c_real, c_imag = generator._kernel_parameters()
+    return {
+        "formula": generator.formula,
+        "julia": bool(julia),
+        "c_real": float(c_real) if julia else 0.0,
+        "c_imag": float(c_imag) if julia else 0.0,
+        "zoom": float(generator.zoom if zoom is None else zoom),
+        "offset_x": float(generator.offset_x if offset_x is None else offset_x),
+        "offset_y": float(generator.offset_y if offset_y is None else offset_y),
+        "rotation": float(generator.rotation),
+        "max_iter": int(generator.max_iter),
+        "width": int(width),
+        "height": int(height),
+        "tile_size": int(tile_size),
+    }
+
+
+class CheckpointedRender:
+    """Render de un campo de iteraciones en disco que sobrevive a interrupciones.
+
+    El campo vive en un ``np.memmap`` (``field.int32``) dentro de
+    ``directory`` y un manifiesto (``render.json``) guarda la vista y las
+    teselas terminadas. Cada ``interval`` segundos se vuelca el memmap y
+    después se reescribe el manifiesto, de modo que una tesela solo figura
+    como hecha cuando sus datos ya están en disco; tras un corte, ``run``
+    continúa con las que faltan.
+
+    El campo terminado se puede recolorear con otra paleta y a otra
+    resolución (``export_png``) sin recalcular nada.
+    """
+
+    def __init__(self, directory, view, done=()):
+        self.directory = Path(directory)
+        self.view = view
+        self.done = set(done)
+        mode = "r+" if self.field_path.exists() else "w+"
+        self.field = np.memmap(self.field_path, dtype=np.int32, mode=mode,
+                               shape=(view["height"], view["width"]))
+
+    @classmethod
+    def create(cls, directory, generator, width, height, zoom=None, offset_x=None,
+               offset_y=None, tile_size=CHECKPOINT_TILE_SIZE):
+        """Prepara un render nuevo o reanuda el existente si la vista coincide."""
+        view = describe_view(generator, width, height, zoom, offset_x, offset_y, tile_size)
+        directory = Path(directory)
+        if (directory / MANIFEST_FILE).exists():
+            render = cls.open(directory)
+            if render.view != view:
+                raise ValueError(f"{directory} ya contiene un render con otra vista")
+            return render
+        directory.mkdir(parents=True, exist_ok=True)
+        render = cls(directory, view)
+        render.save()
+        return render
+
+    @classmethod
+    def open(cls, directory):
+        """Abre un render existente para reanudarlo o recolorearlo."""
+        manifest = json.loads((Path(directory) / MANIFEST_FILE).read_text(encoding="utf-8"))
+        if manifest.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("Versión de manifiesto no soportada")
+        return cls(directory, manifest["view"], manifest["done"])
+
+    @property
+    def field_path(self):
+        """Ruta del archivo del campo de iteraciones."""
+        return self.directory / FIELD_FILE
+
+    @property
+    def manifest_path(self):
+        """Ruta del manifiesto."""
+        return self.directory / MANIFEST_FILE
+
+    @property
+    def max_iter(self):
+        """Iteraciones máximas con las que se calcula el campo."""
+        return self.view["max_iter"]
+
+    def tiles(self):
+        """Teselas ``(índice, x0, y0, columnas, filas)`` del campo."""
+        size = self.view["tile_size"]
+        width, height = self.view["width"], self.view["height"]
+        positions = [(x0, y0) for y0 in range(0, height, size) for x0 in range(0, width, size)]
+        return [(index, x0, y0, min(size, width - x0), min(size, height - y0))
+                for index, (x0, y0) in enumerate(positions)]
+
+    @property
+    def progress(self):
+        """Fracción de teselas terminadas."""
+        return len(self.done) / max(1, len(self.tiles()))
+
+    @property
+    def is_complete(self):
+        """Indica si todas las teselas están calculadas."""
+        return len(self.done) >= len(self.tiles())
+
+    def create_generator(self):
+        """Generador que calcula exactamente el campo descrito en la vista."""
+        view = self.view
+        generator = FormulaGenerator(view["formula"], view["julia"])
+        generator.set_julia_constant(view["c_real"], view["c_imag"])
+        generator.zoom = view["zoom"]
+        generator.offset_x = view["offset_x"]
+        generator.offset_y = view["offset_y"]
+        generator.rotation = view["rotation"]
+        generator.max_iter = view["max_iter"]
+        return generator
+
+    def run(self, workers=None, progress=None, cancel_check=None,
+            interval=CHECKPOINT_INTERVAL):
+        """Calcula las teselas que faltan guardando el avance periódicamente.
+
+        ``progress(hechas, total)`` se llama al terminar cada tesela. Si
+        ``cancel_check`` devuelve True se guarda el avance y se lanza
+        ``RenderCancelled``. Devuelve el campo (memmap). Una ejecución que
+        termina el campo es una muestra de ``STAGE_EXPORT``.
+        """
+        view = self.view
+        generator = self.create_generator()
+        tiles = self.tiles()
+        pending_tiles = [tile for tile in tiles if tile[0] not in self.done]
+        workers = workers or os.cpu_count() or 1
+
+        def compute_tile(index, x0, y0, cols, rows):
+            tile = generator.compute_field(view["width"], view["height"], x0=x0, y0=y0,
+                                           cols=cols, rows=rows)
+            self.field[y0:y0 + rows, x0:x0 + cols] = tile
+            return index
+
+        total = len(tiles)
+        start = last_save = time.perf_counter()
+        in_flight = set()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                try:
+                    for tile in pending_tiles:
+                        while len(in_flight) >= 2 * workers:
+                            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            self._collect(finished, total, progress)
+                        if cancel_check is not None and cancel_check():
+                            raise RenderCancelled()
+                        in_flight.add(executor.submit(compute_tile, *tile))
+                        if time.perf_counter() - last_save >= interval:
+                            self.save()
+                            last_save = time.perf_counter()
+                    while in_flight:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        self._collect(finished, total, progress)
+                        if cancel_check is not None and cancel_check():
+                            raise RenderCancelled()
+                        if time.perf_counter() - last_save >= interval:
+                            self.save()
+                            last_save = time.perf_counter()
+                finally:
+                    for future in in_flight:
+                        future.cancel()
+                    # Las teselas que ya estaban en marcha cuentan antes de guardar
+                    finished, _ = wait(in_flight)
+                    self._collect([future for future in finished
+                                   if not future.cancelled() and future.exception() is None],
+                                  total, progress)
+        finally:
+            self.save()
+        pixels = sum(cols * rows for _, _, _, cols, rows in pending_tiles)
+        performance_monitor.record_stage(STAGE_EXPORT, time.perf_counter() - start, pixels=pixels)
+        return self.field
+
+    def _collect(self, finished, total, progress):
+        """Marca como hechas las teselas terminadas."""
+        for future in finished:
+            self.done.add(future.result())
+            if progress is not None:
+                progress(len(self.done), total)
+
+    def save(self):
+        """Vuelca el campo a disco y después escribe el manifiesto (atómico)."""
+        self.field.flush()
+        data = {"version": CHECKPOINT_VERSION, "view": self.view, "done": sorted(self.done)}
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def export_png(self, path, generator=None, width=None, height=None, **kwargs):
+        """Colorea el campo y lo exporta a PNG, opcionalmente a otra resolución.
+
+        Se usan la paleta, el modo de color y el aura de ``generator`` (por
+        defecto, los de ``create_generator``); las iteraciones máximas son
+        siempre las del render.
+        """
+        if not self.is_complete:
+            raise ValueError("El render no está terminado")
+        colors = generator if generator is not None else self.create_generator()
+        return export_field_png(self.field, path,
+                                lambda field: colors.colorize_field(field, self.max_iter),
+                                width, height, **kwargs)
@@ -0,0 +1,161 @@
+"""
+Kernels CUDA de Mandelbrot y Julia
+Se importan solo al generar con CUDA, para no cargar numba.cuda antes de tiempo
+"""
+
+import math
+
+from numba import cuda
+
+
+@cuda.jit(cache=True)
+def mandelbrot_kernel_with_aura(image, width, height, zoom, offset_x, offset_y, max_iter, palette, palette_size, color_mode, aura_intensity, rotation):
+    x, y = cuda.grid(2)
+    if x >= width or y >= height:
+        return
+
+    real = (x - width / 2.0) / zoom + offset_x
+    imag = (y - height / 2.0) / zoom + offset_y
+
+    # Aplicar rotación
+    if rotation != 0.0:
+        cos_r = math.cos(rotation)
+        sin_r = math.sin(rotation)
+        real_rot = real * cos_r - imag * sin_r
+        imag_rot = real * sin_r + imag * cos_r
+        real, imag = real_rot, imag_rot
+
+    c_real, c_imag = real, imag
+
+    z_real, z_imag = 0.0, 0.0
+    iter_count = 0
+    z_mag_squared = 0.0
+
+    while iter_count < max_iter and (z_real * z_real + z_imag * z_imag) < 4.0:
+        temp = z_real * z_real - z_imag * z_imag + c_real
+        z_imag = 2.0 * z_real * z_imag + c_imag
+        z_real = temp
+        iter_count += 1
+        z_mag_squared = z_real * z_real + z_imag * z_imag
+
+    if iter_count == max_iter:
+        image[y, x, 0] = 0
+        image[y, x, 1] = 0
+        image[y, x, 2] = 0
+        return
+
+    smooth_value = iter_count
+    if iter_count < max_iter:
+        smooth_value = iter_count + 1.0 - min(1.0, z_mag_squared / 4.0)
+
+    aura_factor = 0.0
+    if z_mag_squared > 0.0:
+        edge_proximity = min(1.0, z_mag_squared / 4.0) 
+        aura_factor = edge_proximity * aura_intensity
+
+    if color_mode == 0:  
+        color_index = int(iter_count % palette_size)
+        r = palette[color_index][0]
+        g = palette[color_index][1]
+        b = palette[color_index][2]
+
+        r = min(255, int(r + (255 - r) * aura_factor))
+        g = min(255, int(g + (255 - g) * aura_factor))
+        b = min(255, int(b + (255 - b) * aura_factor))
+    else:  
+        t = smooth_value / max_iter
+        index_float = t * (palette_size - 1)
+        index = int(index_float)
+        t_interp = index_float - index
+
+        if index < palette_size - 1:
+            r = int(palette[index][0] * (1.0 - t_interp) + palette[index + 1][0] * t_interp)
+            g = int(palette[index][1] * (1.0 - t_interp) + palette[index + 1][1] * t_interp)
+            b = int(palette[index][2] * (1.0 - t_interp) + palette[index + 1][2] * t_interp)
+        else:
+            r = palette[index][0]
+            g = palette[index][1]
+            b = palette[index][2]
+
+        r = min(255, int(r * (1.0 + aura_factor * 0.7)))
+        g = min(255, int(g * (1.0 + aura_factor * 0.7)))
+        b = min(255, int(b * (1.0 + aura_factor * 0.7)))
+
+    image[y, x, 0] = r
+    image[y, x, 1] = g
+    image[y, x, 2] = b
+
+@cuda.jit(cache=True)
+def julia_kernel_with_aura(image, width, height, zoom, offset_x, offset_y, max_iter, palette, palette_size, color_mode, aura_intensity, rotation, c_real, c_imag):
+    x, y = cuda.grid(2)
+    if x >= width or y >= height:
+        return
+
+    real = (x - width / 2.0) / zoom + offset_x
+    imag = (y - height / 2.0) / zoom + offset_y
+
+    # Aplicar rotación
+    if rotation != 0.0:
+        cos_r = math.cos(rotation)
+        sin_r = math.sin(rotation)
+        real_rot = real * cos_r - imag * sin_r
+        imag_rot = real * sin_r + imag * cos_r
+        real, imag = real_rot, imag_rot
+
+    z_real, z_imag = real, imag
+    iter_count = 0
+    z_mag_squared = 0.0
+
+    while iter_count < max_iter and (z_real * z_real + z_imag * z_imag) < 4.0:
+        temp = z_real * z_real - z_imag * z_imag + c_real
+        z_imag = 2.0 * z_real * z_imag + c_imag
+        z_real = temp
+        iter_count += 1
+        z_mag_squared = z_real * z_real + z_imag * z_imag
+
+    if iter_count == max_iter:
+        image[y, x, 0] = 0
+        image[y, x, 1] = 0
+        image[y, x, 2] = 0
+        return
+
+    smooth_value = iter_count
+    if iter_count < max_iter:
+        smooth_value = iter_count + 1.0 - min(1.0, z_mag_squared / 4.0)
+
+    aura_factor = 0.0
+    if z_mag_squared > 0.0:
+        edge_proximity = min(1.0, z_mag_squared / 4.0) 
+        aura_factor = edge_proximity * aura_intensity
+
+    if color_mode == 0:  
+        color_index = int(iter_count % palette_size)
+        r = palette[color_index][0]
+        g = palette[color_index][1]
+        b = palette[color_index][2]
+
+        r = min(255, int(r + (255 - r) * aura_factor))
+        g = min(255, int(g + (255 - g) * aura_factor))
+        b = min(255, int(b + (255 - b) * aura_factor))
+    else:  
+        t = smooth_value / max_iter
+        index_float = t * (palette_size - 1)
+        index = int(index_float)
+        t_interp = index_float - index
+
+        if index < palette_size - 1:
+            r = int(palette[index][0] * (1.0 - t_interp) + palette[index + 1][0] * t_interp)
+            g = int(palette[index][1] * (1.0 - t_interp) + palette[index + 1][1] * t_interp)
+            b = int(palette[index][2] * (1.0 - t_interp) + palette[index + 1][2] * t_interp)
+        else:
+            r = palette[index][0]
+            g = palette[index][1]
+            b = palette[index][2]
+
+        r = min(255, int(r * (1.0 + aura_factor * 0.7)))
+        g = min(255, int(g * (1.0 + aura_factor * 0.7)))
+        b = min(255, int(b * (1.0 + aura_factor * 0.7)))
+
+    image[y, x, 0] = r
+    image[y, x, 1] = g
+    image[y, x, 2] = b
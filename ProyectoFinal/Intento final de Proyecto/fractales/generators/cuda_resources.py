@@ -0,0 +1,104 @@
+"""
+Recursos Persistentes de Dispositivo CUDA
+Mantiene en la GPU el buffer de imagen y la paleta entre cuadros
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    from numba import cuda
+except ImportError:
+    cuda = None
+
+
+class CudaDeviceResources:
+    """Gestor de buffers de dispositivo reutilizables para los kernels CUDA.
+
+    El buffer de imagen se reserva una sola vez por tamaño de cuadro y la
+    paleta solo se vuelve a subir cuando cambia su versión. La lectura de
+    resultados se hace sobre memoria fijada (pinned) del host.
+
+    Las copias de un generador (``snapshot()``) comparten sus recursos y
+    pueden renderizar desde varios hilos a la vez: cada cuadro completo
+    (reserva, lanzamiento y lectura) se hace con ``lock`` adquirido.
+
+    Funciona igual con ``NUMBA_ENABLE_CUDASIM=1``, sin GPU física.
+    """
+
+    def __init__(self):
+        if cuda is None:
+            raise RuntimeError("numba.cuda no está disponible")
+
+        self._stream = cuda.stream()
+        self.lock = threading.Lock()
+
+        # Buffers de imagen (dispositivo + host fijado)
+        self._shape = None
+        self._d_image = None
+        self._h_image = None
+
+        # Paleta en dispositivo
+        self._d_palette = None
+        self._palette_version = None
+        self._palette_size = 0
+
+        # Contadores para diagnóstico
+        self.image_allocations = 0
+        self.palette_uploads = 0
+
+    @property
+    def stream(self):
+        """Stream CUDA asociado a los recursos."""
+        return self._stream
+
+    @property
+    def palette_size(self):
+        """Número de colores de la paleta subida."""
+        return self._palette_size
+
+    def get_image_buffer(self, width, height):
+        """Obtiene el buffer de imagen del dispositivo para el tamaño dado.
+
+        Solo se reserva memoria nueva cuando cambia el tamaño del cuadro.
+        No se inicializa a cero: los kernels escriben todos los píxeles.
+        """
+        shape = (height, width, 3)
+        if self._shape != shape:
+            self._d_image = cuda.device_array(shape, dtype=np.uint8, stream=self._stream)
+            self._h_image = cuda.pinned_array(shape, dtype=np.uint8)
+            self._shape = shape
+            self.image_allocations += 1
+        return self._d_image
+
+    def get_palette(self, palette, version):
+        """Obtiene la paleta del dispositivo, subiéndola solo si cambió su versión."""
+        if self._d_palette is None or version != self._palette_version:
+            palette_array = np.ascontiguousarray(palette, dtype=np.uint8)
+            self._d_palette = cuda.to_device(palette_array, stream=self._stream)
+            self._palette_version = version
+            self._palette_size = len(palette_array)
+            self.palette_uploads += 1
+        return self._d_palette
+
+    def read_image(self):
+        """Copia el último cuadro a memoria fijada y devuelve una copia propia.
+
+        El buffer fijado se reutiliza en el siguiente cuadro, por eso el
+        llamador recibe siempre un array independiente.
+        """
+        if self._d_image is None:
+            raise RuntimeError("No hay ningún cuadro renderizado en el dispositivo")
+        self._d_image.copy_to_host(self._h_image, stream=self._stream)
+        self._stream.synchronize()
+        return self._h_image.copy()
+
+    def release(self):
+        """Libera los buffers del dispositivo y del host."""
+        self._shape = None
+        self._d_image = None
+        self._h_image = None
+        self._d_palette = None
+        self._palette_version = None
+        self._palette_size = 0
@@ -0,0 +1,253 @@
+"""
+Almacén de Teselas en Disco
+Persiste entre sesiones las teselas de iteraciones más costosas dentro de CACHE_DIR
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from ..utils.config import CACHE_DIR, TILE_DISK_BYTES, TILE_DISK_MAX_AGE
+
+TILE_STORE_DIR = CACHE_DIR / "tiles"
+
+# Versión del formato: cambiarla invalida las teselas guardadas
+STORE_VERSION = 1
+
+# Cabecera de cada archivo: marca, tipo de dato, filas y columnas
+_HEADER = struct.Struct("<4sBHH")
+_MAGIC = b"FTIL"
+_DTYPES = {1: np.uint8, 2: np.uint16, 4: np.int32}
+
+# Escrituras acumuladas antes de guardar el índice
+_INDEX_FLUSH_INTERVAL = 32
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def encode_tile(field, max_iter):
+    """Codifica un campo de iteraciones con el tipo más compacto y zlib."""
+    if max_iter <= np.iinfo(np.uint8).max:
+        code = 1
+    elif max_iter <= np.iinfo(np.uint16).max:
+        code = 2
+    else:
+        code = 4
+    data = np.ascontiguousarray(field, dtype=_DTYPES[code]).tobytes()
+    rows, cols = field.shape
+    return _HEADER.pack(_MAGIC, code, rows, cols) + zlib.compress(data, 1)
+
+
+def decode_tile(payload):
+    """Decodifica un campo de iteraciones (int32) guardado con ``encode_tile``."""
+    magic, code, rows, cols = _HEADER.unpack_from(payload)
+    if magic != _MAGIC or code not in _DTYPES:
+        raise ValueError("Archivo de tesela inválido")
+    data = zlib.decompress(payload[_HEADER.size:])
+    return np.frombuffer(data, dtype=_DTYPES[code]).reshape(rows, cols).astype(np.int32)
+
+
+class DiskTileStore:
+    """Almacén persistente de teselas con límite de tamaño y antigüedad.
+
+    Cada tesela es un archivo comprimido cuyo nombre es el hash de su
+    ``TileKey``. Un índice (``index.json``) guarda el tamaño y el último uso
+    de cada archivo, de modo que consultar si una tesela existe no toca el
+    disco. Al superar ``max_bytes`` se eliminan las menos usadas y al abrir
+    el almacén se descartan las que llevan más de ``max_age`` segundos sin
+    usarse.
+    """
+
+    def __init__(self, root=TILE_STORE_DIR, max_bytes=TILE_DISK_BYTES,
+                 max_age=TILE_DISK_MAX_AGE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending_writes = 0
+        self._uses_changed = False
+        self.current_bytes = 0
+
+        # Estadísticas
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._load_index()
+        self._evict_expired()
+
+    @property
+    def index_path(self):
+        """Ruta del índice del almacén."""
+        return self.root / "index.json"
+
+    @staticmethod
+    def key_name(key):
+        """Nombre de archivo (hash) de una clave de tesela."""
+        text = f"{STORE_VERSION}:{tuple(key)!r}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:24]
+
+    def _path(self, name):
+        """Ruta del archivo de una tesela."""
+        return self.root / name[:2] / f"{name}.tile"
+
+    def __contains__(self, key):
+        with self._lock:
+            return self.key_name(key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Lee una tesela (o None si no está guardada)."""
+        name = self.key_name(key)
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+        try:
+            field = decode_tile(self._path(name).read_bytes())
+        except (OSError, ValueError, zlib.error):
+            # Archivo borrado o dañado: se olvida la entrada
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if name in self._entries:
+                # El último uso solo cambia en memoria; flush() lo guarda para
+                # que la caducidad por edad no expulse teselas que se leen
+                self._entries[name][1] = time.time()
+                self._uses_changed = True
+            self.hits += 1
+        return field
+
+    def put(self, key, field):
+        """Guarda una tesela en disco."""
+        name = self.key_name(key)
+        payload = encode_tile(field, key.max_iter)
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._forget(name)
+            self._entries[name] = [len(payload), time.time()]
+            self.current_bytes += len(payload)
+            self.writes += 1
+            self._pending_writes += 1
+            if self.current_bytes > self.max_bytes:
+                self._evict_to(int(self.max_bytes * 0.9))
+            if self._pending_writes >= _INDEX_FLUSH_INTERVAL:
+                self._save_index()
+
+    def flush(self):
+        """Guarda el índice si hay cambios pendientes (incluidos los últimos usos)."""
+        with self._lock:
+            if self._pending_writes or self._uses_changed:
+                self._save_index()
+
+    def clear(self):
+        """Elimina todas las teselas guardadas."""
+        with self._lock:
+            for name in list(self._entries):
+                self._remove_file(name)
+            self._save_index()
+
+    def get_statistics(self):
+        """Devuelve las estadísticas del almacén."""
+        return {
+            'tiles': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+        }
+
+    # Índice y expulsión (llamar con el lock tomado salvo al iniciar)
+
+    def _forget(self, name):
+        """Quita una entrada del índice sin tocar el archivo."""
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self.current_bytes -= entry[0]
+
+    def _remove_file(self, name):
+        """Elimina el archivo de una tesela y su entrada."""
+        self._forget(name)
+        try:
+            self._path(name).unlink()
+        except OSError:
+            pass
+
+    def _evict_to(self, target_bytes):
+        """Elimina las teselas menos usadas hasta bajar de ``target_bytes``."""
+        for name, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self.current_bytes <= target_bytes:
+                break
+            self._remove_file(name)
+            self.evictions += 1
+        self._save_index()
+
+    def _evict_expired(self):
+        """Elimina las teselas que llevan más de ``max_age`` sin usarse."""
+        limit = time.time() - self.max_age
+        expired = [name for name, (_, used) in self._entries.items() if used < limit]
+        with self._lock:
+            for name in expired:
+                self._remove_file(name)
+                self.evictions += 1
+            if self.current_bytes > self.max_bytes:
+                self._evict_to(int(self.max_bytes * 0.9))
+            elif expired:
+                self._save_index()
+
+    def _load_index(self):
+        """Carga el índice o lo reconstruye a partir de los archivos."""
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data.get("version") != STORE_VERSION:
+                raise ValueError("Versión de índice distinta")
+            self._entries = {name: list(entry) for name, entry in data["entries"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+            if self.root.exists():
+                for path in self.root.glob("*/*.tile"):
+                    stat = path.stat()
+                    self._entries[path.stem] = [stat.st_size, stat.st_mtime]
+        self.current_bytes = sum(entry[0] for entry in self._entries.values())
+
+    def _save_index(self):
+        """Escribe el índice de forma atómica."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {"version": STORE_VERSION, "entries": self._entries}
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+        self._pending_writes = 0
+        self._uses_changed = False
+
+
+def get_disk_tile_store():
+    """Almacén de teselas compartido por todas las ventanas del proceso."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = DiskTileStore()
+            atexit.register(_shared_store.flush)
+        return _shared_store
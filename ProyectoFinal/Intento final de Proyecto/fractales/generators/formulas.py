@@ -0,0 +1,525 @@
+"""
+Compilador de Fórmulas de Tiempo de Escape
+Convierte expresiones como ``z**3 + c`` en kernels numba especializados
+"""
+
+import ast
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+
+import numpy as np
+
+from ..utils.config import CACHE_DIR
+
+# Versión de la plantilla: cambiarla invalida los kernels cacheados en disco
+TEMPLATE_VERSION = 5
+
+FORMULA_CACHE_DIR = CACHE_DIR / "formulas"
+
+# Exponente máximo que se desenrolla en el bucle interno
+MAX_UNROLLED_EXPONENT = 64
+
+# Fórmulas predefinidas
+FORMULA_PRESETS = {
+    "Mandelbrot": "z**2 + c",
+    "Burning Ship": "abs(z)**2 + c",
+    "Tricorn": "conj(z)**2 + c",
+    "Multibrot 3": "z**3 + c",
+    "Multibrot 4": "z**4 + c",
+    "Multibrot 5": "z**5 + c",
+}
+
+_FUNCTIONS = ("abs", "conj", "re", "im")
+
+_compiled_formulas = {}
+_compile_lock = threading.Lock()
+
+
+class FormulaError(ValueError):
+    """Error en la sintaxis o semántica de una fórmula."""
+
+
+class _Operand:
+    """Valor complejo del código generado: expresiones de parte real e imaginaria."""
+
+    def __init__(self, real, imag):
+        self.real = real
+        self.imag = imag
+
+    @property
+    def is_real(self):
+        """Indica si la parte imaginaria es exactamente cero."""
+        return self.imag == "0.0"
+
+
+class _FormulaCodegen:
+    """Genera código en línea recta (solo aritmética real) para una fórmula."""
+
+    def __init__(self):
+        self.lines = []
+        self._counter = 0
+
+    def _temp(self, real, imag):
+        """Asigna una expresión a variables temporales."""
+        name = f"t{self._counter}"
+        self._counter += 1
+        self.lines.append(f"{name}r = {real}")
+        if imag == "0.0":
+            return _Operand(f"{name}r", "0.0")
+        self.lines.append(f"{name}i = {imag}")
+        return _Operand(f"{name}r", f"{name}i")
+
+    def visit(self, node):
+        """Genera el código de un nodo del árbol sintáctico."""
+        if isinstance(node, ast.Expression):
+            return self.visit(node.body)
+        if isinstance(node, ast.Name):
+            if node.id == "z":
+                return _Operand("zr", "zi")
+            if node.id == "c":
+                return _Operand("cr", "ci")
+            raise FormulaError(f"Variable desconocida: '{node.id}' (use z o c)")
+        if isinstance(node, ast.Constant):
+            return self._constant(node.value)
+        if isinstance(node, ast.UnaryOp):
+            operand = self.visit(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            if isinstance(node.op, ast.USub):
+                return self._temp(f"-{operand.real}", "0.0" if operand.is_real else f"-{operand.imag}")
+            raise FormulaError("Operador unario no soportado")
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, ast.Pow):
+                return self._power(self.visit(node.left), node.right)
+            left = self.visit(node.left)
+            right = self.visit(node.right)
+            if isinstance(node.op, ast.Add):
+                return self._add(left, right, "+")
+            if isinstance(node.op, ast.Sub):
+                return self._add(left, right, "-")
+            if isinstance(node.op, ast.Mult):
+                return self._mul(left, right)
+            if isinstance(node.op, ast.Div):
+                return self._div(left, right)
+            raise FormulaError("Operador binario no soportado")
+        if isinstance(node, ast.Call):
+            return self._call(node)
+        raise FormulaError(f"Expresión no soportada: {ast.unparse(node)}")
+
+    def _constant(self, value):
+        """Genera una constante numérica."""
+        if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+            raise FormulaError(f"Constante no soportada: {value!r}")
+        value = complex(value)
+        return _Operand(repr(float(value.real)), repr(float(value.imag)))
+
+    def _add(self, a, b, sign):
+        """Suma o resta dos operandos."""
+        real = f"{a.real} {sign} {b.real}"
+        if a.is_real and b.is_real:
+            imag = "0.0"
+        elif b.is_real:
+            imag = a.imag
+        elif a.is_real:
+            imag = b.imag if sign == "+" else f"-{b.imag}"
+        else:
+            imag = f"{a.imag} {sign} {b.imag}"
+        return self._temp(real, imag)
+
+    def _mul(self, a, b):
+        """Multiplica dos operandos."""
+        if a.is_real and b.is_real:
+            return self._temp(f"{a.real} * {b.real}", "0.0")
+        if b.is_real:
+            return self._temp(f"{a.real} * {b.real}", f"{a.imag} * {b.real}")
+        if a.is_real:
+            return self._temp(f"{a.real} * {b.real}", f"{a.real} * {b.imag}")
+        return self._temp(f"{a.real} * {b.real} - {a.imag} * {b.imag}",
+                          f"{a.real} * {b.imag} + {a.imag} * {b.real}")
+
+    def _square(self, a):
+        """Eleva un operando al cuadrado."""
+        if a.is_real:
+            return self._temp(f"{a.real} * {a.real}", "0.0")
+        return self._temp(f"{a.real} * {a.real} - {a.imag} * {a.imag}",
+                          f"2.0 * {a.real} * {a.imag}")
+
+    @staticmethod
+    def _safe_div(numerator, denominator):
+        """Cociente real; un denominador nulo da infinito para que la órbita escape."""
+        return f"({numerator}) / {denominator} if {denominator} != 0.0 else math.inf"
+
+    def _div(self, a, b):
+        """Divide dos operandos."""
+        if b.is_real:
+            return self._temp(self._safe_div(a.real, b.real),
+                              "0.0" if a.is_real else self._safe_div(a.imag, b.real))
+        den = self._temp(f"{b.real} * {b.real} + {b.imag} * {b.imag}", "0.0")
+        return self._temp(self._safe_div(f"{a.real} * {b.real} + {a.imag} * {b.imag}", den.real),
+                          self._safe_div(f"{a.imag} * {b.real} - {a.real} * {b.imag}", den.real))
+
+    def _power(self, base, exponent_node):
+        """Desenrolla una potencia entera mediante cuadrados sucesivos."""
+        exponent = None
+        if isinstance(exponent_node, ast.Constant) and isinstance(exponent_node.value, (int, float)):
+            if float(exponent_node.value).is_integer():
+                exponent = int(exponent_node.value)
+        if exponent is None or exponent < 0:
+            raise FormulaError("El exponente debe ser un entero constante no negativo")
+        if exponent > MAX_UNROLLED_EXPONENT:
+            raise FormulaError(f"Exponente demasiado grande (máximo {MAX_UNROLLED_EXPONENT})")
+        if exponent == 0:
+            return _Operand("1.0", "0.0")
+
+        result = None
+        while exponent:
+            if exponent & 1:
+                result = base if result is None else self._mul(result, base)
+            exponent >>= 1
+            if exponent:
+                base = self._square(base)
+        return result
+
+    def _call(self, node):
+        """Genera las funciones soportadas: abs, conj, re, im."""
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise FormulaError(f"Función no soportada (use {', '.join(_FUNCTIONS)})")
+        if len(node.args) != 1 or node.keywords:
+            raise FormulaError(f"{node.func.id}() recibe exactamente un argumento")
+        arg = self.visit(node.args[0])
+        name = node.func.id
+        if name == "abs":
+            # Valor absoluto por componentes (variante Burning Ship)
+            return self._temp(f"abs({arg.real})", "0.0" if arg.is_real else f"abs({arg.imag})")
+        if name == "conj":
+            return self._temp(arg.real, "0.0" if arg.is_real else f"-{arg.imag}")
+        if name == "re":
+            return self._temp(arg.real, "0.0")
+        return self._temp(arg.imag, "0.0")
+
+
+def parse_formula(expression):
+    """Valida una fórmula y devuelve su forma normalizada."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Sintaxis inválida: {e.msg}") from None
+    # Validar generando el código una vez
+    _FormulaCodegen().visit(tree)
+    return ast.unparse(tree)
+
+
+def generate_kernel_source(expression):
+    """Genera el código fuente del módulo de kernels para una fórmula."""
+    normalized = parse_formula(expression)
+    codegen = _FormulaCodegen()
+    result = codegen.visit(ast.parse(normalized, mode="eval"))
+    body = "\n".join(f"    {line}" for line in codegen.lines)
+    imag = result.imag if not result.is_real else "0.0"
+    return _KERNEL_TEMPLATE.format(
+        expression=normalized,
+        version=TEMPLATE_VERSION,
+        body=body or "    pass",
+        result_real=result.real,
+        result_imag=imag,
+    )
+
+
+def formula_key(expression):
+    """Calcula el hash que identifica una fórmula en la caché de disco."""
+    normalized = parse_formula(expression)
+    digest = hashlib.sha1(f"{TEMPLATE_VERSION}:{normalized}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CompiledFormula:
+    """Fórmula compilada con sus kernels de campo de iteraciones."""
+
+    def __init__(self, expression, key, module):
+        self.expression = expression
+        self.key = key
+        self._module = module
+
+    def compute(self, iters, px0, py0, width, height, zoom, offset_x, offset_y,
+                rotation, max_iter, julia=False, c_real=0.0, c_imag=0.0):
+        """Rellena ``iters`` con el número de iteraciones de cada píxel.
+
+        ``iters`` es una ventana de ``rows x cols`` que empieza en el píxel
+        (px0, py0) de una vista completa de ``width x height``.
+        """
+        self._module.escape_field(
+            iters, px0, py0, width, height, float(zoom), float(offset_x), float(offset_y),
+            float(rotation), int(max_iter), bool(julia), float(c_real), float(c_imag)
+        )
+        return iters
+
+    def compute_strided(self, iters, px0, py0, width, height, zoom, offset_x, offset_y,
+                        rotation, max_iter, stride, skip_stride=0, julia=False,
+                        c_real=0.0, c_imag=0.0):
+        """Calcula solo los píxeles de la rejilla de paso ``stride``.
+
+        La rejilla se alinea con la vista completa (píxeles cuyas coordenadas
+        son múltiplo de ``stride``). Con ``skip_stride`` se saltan los puntos
+        que ya calculó una pasada anterior de paso ``skip_stride``; el resto
+        de ``iters`` no se modifica.
+        """
+        self._module.escape_field_strided(
+            iters, px0, py0, width, height, float(zoom), float(offset_x), float(offset_y),
+            float(rotation), int(max_iter), bool(julia), float(c_real), float(c_imag),
+            int(stride), int(skip_stride)
+        )
+        return iters
+
+    def compute_continue(self, iters, z_real, z_imag, px0, py0, width, height, zoom,
+                         offset_x, offset_y, rotation, start_iter, max_iter, resume,
+                         julia=False, c_real=0.0, c_imag=0.0):
+        """Continúa hasta ``max_iter`` los píxeles que no escaparon en ``start_iter``.
+
+        Solo se tocan los píxeles con ``iters >= start_iter``. Con ``resume``
+        la iteración sigue desde el z guardado en ``z_real``/``z_imag``; si
+        no, empieza de cero. El z final de cada píxel se guarda para la
+        siguiente pasada. Devuelve cuántos píxeles escaparon.
+        """
+        return self._module.escape_field_continue(
+            iters, z_real, z_imag, px0, py0, width, height, float(zoom), float(offset_x),
+            float(offset_y), float(rotation), int(start_iter), int(max_iter), bool(resume),
+            bool(julia), float(c_real), float(c_imag)
+        )
+
+    def compute_batch(self, iters, c_values, zoom, offset_x, offset_y, rotation, max_iter):
+        """Rellena un lote ``(n, alto, ancho)`` de campos Julia, uno por cada c.
+
+        ``c_values`` es un array ``(n, 2)`` con las partes real e imaginaria.
+        Todo el lote se calcula en una sola pasada paralela.
+        """
+        c_array = np.ascontiguousarray(c_values, dtype=np.float64).reshape(-1, 2)
+        if c_array.shape[0] != iters.shape[0]:
+            raise ValueError("El lote de iteraciones y el de constantes c no coinciden")
+        self._module.escape_field_batch(
+            iters, c_array, float(zoom), float(offset_x), float(offset_y),
+            float(rotation), int(max_iter)
+        )
+        return iters
+
+    def __repr__(self):
+        return f"CompiledFormula({self.expression!r})"
+
+
+def compile_formula(expression):
+    """Compila una fórmula (o la recupera de la caché en memoria/disco)."""
+    normalized = parse_formula(expression)
+    compiled = _compiled_formulas.get(normalized)
+    if compiled is not None:
+        return compiled
+
+    with _compile_lock:
+        compiled = _compiled_formulas.get(normalized)
+        if compiled is None:
+            key = formula_key(normalized)
+            module = _load_kernel_module(key, generate_kernel_source(normalized))
+            compiled = CompiledFormula(normalized, key, module)
+            _compiled_formulas[normalized] = compiled
+    return compiled
+
+
+def _load_kernel_module(key, source):
+    """Escribe (si no existe) e importa el módulo de kernels de una fórmula.
+
+    numba guarda el código compilado junto al módulo (``cache=True``), por lo
+    que las ejecuciones siguientes no vuelven a compilar.
+    """
+    FORMULA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = FORMULA_CACHE_DIR / f"formula_{key}.py"
+    if not path.exists() or path.read_text(encoding="utf-8") != source:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(source, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    # El módulo debe estar registrado para que numba pueda recargar su caché
+    module_name = f"fractales_formula_{key}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_KERNEL_TEMPLATE = '''"""
+Kernel generado automáticamente - no editar
+Fórmula: {expression}
+Plantilla: v{version}
+"""
+
+import math
+
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def step(zr, zi, cr, ci):
+{body}
+    return {result_real}, {result_imag}
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def escape_field(iters, px0, py0, width, height, zoom, offset_x, offset_y,
+                 rotation, max_iter, julia, c_real, c_imag):
+    rows = iters.shape[0]
+    cols = iters.shape[1]
+    cos_r = math.cos(rotation)
+    sin_r = math.sin(rotation)
+    for j in prange(rows):
+        imag0 = (py0 + j - height / 2.0) / zoom + offset_y
+        for i in range(cols):
+            real = (px0 + i - width / 2.0) / zoom + offset_x
+            imag = imag0
+            if rotation != 0.0:
+                real_rot = real * cos_r - imag * sin_r
+                imag = real * sin_r + imag * cos_r
+                real = real_rot
+            if julia:
+                zr = real
+                zi = imag
+                cr = c_real
+                ci = c_imag
+            else:
+                zr = 0.0
+                zi = 0.0
+                cr = real
+                ci = imag
+            n = 0
+            while n < max_iter and zr * zr + zi * zi < 4.0:
+                zr, zi = step(zr, zi, cr, ci)
+                n += 1
+            iters[j, i] = n
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def escape_field_strided(iters, px0, py0, width, height, zoom, offset_x, offset_y,
+                         rotation, max_iter, julia, c_real, c_imag, stride, skip_stride):
+    rows = iters.shape[0]
+    cols = iters.shape[1]
+    cos_r = math.cos(rotation)
+    sin_r = math.sin(rotation)
+    first_row = (stride - py0 % stride) % stride
+    first_col = (stride - px0 % stride) % stride
+    grid_rows = max(0, (rows - first_row + stride - 1) // stride)
+    for g in prange(grid_rows):
+        j = first_row + g * stride
+        y = py0 + j
+        imag0 = (y - height / 2.0) / zoom + offset_y
+        for i in range(first_col, cols, stride):
+            x = px0 + i
+            if skip_stride > 0 and y % skip_stride == 0 and x % skip_stride == 0:
+                continue
+            real = (x - width / 2.0) / zoom + offset_x
+            imag = imag0
+            if rotation != 0.0:
+                real_rot = real * cos_r - imag * sin_r
+                imag = real * sin_r + imag * cos_r
+                real = real_rot
+            if julia:
+                zr = real
+                zi = imag
+                cr = c_real
+                ci = c_imag
+            else:
+                zr = 0.0
+                zi = 0.0
+                cr = real
+                ci = imag
+            n = 0
+            while n < max_iter and zr * zr + zi * zi < 4.0:
+                zr, zi = step(zr, zi, cr, ci)
+                n += 1
+            iters[j, i] = n
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def escape_field_continue(iters, z_real, z_imag, px0, py0, width, height, zoom, offset_x,
+                          offset_y, rotation, start_iter, max_iter, resume, julia,
+                          c_real, c_imag):
+    rows = iters.shape[0]
+    cols = iters.shape[1]
+    cos_r = math.cos(rotation)
+    sin_r = math.sin(rotation)
+    escaped = 0
+    for j in prange(rows):
+        imag0 = (py0 + j - height / 2.0) / zoom + offset_y
+        for i in range(cols):
+            if iters[j, i] < start_iter:
+                continue
+            real = (px0 + i - width / 2.0) / zoom + offset_x
+            imag = imag0
+            if rotation != 0.0:
+                real_rot = real * cos_r - imag * sin_r
+                imag = real * sin_r + imag * cos_r
+                real = real_rot
+            if julia:
+                cr = c_real
+                ci = c_imag
+            else:
+                cr = real
+                ci = imag
+            if resume:
+                zr = z_real[j, i]
+                zi = z_imag[j, i]
+                n = start_iter
+            elif julia:
+                zr = real
+                zi = imag
+                n = 0
+            else:
+                zr = 0.0
+                zi = 0.0
+                n = 0
+            while n < max_iter and zr * zr + zi * zi < 4.0:
+                zr, zi = step(zr, zi, cr, ci)
+                n += 1
+            iters[j, i] = n
+            z_real[j, i] = zr
+            z_imag[j, i] = zi
+            if n < max_iter:
+                escaped += 1
+    return escaped
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def escape_field_batch(iters, c_values, zoom, offset_x, offset_y, rotation, max_iter):
+    count = iters.shape[0]
+    rows = iters.shape[1]
+    cols = iters.shape[2]
+    cos_r = math.cos(rotation)
+    sin_r = math.sin(rotation)
+    for k in prange(count * rows):
+        b = k // rows
+        j = k - b * rows
+        cr = c_values[b, 0]
+        ci = c_values[b, 1]
+        imag0 = (j - rows / 2.0) / zoom + offset_y
+        for i in range(cols):
+            real = (i - cols / 2.0) / zoom + offset_x
+            imag = imag0
+            if rotation != 0.0:
+                real_rot = real * cos_r - imag * sin_r
+                imag = real * sin_r + imag * cos_r
+                real = real_rot
+            zr = real
+            zi = imag
+            n = 0
+            while n < max_iter and zr * zr + zi * zi < 4.0:
+                zr, zi = step(zr, zi, cr, ci)
+                n += 1
+            iters[b, j, i] = n
+'''
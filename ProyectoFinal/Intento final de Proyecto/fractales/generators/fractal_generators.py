@@ -1,177 +1,62 @@
 """
 Generadores de Fractales Consolidados
 Todos los algoritmos de generación en un solo módulo
-Con aceleración CUDA para máximo rendimiento
+Con aceleración CUDA para máximo rendimiento y kernels numba en CPU
 """
 
+import copy
 import numpy as np
 import math
+import threading
 import time
 import colorsys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from multiprocessing import cpu_count
 
-try:
-    from numba import cuda
-    CUDA_AVAILABLE = True
-    print("✅ CUDA disponible - Aceleración GPU activada")
-except ImportError:
-    CUDA_AVAILABLE = False
-    print("⚠️ CUDA no disponible - Usando CPU")
+from .coloring import colorize_field
+from .formulas import compile_formula, parse_formula
+from ..utils.config import REFINE_MAX_ITER, REFINE_MIN_ESCAPED, STAGE_COMPUTE, performance_monitor
+from ..utils.render_governor import RenderGovernor
 
-# Kernels CUDA para Mandelbrot y Julia
-if CUDA_AVAILABLE:
-    @cuda.jit
-    def mandelbrot_kernel_with_aura(image, width, height, zoom, offset_x, offset_y, max_iter, palette, palette_size, color_mode, aura_intensity, rotation):
-        x, y = cuda.grid(2)
-        if x >= width or y >= height:
-            return
-
-        real = (x - width / 2.0) / zoom + offset_x
-        imag = (y - height / 2.0) / zoom + offset_y
-        
-        # Aplicar rotación
-        if rotation != 0.0:
-            cos_r = math.cos(rotation)
-            sin_r = math.sin(rotation)
-            real_rot = real * cos_r - imag * sin_r
-            imag_rot = real * sin_r + imag * cos_r
-            real, imag = real_rot, imag_rot
-        
-        c_real, c_imag = real, imag
+# Resultado de la detección de CUDA (None hasta el primer uso)
+_cuda_available = None
+_cuda_lock = threading.Lock()
 
-        z_real, z_imag = 0.0, 0.0
-        iter_count = 0
-        z_mag_squared = 0.0
 
-        while iter_count < max_iter and (z_real * z_real + z_imag * z_imag) < 4.0:
-            temp = z_real * z_real - z_imag * z_imag + c_real
-            z_imag = 2.0 * z_real * z_imag + c_imag
-            z_real = temp
-            iter_count += 1
-            z_mag_squared = z_real * z_real + z_imag * z_imag
+def cuda_available():
+    """Indica si hay una GPU CUDA utilizable.
 
-        if iter_count == max_iter:
-            image[y, x, 0] = 0
-            image[y, x, 1] = 0
-            image[y, x, 2] = 0
-            return
-            
-        smooth_value = iter_count
-        if iter_count < max_iter:
-            smooth_value = iter_count + 1.0 - min(1.0, z_mag_squared / 4.0)
-            
-        aura_factor = 0.0
-        if z_mag_squared > 0.0:
-            edge_proximity = min(1.0, z_mag_squared / 4.0) 
-            aura_factor = edge_proximity * aura_intensity
-        
-        if color_mode == 0:  
-            color_index = int(iter_count % palette_size)
-            r = palette[color_index][0]
-            g = palette[color_index][1]
-            b = palette[color_index][2]
-            
-            r = min(255, int(r + (255 - r) * aura_factor))
-            g = min(255, int(g + (255 - g) * aura_factor))
-            b = min(255, int(b + (255 - b) * aura_factor))
-        else:  
-            t = smooth_value / max_iter
-            index_float = t * (palette_size - 1)
-            index = int(index_float)
-            t_interp = index_float - index
-            
-            if index < palette_size - 1:
-                r = int(palette[index][0] * (1.0 - t_interp) + palette[index + 1][0] * t_interp)
-                g = int(palette[index][1] * (1.0 - t_interp) + palette[index + 1][1] * t_interp)
-                b = int(palette[index][2] * (1.0 - t_interp) + palette[index + 1][2] * t_interp)
-            else:
-                r = palette[index][0]
-                g = palette[index][1]
-                b = palette[index][2]
-                
-            r = min(255, int(r * (1.0 + aura_factor * 0.7)))
-            g = min(255, int(g * (1.0 + aura_factor * 0.7)))
-            b = min(255, int(b * (1.0 + aura_factor * 0.7)))
-        
-        image[y, x, 0] = r
-        image[y, x, 1] = g
-        image[y, x, 2] = b
-
-    @cuda.jit
-    def julia_kernel_with_aura(image, width, height, zoom, offset_x, offset_y, max_iter, palette, palette_size, color_mode, aura_intensity, rotation, c_real, c_imag):
-        x, y = cuda.grid(2)
-        if x >= width or y >= height:
-            return
+    La detección (importar numba.cuda e inicializar el driver) tarda varios
+    segundos, así que se hace una sola vez y solo cuando se necesita. El
+    calentamiento y las ventanas pueden preguntar a la vez desde hilos
+    distintos: el cerrojo garantiza una sola detección y un solo aviso.
+    """
+    global _cuda_available
+    if _cuda_available is None:
+        with _cuda_lock:
+            if _cuda_available is None:
+                try:
+                    from numba import cuda
+                    available = bool(cuda.is_available())
+                except ImportError:
+                    available = False
+                if available:
+                    print("✅ CUDA disponible - Aceleración GPU activada")
+                else:
+                    print("⚠️ CUDA no disponible - Usando CPU")
+                _cuda_available = available
+    return _cuda_available
 
-        real = (x - width / 2.0) / zoom + offset_x
-        imag = (y - height / 2.0) / zoom + offset_y
-        
-        # Aplicar rotación
-        if rotation != 0.0:
-            cos_r = math.cos(rotation)
-            sin_r = math.sin(rotation)
-            real_rot = real * cos_r - imag * sin_r
-            imag_rot = real * sin_r + imag * cos_r
-            real, imag = real_rot, imag_rot
 
-        z_real, z_imag = real, imag
-        iter_count = 0
-        z_mag_squared = 0.0
+def __getattr__(name):
+    """Mantiene ``CUDA_AVAILABLE`` como atributo, detectado al consultarlo."""
+    if name == 'CUDA_AVAILABLE':
+        return cuda_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-        while iter_count < max_iter and (z_real * z_real + z_imag * z_imag) < 4.0:
-            temp = z_real * z_real - z_imag * z_imag + c_real
-            z_imag = 2.0 * z_real * z_imag + c_imag
-            z_real = temp
-            iter_count += 1
-            z_mag_squared = z_real * z_real + z_imag * z_imag
 
-        if iter_count == max_iter:
-            image[y, x, 0] = 0
-            image[y, x, 1] = 0
-            image[y, x, 2] = 0
-            return
-            
-        smooth_value = iter_count
-        if iter_count < max_iter:
-            smooth_value = iter_count + 1.0 - min(1.0, z_mag_squared / 4.0)
-            
-        aura_factor = 0.0
-        if z_mag_squared > 0.0:
-            edge_proximity = min(1.0, z_mag_squared / 4.0) 
-            aura_factor = edge_proximity * aura_intensity
-        
-        if color_mode == 0:  
-            color_index = int(iter_count % palette_size)
-            r = palette[color_index][0]
-            g = palette[color_index][1]
-            b = palette[color_index][2]
-            
-            r = min(255, int(r + (255 - r) * aura_factor))
-            g = min(255, int(g + (255 - g) * aura_factor))
-            b = min(255, int(b + (255 - b) * aura_factor))
-        else:  
-            t = smooth_value / max_iter
-            index_float = t * (palette_size - 1)
-            index = int(index_float)
-            t_interp = index_float - index
-            
-            if index < palette_size - 1:
-                r = int(palette[index][0] * (1.0 - t_interp) + palette[index + 1][0] * t_interp)
-                g = int(palette[index][1] * (1.0 - t_interp) + palette[index + 1][1] * t_interp)
-                b = int(palette[index][2] * (1.0 - t_interp) + palette[index + 1][2] * t_interp)
-            else:
-                r = palette[index][0]
-                g = palette[index][1]
-                b = palette[index][2]
-                
-            r = min(255, int(r * (1.0 + aura_factor * 0.7)))
-            g = min(255, int(g * (1.0 + aura_factor * 0.7)))
-            b = min(255, int(b * (1.0 + aura_factor * 0.7)))
-        
-        image[y, x, 0] = r
-        image[y, x, 1] = g
-        image[y, x, 2] = b
+class RenderCancelled(Exception):
+    """Se lanza cuando un render se cancela a mitad de cálculo."""
 
 
 class PaletteGenerator:
@@ -426,11 +311,19 @@ class FractalGenerator:
         self._point_count = 0
         self._max_points = 500000
         self._generation_timeout = 20.0
+        self._render_governor = None
+        self.last_render_plan = None
         
         # Pool de hilos
         max_workers = max(8, cpu_count() * 2)
         self._thread_pool = ThreadPoolExecutor(max_workers=max_workers)
     
+    def get_render_governor(self):
+        """Gobernador de presupuesto con los límites de tiempo de este generador."""
+        if self._render_governor is None:
+            self._render_governor = RenderGovernor.for_generator(self)
+        return self._render_governor
+    
     def _update_palette(self):
         """Actualiza la paleta actual."""
         self.current_palette = self.palette_generator.get_palette(self.color_scheme)
@@ -469,8 +362,18 @@ class FractalGenerator:
         self.offset_y += delta_y
 
 
-class MandelbrotGenerator(FractalGenerator):
-    """Generador del conjunto de Mandelbrot con aceleración CUDA."""
+class EscapeTimeGenerator(FractalGenerator):
+    """Base común para fractales de tiempo de escape definidos por una fórmula."""
+    
+    # Fórmula de iteración (ver formulas.py) y si la vista es de tipo Julia
+    formula = "z**2 + c"
+    julia_mode = False
+    # Indica si existe un kernel CUDA dedicado para este generador
+    supports_cuda = False
+    # Filas por franja cuando el render en CPU admite cancelación
+    band_rows = 64
+    # Pasos de la rejilla del render progresivo (1/16, 1/4 y resolución completa)
+    progressive_strides = (16, 4, 1)
     
     def __init__(self):
         super().__init__()
@@ -478,12 +381,20 @@ class MandelbrotGenerator(FractalGenerator):
         self.aura_intensity = 1.0
         self.color_mode = 1  # 0: Simple, 1: Interpolación suave
         self.zoom = 300.0
-        self.offset_x = -0.5
+        self.offset_x = 0.0
         self.offset_y = 0.0
         self.rotation = 0.0
+        self.c_real = 0.0
+        self.c_imag = 0.0
         self.palette_generator = PaletteGenerator()
         self.current_palette = self.palette_generator.get_palette(0)
         self.current_palette_index = 0
+        self._palette_version = 0
+        self._cuda_resources = None
+        self._compiled_formula = None
+        self._compiled_source = None
+        # Segundos de cálculo del último render progresivo (ver generate_progressive)
+        self.last_compute_time = 0.0
     
     def set_max_iterations(self, max_iter):
         """Establece las iteraciones máximas."""
@@ -495,8 +406,11 @@ class MandelbrotGenerator(FractalGenerator):
     
     def set_color_scheme(self, scheme_index):
         """Cambia el esquema de colores."""
+        if scheme_index == self.current_palette_index:
+            return
         self.current_palette_index = scheme_index
         self.current_palette = self.palette_generator.get_palette(scheme_index)
+        self._palette_version += 1
     
     def set_color_mode(self, mode):
         """Establece el modo de color."""
@@ -528,8 +442,41 @@ class MandelbrotGenerator(FractalGenerator):
         self.offset_x -= delta_x / self.zoom
         self.offset_y -= delta_y / self.zoom
     
-    def generate_fractal(self, width, height, zoom=None, offset_x=None, offset_y=None):
-        """Genera el fractal de Mandelbrot usando CUDA si está disponible."""
+    @property
+    def uses_cuda(self):
+        """Indica si los renders de este generador se hacen en la GPU."""
+        return self.supports_cuda and cuda_available()
+    
+    def snapshot(self):
+        """Copia ligera del estado actual para renderizar en otro hilo.
+
+        La copia comparte paleta, kernels compilados y recursos de CUDA, pero
+        sus parámetros de vista quedan fijos aunque la interfaz siga
+        modificando el original.
+        """
+        # Los recursos se crean en el original para que todas las copias los reutilicen
+        if self.uses_cuda:
+            self._get_cuda_resources()
+        return copy.copy(self)
+    
+    def get_compiled_formula(self):
+        """Obtiene la fórmula compilada del generador."""
+        if self._compiled_formula is None or self._compiled_source != self.formula:
+            self._compiled_formula = compile_formula(self.formula)
+            self._compiled_source = self.formula
+        return self._compiled_formula
+    
+    def _kernel_parameters(self):
+        """Devuelve (julia, c_real, c_imag) para los kernels de campo."""
+        return self.julia_mode, self.c_real, self.c_imag
+    
+    def generate_fractal(self, width, height, zoom=None, offset_x=None, offset_y=None,
+                         cancel_check=None):
+        """Genera el fractal usando CUDA si está disponible.
+
+        ``cancel_check`` es una función opcional sin argumentos; si devuelve
+        True durante el cálculo se lanza ``RenderCancelled``.
+        """
         if zoom is None:
             zoom = self.zoom
         if offset_x is None:
@@ -537,76 +484,227 @@ class MandelbrotGenerator(FractalGenerator):
         if offset_y is None:
             offset_y = self.offset_y
 
-        if CUDA_AVAILABLE:
+        if self.uses_cuda:
+            # Un único lanzamiento de kernel: solo se comprueba antes de empezar
+            if cancel_check is not None and cancel_check():
+                raise RenderCancelled()
+            # El kernel de CUDA calcula y colorea en un solo paso
             return self._generate_with_cuda(width, height, zoom, offset_x, offset_y)
         else:
-            return self._generate_with_cpu(width, height, zoom, offset_x, offset_y)
+            return self._generate_with_cpu(width, height, zoom, offset_x, offset_y,
+                                           cancel_check)
+    
+    def _get_cuda_resources(self):
+        """Obtiene (creando si hace falta) los recursos persistentes de CUDA."""
+        if self._cuda_resources is None:
+            from .cuda_resources import CudaDeviceResources
+            self._cuda_resources = CudaDeviceResources()
+        return self._cuda_resources
+    
+    def _generate_with_cpu(self, width, height, zoom, offset_x, offset_y, cancel_check=None):
+        """Genera usando los kernels numba de CPU (campo de iteraciones + color).
+
+        Con ``cancel_check`` el campo se calcula por franjas de filas y la
+        cancelación se comprueba entre franjas.
+        """
+        if cancel_check is None:
+            iters = self.compute_field(width, height, zoom, offset_x, offset_y)
+        else:
+            iters = np.empty((height, width), dtype=np.int32)
+            for y0 in range(0, height, self.band_rows):
+                if cancel_check():
+                    raise RenderCancelled()
+                rows = min(self.band_rows, height - y0)
+                self.compute_field(width, height, zoom, offset_x, offset_y,
+                                   y0=y0, rows=rows, out=iters[y0:y0 + rows])
+            if cancel_check():
+                raise RenderCancelled()
+        return self.colorize_field(iters)
+    
+    def generate_progressive(self, width, height, zoom=None, offset_x=None, offset_y=None,
+                             cancel_check=None, strides=None, out=None):
+        """Genera el fractal por pasadas de grueso a fino.
+
+        Es un generador que produce ``(stride, image)`` al terminar cada
+        pasada: ``image`` es la rejilla de paso ``stride`` coloreada (de
+        tamaño ``ceil(height / stride) x ceil(width / stride)``) y la última
+        pasada es la imagen completa. Cada pasada solo calcula los píxeles que
+        no calcularon las anteriores. Con CUDA se produce una única pasada.
+        Si se pasa ``out`` (int32 de ``height x width``) el campo de
+        iteraciones se escribe ahí (salvo con CUDA). Al entregar cada pasada,
+        ``last_compute_time`` son los segundos de cálculo (sin colorear)
+        acumulados hasta ella.
+        """
+        if zoom is None:
+            zoom = self.zoom
+        if offset_x is None:
+            offset_x = self.offset_x
+        if offset_y is None:
+            offset_y = self.offset_y
+        if strides is None:
+            strides = self.progressive_strides
+
+        self.last_compute_time = 0.0
+        if self.uses_cuda:
+            start = time.perf_counter()
+            image = self.generate_fractal(width, height, zoom, offset_x, offset_y, cancel_check)
+            self.last_compute_time = time.perf_counter() - start
+            yield 1, image
+            return
+
+        julia, c_real, c_imag = self._kernel_parameters()
+        formula = self.get_compiled_formula()
+        iters = np.zeros((height, width), dtype=np.int32) if out is None else out
+        previous = 0
+        for stride in strides:
+            start = time.perf_counter()
+            # Franjas alineadas con la rejilla para poder cancelar entre ellas
+            band = max(stride, self.band_rows - self.band_rows % stride)
+            for y0 in range(0, height, band):
+                if cancel_check is not None and cancel_check():
+                    raise RenderCancelled()
+                rows = min(band, height - y0)
+                formula.compute_strided(
+                    iters[y0:y0 + rows], 0, y0, width, height, zoom, offset_x, offset_y,
+                    self.rotation, self.max_iter, stride, previous, julia, c_real, c_imag
+                )
+            if cancel_check is not None and cancel_check():
+                raise RenderCancelled()
+            self.last_compute_time += time.perf_counter() - start
+            # La rejilla de cada pasada contiene la de la anterior (pasos divisores)
+            yield stride, self.colorize_field(iters[::stride, ::stride])
+            previous = stride
+    
+    def refine_iterations(self, iters, width, height, zoom=None, offset_x=None, offset_y=None,
+                          max_iter_cap=REFINE_MAX_ITER, min_escaped=REFINE_MIN_ESCAPED,
+                          cancel_check=None):
+        """Refina un campo ya calculado con límites de iteraciones crecientes.
+
+        ``iters`` es el campo de la vista calculado con ``self.max_iter``; se
+        modifica en el sitio. Cada pasada duplica el límite (hasta
+        ``max_iter_cap``) y continúa solo los píxeles que no escaparon,
+        partiendo del z en que se quedaron. Produce ``(max_iter, image)`` tras
+        cada pasada y termina cuando escapa menos de la fracción
+        ``min_escaped`` de los píxeles. Con CUDA no hace nada.
+        """
+        if zoom is None:
+            zoom = self.zoom
+        if offset_x is None:
+            offset_x = self.offset_x
+        if offset_y is None:
+            offset_y = self.offset_y
+        if self.uses_cuda:
+            return
+
+        julia, c_real, c_imag = self._kernel_parameters()
+        formula = self.get_compiled_formula()
+        z_real = np.empty((height, width), dtype=np.float64)
+        z_imag = np.empty((height, width), dtype=np.float64)
+        current = self.max_iter
+        resume = False
+        while current < max_iter_cap:
+            target = min(max_iter_cap, current * 2)
+            escaped = 0
+            for y0 in range(0, height, self.band_rows):
+                if cancel_check is not None and cancel_check():
+                    raise RenderCancelled()
+                y1 = min(height, y0 + self.band_rows)
+                escaped += formula.compute_continue(
+                    iters[y0:y1], z_real[y0:y1], z_imag[y0:y1], 0, y0, width, height,
+                    zoom, offset_x, offset_y, self.rotation, current, target, resume,
+                    julia, c_real, c_imag
+                )
+            if cancel_check is not None and cancel_check():
+                raise RenderCancelled()
+            yield target, self.colorize_field(iters, target)
+            if escaped < min_escaped * width * height:
+                return
+            current = target
+            resume = True
     
-    def _generate_with_cuda(self, width, height, zoom, offset_x, offset_y):
-        """Genera usando CUDA."""
-        image = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        d_image = cuda.to_device(image)
-        
-        palette_array = np.array(self.current_palette, dtype=np.uint8)
-        d_palette = cuda.to_device(palette_array)
+    def compute_field(self, width, height, zoom=None, offset_x=None, offset_y=None,
+                      x0=0, y0=0, cols=None, rows=None, max_iter=None, out=None):
+        """Calcula el campo de iteraciones (sin colorear) de una ventana de la vista.
 
-        threads_per_block = (16, 16)
-        blocks_per_grid_x = (width + threads_per_block[0] - 1) // threads_per_block[0]
-        blocks_per_grid_y = (height + threads_per_block[1] - 1) // threads_per_block[1]
-        blocks_per_grid = (blocks_per_grid_x, blocks_per_grid_y)
+        La ventana empieza en el píxel (x0, y0) de una vista de
+        ``width x height`` y mide ``cols x rows`` (por defecto, la vista entera).
+        Si se pasa ``out`` (int32 de ``rows x cols``) se escribe ahí y se
+        devuelve ``out``; puede ser una vista no contigua, como la ventana de
+        una tesela dentro de un campo mayor.
+        """
+        if zoom is None:
+            zoom = self.zoom
+        if offset_x is None:
+            offset_x = self.offset_x
+        if offset_y is None:
+            offset_y = self.offset_y
+        if max_iter is None:
+            max_iter = self.max_iter
+        cols = width - x0 if cols is None else cols
+        rows = height - y0 if rows is None else rows
 
-        mandelbrot_kernel_with_aura[blocks_per_grid, threads_per_block](
-            d_image, width, height, zoom, offset_x, offset_y, self.max_iter, 
-            d_palette, len(self.current_palette), self.color_mode, 
-            self.aura_intensity, self.rotation
+        julia, c_real, c_imag = self._kernel_parameters()
+        iters = np.empty((rows, cols), dtype=np.int32) if out is None else out
+        self.get_compiled_formula().compute(
+            iters, x0, y0, width, height, zoom, offset_x, offset_y,
+            self.rotation, max_iter, julia, c_real, c_imag
         )
+        return iters
+    
+    def colorize_field(self, iters, max_iter=None):
+        """Colorea un campo de iteraciones con la paleta y el modo actuales."""
+        if max_iter is None:
+            max_iter = self.max_iter
+        return colorize_field(iters, max_iter, self.current_palette,
+                              self.color_mode, self.aura_intensity)
 
-        image = d_image.copy_to_host()
-        return image
+
+class MandelbrotGenerator(EscapeTimeGenerator):
+    """Generador del conjunto de Mandelbrot con aceleración CUDA."""
     
-    def _generate_with_cpu(self, width, height, zoom, offset_x, offset_y):
-        """Genera usando CPU como fallback."""
-        image = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        for py in range(height):
-            for px in range(width):
-                real = (px - width / 2.0) / zoom + offset_x
-                imag = (py - height / 2.0) / zoom + offset_y
-                
-                # Aplicar rotación
-                if self.rotation != 0.0:
-                    cos_r = math.cos(self.rotation)
-                    sin_r = math.sin(self.rotation)
-                    real_rot = real * cos_r - imag * sin_r
-                    imag_rot = real * sin_r + imag * cos_r
-                    real, imag = real_rot, imag_rot
-                
-                c = complex(real, imag)
-                z = 0
-                iterations = 0
-                
-                while abs(z) <= 2 and iterations < self.max_iter:
-                    z = z * z + c
-                    iterations += 1
-                
-                if iterations == self.max_iter:
-                    color = (0, 0, 0)
-                else:
-                    # Usar paleta
-                    if self.color_mode == 0:  # Simple
-                        color_index = iterations % len(self.current_palette)
-                        color = self.current_palette[color_index]
-                    else:  # Interpolación suave
-                        t = iterations / self.max_iter
-                        index = int(t * (len(self.current_palette) - 1))
-                        color = self.current_palette[min(index, len(self.current_palette) - 1)]
-                
-                image[py, px] = color
-        
-        return image
+    supports_cuda = True
+    
+    def __init__(self):
+        super().__init__()
+        self.offset_x = -0.5
+        self.offset_y = 0.0
+    
+    def _kernel_parameters(self):
+        """Mandelbrot: z parte de 0 y c es el píxel."""
+        return False, 0.0, 0.0
+    
+    def _generate_with_cuda(self, width, height, zoom, offset_x, offset_y):
+        """Genera usando CUDA con buffers persistentes en el dispositivo."""
+        from .cuda_kernels import mandelbrot_kernel_with_aura
+        resources = self._get_cuda_resources()
+        # Los buffers se comparten con las copias que renderizan en otros hilos
+        with resources.lock:
+            d_image = resources.get_image_buffer(width, height)
+            d_palette = resources.get_palette(self.current_palette, self._palette_version)
+
+            threads_per_block = (16, 16)
+            blocks_per_grid_x = (width + threads_per_block[0] - 1) // threads_per_block[0]
+            blocks_per_grid_y = (height + threads_per_block[1] - 1) // threads_per_block[1]
+            blocks_per_grid = (blocks_per_grid_x, blocks_per_grid_y)
+
+            mandelbrot_kernel_with_aura[blocks_per_grid, threads_per_block, resources.stream](
+                d_image, width, height, zoom, offset_x, offset_y, self.max_iter, 
+                d_palette, resources.palette_size, self.color_mode, 
+                self.aura_intensity, self.rotation
+            )
+
+            return resources.read_image()
+    
+    @staticmethod
+    def view_for_bounds(width, height, xmin, xmax, ymin, ymax):
+        """Calcula (zoom, offset_x, offset_y) que muestran los límites dados."""
+        center_x = (xmin + xmax) / 2
+        center_y = (ymin + ymax) / 2
+        range_x = xmax - xmin
+        range_y = ymax - ymin
+        return min(width / range_x, height / range_y), center_x, center_y
     
-    def generate(self, width, height, xmin, xmax, ymin, ymax, max_iter):
+    def generate(self, width, height, xmin, xmax, ymin, ymax, max_iter, cancel_check=None):
         """Método de compatibilidad para generar con parámetros específicos."""
         # Configurar temporalmente los parámetros
         old_max_iter = self.max_iter
@@ -616,170 +714,107 @@ class MandelbrotGenerator(FractalGenerator):
         
         self.max_iter = max_iter
         # Calcular zoom y offset basado en los límites
-        center_x = (xmin + xmax) / 2
-        center_y = (ymin + ymax) / 2
-        range_x = xmax - xmin
-        range_y = ymax - ymin
-        
-        self.offset_x = center_x
-        self.offset_y = center_y
-        self.zoom = min(width / range_x, height / range_y)
-        
-        # Generar
-        result = self.generate_fractal(width, height)
+        self.zoom, self.offset_x, self.offset_y = self.view_for_bounds(
+            width, height, xmin, xmax, ymin, ymax
+        )
         
-        # Restaurar parámetros
-        self.max_iter = old_max_iter
-        self.zoom = old_zoom
-        self.offset_x = old_offset_x
-        self.offset_y = old_offset_y
+        # Generar (restaurando los parámetros aunque el render se cancele)
+        try:
+            result = self.generate_fractal(width, height, cancel_check=cancel_check)
+        finally:
+            self.max_iter = old_max_iter
+            self.zoom = old_zoom
+            self.offset_x = old_offset_x
+            self.offset_y = old_offset_y
         
         return result
 
 
-class JuliaGenerator(FractalGenerator):
+# Constantes c predefinidas del conjunto de Julia
+JULIA_PRESETS = {
+    "Clásico": (-0.7, 0.27015),
+    "Dragón": (-0.835, -0.2321),
+    "Espiral": (-0.8, 0.156),
+    "Hoja": (-0.75, 0.11),
+    "Rayo": (-0.4, 0.6),
+    "Coral": (0.285, 0.01),
+    "Tormenta": (-0.123, 0.745),
+    "Galaxia": (-0.194, 0.6557),
+}
+
+
+class JuliaGenerator(EscapeTimeGenerator):
     """Generador del conjunto de Julia con aceleración CUDA."""
     
+    julia_mode = True
+    supports_cuda = True
+    
     def __init__(self):
         super().__init__()
-        self.max_iter = 200
-        self.aura_intensity = 1.0
-        self.color_mode = 1  # 0: Simple, 1: Interpolación suave
-        self.zoom = 300.0
-        self.offset_x = 0.0
-        self.offset_y = 0.0
-        self.rotation = 0.0
         self.c_real = -0.7
         self.c_imag = 0.27015
-        self.palette_generator = PaletteGenerator()
-        self.current_palette = self.palette_generator.get_palette(0)
-        self.current_palette_index = 0
     
     def set_julia_constant(self, real, imag):
         """Establece la constante de Julia."""
         self.c_real = real
         self.c_imag = imag
     
-    def set_max_iterations(self, max_iter):
-        """Establece las iteraciones máximas."""
-        self.max_iter = max(1, min(5000, max_iter))
-    
-    def set_aura_intensity(self, intensity):
-        """Establece la intensidad del aura."""
-        self.aura_intensity = max(0.0, min(5.0, intensity))
-    
-    def set_color_scheme(self, scheme_index):
-        """Cambia el esquema de colores."""
-        self.current_palette_index = scheme_index
-        self.current_palette = self.palette_generator.get_palette(scheme_index)
-    
-    def set_color_mode(self, mode):
-        """Establece el modo de color."""
-        self.color_mode = mode
-    
-    def set_zoom(self, zoom):
-        """Establece el zoom."""
-        self.zoom = max(1.0, zoom)
-    
-    def set_offset(self, offset_x, offset_y):
-        """Establece el offset."""
-        self.offset_x = offset_x
-        self.offset_y = offset_y
-    
-    def set_rotation(self, rotation):
-        """Establece la rotación."""
-        self.rotation = rotation
-    
-    def zoom_in(self, factor=1.5):
-        """Aumenta el zoom."""
-        self.zoom *= factor
-    
-    def zoom_out(self, factor=1.5):
-        """Disminuye el zoom."""
-        self.zoom /= factor
-    
-    def move(self, delta_x, delta_y):
-        """Mueve la vista."""
-        self.offset_x -= delta_x / self.zoom
-        self.offset_y -= delta_y / self.zoom
-    
-    def generate_fractal(self, width, height, zoom=None, offset_x=None, offset_y=None):
-        """Genera el fractal de Julia usando CUDA si está disponible."""
+    def compute_field_batch(self, c_values, width, height, zoom=None,
+                            offset_x=None, offset_y=None, max_iter=None):
+        """Calcula en una sola pasada los campos de iteraciones para muchas c.
+
+        Devuelve un array ``(n, height, width)`` de iteraciones.
+        """
         if zoom is None:
             zoom = self.zoom
         if offset_x is None:
             offset_x = self.offset_x
         if offset_y is None:
             offset_y = self.offset_y
+        if max_iter is None:
+            max_iter = self.max_iter
 
-        if CUDA_AVAILABLE:
-            return self._generate_with_cuda(width, height, zoom, offset_x, offset_y)
-        else:
-            return self._generate_with_cpu(width, height, zoom, offset_x, offset_y)
+        c_array = np.asarray(c_values, dtype=np.float64).reshape(-1, 2)
+        iters = np.empty((len(c_array), height, width), dtype=np.int32)
+        self.get_compiled_formula().compute_batch(
+            iters, c_array, zoom, offset_x, offset_y, self.rotation, max_iter
+        )
+        return iters
+    
+    def generate_batch(self, c_values, width, height, zoom=None,
+                       offset_x=None, offset_y=None, max_iter=None):
+        """Genera un lote de imágenes Julia pequeñas, una por cada (c_real, c_imag).
+
+        El cálculo, el despacho JIT y la reserva de buffers se pagan una sola
+        vez para todo el lote. Devuelve un array ``(n, height, width, 3)``.
+        """
+        if max_iter is None:
+            max_iter = self.max_iter
+        iters = self.compute_field_batch(c_values, width, height, zoom,
+                                         offset_x, offset_y, max_iter)
+        return self.colorize_field(iters, max_iter)
     
     def _generate_with_cuda(self, width, height, zoom, offset_x, offset_y):
-        """Genera usando CUDA."""
-        image = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        d_image = cuda.to_device(image)
-        
-        palette_array = np.array(self.current_palette, dtype=np.uint8)
-        d_palette = cuda.to_device(palette_array)
+        """Genera usando CUDA con buffers persistentes en el dispositivo."""
+        from .cuda_kernels import julia_kernel_with_aura
+        resources = self._get_cuda_resources()
+        # Los buffers se comparten con las copias que renderizan en otros hilos
+        with resources.lock:
+            d_image = resources.get_image_buffer(width, height)
+            d_palette = resources.get_palette(self.current_palette, self._palette_version)
 
-        threads_per_block = (16, 16)
-        blocks_per_grid_x = (width + threads_per_block[0] - 1) // threads_per_block[0]
-        blocks_per_grid_y = (height + threads_per_block[1] - 1) // threads_per_block[1]
-        blocks_per_grid = (blocks_per_grid_x, blocks_per_grid_y)
+            threads_per_block = (16, 16)
+            blocks_per_grid_x = (width + threads_per_block[0] - 1) // threads_per_block[0]
+            blocks_per_grid_y = (height + threads_per_block[1] - 1) // threads_per_block[1]
+            blocks_per_grid = (blocks_per_grid_x, blocks_per_grid_y)
 
-        julia_kernel_with_aura[blocks_per_grid, threads_per_block](
-            d_image, width, height, zoom, offset_x, offset_y, self.max_iter, 
-            d_palette, len(self.current_palette), self.color_mode, 
-            self.aura_intensity, self.rotation, self.c_real, self.c_imag
-        )
+            julia_kernel_with_aura[blocks_per_grid, threads_per_block, resources.stream](
+                d_image, width, height, zoom, offset_x, offset_y, self.max_iter, 
+                d_palette, resources.palette_size, self.color_mode, 
+                self.aura_intensity, self.rotation, self.c_real, self.c_imag
+            )
 
-        image = d_image.copy_to_host()
-        return image
-    
-    def _generate_with_cpu(self, width, height, zoom, offset_x, offset_y):
-        """Genera usando CPU como fallback."""
-        image = np.zeros((height, width, 3), dtype=np.uint8)
-        c = complex(self.c_real, self.c_imag)
-        
-        for py in range(height):
-            for px in range(width):
-                real = (px - width / 2.0) / zoom + offset_x
-                imag = (py - height / 2.0) / zoom + offset_y
-                
-                # Aplicar rotación
-                if self.rotation != 0.0:
-                    cos_r = math.cos(self.rotation)
-                    sin_r = math.sin(self.rotation)
-                    real_rot = real * cos_r - imag * sin_r
-                    imag_rot = real * sin_r + imag * cos_r
-                    real, imag = real_rot, imag_rot
-                
-                z = complex(real, imag)
-                iterations = 0
-                
-                while abs(z) <= 2 and iterations < self.max_iter:
-                    z = z * z + c
-                    iterations += 1
-                
-                if iterations == self.max_iter:
-                    color = (0, 0, 0)
-                else:
-                    # Usar paleta
-                    if self.color_mode == 0:  # Simple
-                        color_index = iterations % len(self.current_palette)
-                        color = self.current_palette[color_index]
-                    else:  # Interpolación suave
-                        t = iterations / self.max_iter
-                        index = int(t * (len(self.current_palette) - 1))
-                        color = self.current_palette[min(index, len(self.current_palette) - 1)]
-                
-                image[py, px] = color
-        
-        return image
+            return resources.read_image()
     
     def generate_julia(self, width, height, xmin, xmax, ymin, ymax, max_iter, c_real, c_imag):
         """Método de compatibilidad para generar Julia con parámetros específicos."""
@@ -819,6 +854,32 @@ class JuliaGenerator(FractalGenerator):
         return result
 
 
+class FormulaGenerator(EscapeTimeGenerator):
+    """Generador de tiempo de escape a partir de una fórmula del usuario.
+
+    Ejemplos: ``"abs(z)**2 + c"`` (Burning Ship), ``"conj(z)**2 + c"``
+    (Tricorn) o ``"z**3 + c"`` (Multibrot). Se calcula en CPU con kernels
+    numba generados y cacheados en disco.
+    """
+    
+    def __init__(self, formula="z**2 + c", julia_mode=False):
+        super().__init__()
+        self.set_formula(formula)
+        self.julia_mode = julia_mode
+        if not julia_mode:
+            self.offset_x = -0.5
+    
+    def set_formula(self, formula):
+        """Establece la fórmula de iteración (lanza FormulaError si es inválida)."""
+        self.formula = parse_formula(formula)
+        self._compiled_formula = None
+    
+    def set_julia_constant(self, real, imag):
+        """Establece la constante c usada en modo Julia."""
+        self.c_real = real
+        self.c_imag = imag
+
+
 class KochGenerator(FractalGenerator):
     """Generador de curvas de Koch y fractales geométricos."""
     
@@ -880,24 +941,37 @@ class KochGenerator(FractalGenerator):
         
         return points
     
-    def generate_fractal(self, width, height):
-        """Genera el fractal según el tipo seleccionado."""
+    def generate_fractal(self, width, height, time_budget=None):
+        """Genera el fractal según el tipo seleccionado.
+
+        La profundidad de recursión se limita con el gobernador de presupuesto;
+        el plan usado queda en ``last_render_plan``.
+        """
         image = np.full((height, width, 3), self.background_color, dtype=np.uint8)
+        governor = self.get_render_governor()
+        self.last_render_plan = None
+        start = time.perf_counter()
         
         center_x = width // 2 + self.offset_x * width
         center_y = height // 2 + self.offset_y * height
         scale = min(width, height) * 0.3 * self.zoom
+        elements = 0
         
         try:
             if self.koch_type == 0:  # Copo de Nieve
                 points = self._generate_snowflake((center_x, center_y), scale, self.iterations)
+                elements = len(points)
                 if points:
                     self._draw_polygon(image, points, width, height)
             
             elif self.koch_type == 6:  # Sierpinski
-                triangles = self._generate_sierpinski_triangle((center_x, center_y), scale, self.iterations)
+                plan = governor.plan_depth(self.iterations, 3, time_budget=time_budget)
+                self.last_render_plan = plan
+                triangles = self._generate_sierpinski_triangle((center_x, center_y), scale, plan.depth)
+                elements = len(triangles)
                 if triangles:
                     self._draw_sierpinski_triangles(image, triangles, width, height)
+                governor.record_geometry(len(triangles), time.perf_counter() - start)
             
             # Agregar otros tipos según sea necesario...
             
@@ -906,6 +980,8 @@ class KochGenerator(FractalGenerator):
             if 0 <= center_x < width and 0 <= center_y < height:
                 image[int(center_y), int(center_x)] = (255, 255, 255)
         
+        performance_monitor.record_stage(STAGE_COMPUTE, time.perf_counter() - start,
+                                         elements=elements)
         return image
     
     def _generate_snowflake(self, center, radius, iterations):
@@ -0,0 +1,140 @@
+"""
+Exportación por Franjas
+Renderiza imágenes de cualquier tamaño en franjas paralelas que se escriben en streaming
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..utils.config import EXPORT_BAND_PIXELS, JOB_SLICE_PIXELS, STAGE_EXPORT, performance_monitor
+from ..utils.job_queue import PRIORITY_EXPORT, get_job_queue
+from ..utils.png_writer import StreamingPNGWriter, encode_png_band
+from .fractal_generators import RenderCancelled
+
+
+def band_rows_for(width, band_pixels=EXPORT_BAND_PIXELS):
+    """Filas por franja para que cada una tenga unos ``band_pixels`` píxeles."""
+    return max(1, band_pixels // max(1, width))
+
+
+def export_png(generator, path, width, height, zoom=None, offset_x=None, offset_y=None,
+               band_rows=None, workers=None, progress=None, cancel_check=None):
+    """Exporta un fractal de tiempo de escape a PNG sin tener la imagen en memoria.
+
+    Las franjas se calculan, colorean y comprimen en paralelo (los kernels
+    numba y zlib liberan el GIL) y se escriben en orden según terminan. Como
+    mucho hay ``2 * workers`` franjas en vuelo, de modo que la memoria
+    depende del tamaño de franja y no del de la imagen.
+
+    ``progress(filas_escritas, alto)`` se llama tras escribir cada franja.
+    Si ``cancel_check`` devuelve True se descarta el archivo y se lanza
+    ``RenderCancelled``.
+    """
+    if zoom is None:
+        zoom = generator.zoom
+    if offset_x is None:
+        offset_x = generator.offset_x
+    if offset_y is None:
+        offset_y = generator.offset_y
+
+    def render_band(y0, rows):
+        field = generator.compute_field(width, height, zoom, offset_x, offset_y,
+                                        y0=y0, rows=rows)
+        return generator.colorize_field(field)
+
+    return export_bands(path, width, height, render_band, band_rows, workers,
+                        progress, cancel_check)
+
+
+def submit_export_png(generator, path, width, height, zoom=None, offset_x=None,
+                      offset_y=None, queue=None):
+    """Encola ``export_png`` como exportación en segundo plano y devuelve el trabajo.
+
+    Se usan franjas pequeñas (``JOB_SLICE_PIXELS``) para que la exportación
+    ceda enseguida el turno a los renders interactivos y la precarga.
+    """
+    queue = queue if queue is not None else get_job_queue()
+    band_rows = band_rows_for(width, JOB_SLICE_PIXELS)
+
+    def run(job):
+        return export_png(generator, path, width, height, zoom, offset_x, offset_y,
+                          band_rows=band_rows, progress=job.report,
+                          cancel_check=job.checkpoint)
+
+    return queue.submit(run, PRIORITY_EXPORT, f"Exportando {os.path.basename(path)}")
+
+
+def export_field_png(field, path, colorize, width=None, height=None, band_rows=None,
+                     workers=None, progress=None, cancel_check=None):
+    """Colorea y exporta a PNG un campo de iteraciones ya calculado.
+
+    ``field`` puede ser un ``np.memmap``: solo se leen las filas de cada
+    franja. Con otro ``width``/``height`` el campo se remuestrea (vecino más
+    cercano), así que un render grande se puede recolorear a cualquier
+    resolución sin recalcularlo. ``colorize`` convierte un campo en RGB
+    (por ejemplo ``generator.colorize_field``).
+    """
+    field_height, field_width = field.shape
+    width = width or field_width
+    height = height or field_height
+    cols = ((np.arange(width) + 0.5) * field_width / width).astype(np.intp)
+    all_rows = ((np.arange(height) + 0.5) * field_height / height).astype(np.intp)
+
+    def render_band(y0, rows):
+        band = np.asarray(field[all_rows[y0:y0 + rows]])
+        if width != field_width:
+            band = band[:, cols]
+        return colorize(band)
+
+    return export_bands(path, width, height, render_band, band_rows, workers,
+                        progress, cancel_check)
+
+
+def export_bands(path, width, height, render_band, band_rows=None, workers=None,
+                 progress=None, cancel_check=None):
+    """Escribe un PNG con las franjas RGB que produce ``render_band(y0, filas)``.
+
+    Las franjas se producen y comprimen en paralelo y se escriben en orden;
+    como mucho hay ``2 * workers`` en vuelo. ``cancel_check`` se consulta
+    también antes de empezar cada franja, así que puede bloquear para
+    pausar la exportación. Cada exportación completa es una muestra de
+    ``STAGE_EXPORT``.
+    """
+    if band_rows is None:
+        band_rows = band_rows_for(width)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    def encode_band(y0, rows):
+        if cancel_check is not None and cancel_check():
+            raise RenderCancelled()
+        return encode_png_band(render_band(y0, rows), last=y0 + rows >= height)
+
+    bands = [(y0, min(band_rows, height - y0)) for y0 in range(0, height, band_rows)]
+    pending = deque()
+    with performance_monitor.measure(STAGE_EXPORT, pixels=width * height), \
+            StreamingPNGWriter(path, width, height) as writer, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for y0, rows in bands:
+                while len(pending) >= 2 * workers:
+                    _write_next(writer, pending, height, progress, cancel_check)
+                pending.append(executor.submit(encode_band, y0, rows))
+            while pending:
+                _write_next(writer, pending, height, progress, cancel_check)
+        finally:
+            for future in pending:
+                future.cancel()
+    return path
+
+
+def _write_next(writer, pending, height, progress, cancel_check):
+    """Espera la franja más antigua y la escribe."""
+    if cancel_check is not None and cancel_check():
+        raise RenderCancelled()
+    writer.write_band(pending.popleft().result())
+    if progress is not None:
+        progress(writer.rows_written, height)
@@ -0,0 +1,352 @@
+"""
+Caché de Teselas
+Teselas de un quadtree del plano complejo con campos de iteraciones reutilizables
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from ..utils.config import TILE_CACHE_BYTES, TILE_DISK_MIN_TIME, TILE_SIZE, performance_monitor
+from .fractal_generators import RenderCancelled
+
+# Lado (en unidades del plano complejo) de la tesela del nivel 0
+TILE_BASE_EXTENT = 4.0
+# Nivel máximo del quadtree (más allá se agota la precisión de float64)
+MAX_TILE_LEVEL = 48
+
+# Identifica una tesela: tipo de fractal, parámetros y posición en el quadtree
+TileKey = namedtuple(
+    "TileKey",
+    ["fractal", "formula", "c_real", "c_imag", "max_iter", "rotation", "level", "tx", "ty"]
+)
+
+
+def tile_extent(level):
+    """Lado de una tesela del nivel dado en unidades del plano complejo."""
+    return TILE_BASE_EXTENT / (2 ** level)
+
+
+def level_for_zoom(zoom, tile_size=TILE_SIZE):
+    """Nivel del quadtree cuya resolución es la más cercana a la de la vista."""
+    level = round(math.log2(max(1e-12, TILE_BASE_EXTENT * zoom / tile_size)))
+    return max(0, min(MAX_TILE_LEVEL, level))
+
+
+def detail_level_for_zoom(zoom, tile_size=TILE_SIZE):
+    """Primer nivel del quadtree con al menos la resolución de la vista.
+
+    Es el nivel de las teselas del cuadro definitivo: componerlo con ellas
+    da el mismo detalle que calcularlo directamente.
+    """
+    level = math.ceil(math.log2(max(1e-12, TILE_BASE_EXTENT * zoom / tile_size)) - 1e-9)
+    return max(0, min(MAX_TILE_LEVEL, level))
+
+
+def tile_range(width, height, zoom, offset_x, offset_y, level):
+    """Índices ``(tx0, tx1, ty0, ty1)`` (inclusivos) de las teselas visibles en un nivel."""
+    extent = tile_extent(level)
+    half_width = width / 2.0 / zoom
+    half_height = height / 2.0 / zoom
+    return (math.floor((offset_x - half_width) / extent),
+            math.floor((offset_x + half_width) / extent),
+            math.floor((offset_y - half_height) / extent),
+            math.floor((offset_y + half_height) / extent))
+
+
+def prefetch_tiles(width, height, zoom, offset_x, offset_y, direction=(0.0, 0.0),
+                   tile_size=TILE_SIZE, max_tiles=256, detail_zoom=None):
+    """Teselas ``(nivel, tx, ty)`` a precalcular alrededor de una vista.
+
+    Con ``detail_zoom`` (el zoom del cuadro definitivo) van primero las
+    teselas visibles en su nivel de detalle, con las que se compone ese
+    cuadro al volver a la vista. Después las visibles en el nivel de la vista
+    y el anillo que las rodea, empezando por las que están en la dirección
+    ``direction`` del último desplazamiento; por último las visibles un
+    nivel más adentro y un nivel más afuera (con su anillo).
+    """
+    level = level_for_zoom(zoom, tile_size)
+    dx, dy = direction
+    norm = math.hypot(dx, dy)
+    if norm > 0:
+        dx, dy = dx / norm, dy / norm
+
+    def around(tile_level, margin):
+        tx0, tx1, ty0, ty1 = tile_range(width, height, zoom, offset_x, offset_y, tile_level)
+        center_x = (tx0 + tx1) / 2.0
+        center_y = (ty0 + ty1) / 2.0
+        tiles = []
+        for ty in range(ty0 - margin, ty1 + margin + 1):
+            for tx in range(tx0 - margin, tx1 + margin + 1):
+                visible = tx0 <= tx <= tx1 and ty0 <= ty <= ty1
+                rx, ry = tx - center_x, ty - center_y
+                distance = math.hypot(rx, ry)
+                # Alineación con la dirección del desplazamiento (1 = justo delante)
+                alignment = (rx * dx + ry * dy) / distance if distance > 0 else 0.0
+                tiles.append((not visible, -alignment, distance, (tile_level, tx, ty)))
+        tiles.sort()
+        return [tile for *_, tile in tiles]
+
+    tiles = []
+    if detail_zoom is not None:
+        tiles += around(detail_level_for_zoom(detail_zoom, tile_size), 0)
+    tiles += around(level, 1)
+    if level < MAX_TILE_LEVEL:
+        tiles += around(level + 1, 0)
+    if level > 0:
+        tiles += around(level - 1, 1)
+    # El nivel de detalle puede coincidir con uno de los de navegación
+    return list(dict.fromkeys(tiles))[:max_tiles]
+
+
+def tile_key(generator, level, tx, ty, max_iter=None):
+    """Clave de caché de una tesela para el estado actual de un generador."""
+    if max_iter is None:
+        max_iter = generator.max_iter
+    julia, c_real, c_imag = generator._kernel_parameters()
+    if not julia:
+        c_real = c_imag = 0.0
+    return TileKey(type(generator).__name__, generator.formula, float(c_real), float(c_imag),
+                   int(max_iter), float(generator.rotation), level, tx, ty)
+
+
+def compute_tile(generator, level, tx, ty, tile_size=TILE_SIZE, max_iter=None):
+    """Calcula el campo de iteraciones de una tesela."""
+    extent = tile_extent(level)
+    return generator.compute_field(
+        tile_size, tile_size, zoom=tile_size / extent,
+        offset_x=(tx + 0.5) * extent, offset_y=(ty + 0.5) * extent,
+        max_iter=max_iter
+    )
+
+
+class TileCache:
+    """Caché LRU de campos de iteraciones con un presupuesto en bytes.
+
+    Guarda iteraciones y no píxeles coloreados: los cambios de paleta, modo
+    de color o aura siguen aprovechando las teselas calculadas. Es segura
+    entre hilos.
+
+    Con ``disk_store`` (un ``DiskTileStore``) actúa como primer nivel: las
+    teselas que no están en memoria se buscan en disco, y las que tardan al
+    menos ``disk_min_time`` segundos en calcularse se guardan también allí.
+    """
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES, disk_store=None,
+                 disk_min_time=TILE_DISK_MIN_TIME):
+        self.max_bytes = max_bytes
+        self.disk_store = disk_store
+        self.disk_min_time = disk_min_time
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        # Estadísticas
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._tiles
+
+    def get(self, key):
+        """Devuelve la tesela (o None) y la marca como usada recientemente."""
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                performance_monitor.increment("tile_cache_misses")
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            performance_monitor.increment("tile_cache_hits")
+            return tile
+
+    def put(self, key, field):
+        """Guarda una tesela, expulsando las menos usadas si no cabe."""
+        field.setflags(write=False)
+        with self._lock:
+            previous = self._tiles.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            if field.nbytes > self.max_bytes:
+                return
+            self._tiles[key] = field
+            self.current_bytes += field.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._tiles.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def lookup(self, key):
+        """Busca una tesela en memoria y, si no está, en disco (sin calcularla)."""
+        tile = self.get(key)
+        if tile is None and self.disk_store is not None:
+            tile = self.disk_store.get(key)
+            if tile is not None:
+                self.put(key, tile)
+        return tile
+
+    def get_or_compute(self, generator, level, tx, ty, tile_size=TILE_SIZE, max_iter=None,
+                       draft_max_iter=None):
+        """Devuelve la tesela de la caché o la calcula y la guarda.
+
+        ``max_iter`` (por defecto el del generador) forma parte de la clave.
+        Si ``draft_max_iter`` es menor, una tesela que falta se calcula con
+        esas iteraciones para un cuadro provisional y no se guarda.
+        """
+        return self._get_or_compute(generator, level, tx, ty, tile_size, max_iter,
+                                    draft_max_iter)[0]
+
+    def _get_or_compute(self, generator, level, tx, ty, tile_size=TILE_SIZE, max_iter=None,
+                        draft_max_iter=None):
+        """Como ``get_or_compute``, pero devuelve ``(tesela, calculada)``."""
+        if max_iter is None:
+            max_iter = generator.max_iter
+        key = tile_key(generator, level, tx, ty, max_iter)
+        tile = self.lookup(key)
+        if tile is not None:
+            return tile, False
+        if draft_max_iter is not None and draft_max_iter < max_iter:
+            return compute_tile(generator, level, tx, ty, tile_size, draft_max_iter), True
+
+        start = time.perf_counter()
+        tile = compute_tile(generator, level, tx, ty, tile_size, max_iter)
+        self.put(key, tile)
+        if self.disk_store is not None and time.perf_counter() - start >= self.disk_min_time:
+            self.disk_store.put(key, tile)
+        return tile, True
+
+    def flush(self):
+        """Guarda en disco el índice del almacén persistente."""
+        if self.disk_store is not None:
+            self.disk_store.flush()
+
+    def clear(self):
+        """Vacía la caché (las estadísticas se conservan)."""
+        with self._lock:
+            self._tiles.clear()
+            self.current_bytes = 0
+
+    def get_statistics(self):
+        """Devuelve las estadísticas de la caché."""
+        lookups = self.hits + self.misses
+        return {
+            'tiles': len(self._tiles),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _tile_runs(coords, extent, tile_size):
+    """Agrupa coordenadas ordenadas por tesela: [(índice, inicio, fin, píxeles)]."""
+    indices = np.floor(coords / extent).astype(np.int64)
+    pixels = ((coords - indices * extent) * (tile_size / extent)).astype(np.int64)
+    np.clip(pixels, 0, tile_size - 1, out=pixels)
+    values, starts = np.unique(indices, return_index=True)
+    ends = list(starts[1:]) + [len(coords)]
+    return [(int(value), start, end, pixels[start:end])
+            for value, start, end in zip(values, starts, ends)]
+
+
+def _compose_view_field(generator, width, height, zoom, offset_x, offset_y, level,
+                        fetch_tile, cancel_check=None, tile_size=TILE_SIZE):
+    """Compone el campo de una vista con las teselas de un nivel.
+
+    ``fetch_tile(tx, ty)`` devuelve cada tesela; si devuelve None la
+    composición se abandona y el resultado es None.
+    """
+    if zoom is None:
+        zoom = generator.zoom
+    if offset_x is None:
+        offset_x = generator.offset_x
+    if offset_y is None:
+        offset_y = generator.offset_y
+
+    extent = tile_extent(level)
+    xs = (np.arange(width) - width / 2.0) / zoom + offset_x
+    ys = (np.arange(height) - height / 2.0) / zoom + offset_y
+    column_runs = _tile_runs(xs, extent, tile_size)
+
+    field = np.empty((height, width), dtype=np.int32)
+    for ty, y0, y1, tile_rows in _tile_runs(ys, extent, tile_size):
+        for tx, x0, x1, tile_cols in column_runs:
+            if cancel_check is not None and cancel_check():
+                raise RenderCancelled()
+            tile = fetch_tile(tx, ty)
+            if tile is None:
+                return None
+            field[y0:y1, x0:x1] = tile[np.ix_(tile_rows, tile_cols)]
+    return field
+
+
+def render_view_field(generator, width, height, cache, zoom=None, offset_x=None, offset_y=None,
+                      cancel_check=None, tile_size=TILE_SIZE, max_iter=None):
+    """Compone el campo de iteraciones de una vista a partir de teselas.
+
+    Se usa el nivel del quadtree de resolución más cercana a la vista; las
+    teselas que faltan se calculan y se guardan en ``cache``. ``max_iter``
+    son las iteraciones pedidas por el usuario, con las que se guardan las
+    teselas; si el generador tiene menos (un plan recortado por el
+    gobernador) las que faltan se calculan con las suyas sin guardarse y el
+    campo se recorta a ``generator.max_iter``.
+
+    Devuelve ``(campo, calculado)``, donde ``calculado`` es la fracción de
+    las teselas usadas que hubo que calcular (0 si todo salió de la caché).
+    """
+    if max_iter is None:
+        max_iter = generator.max_iter
+    if zoom is None:
+        zoom = generator.zoom
+    level = level_for_zoom(zoom, tile_size)
+    draft_max_iter = generator.max_iter if generator.max_iter < max_iter else None
+    counts = [0, 0]
+
+    def fetch_tile(tx, ty):
+        tile, computed = cache._get_or_compute(generator, level, tx, ty, tile_size, max_iter,
+                                               draft_max_iter)
+        counts[0] += computed
+        counts[1] += 1
+        return tile
+
+    field = _compose_view_field(generator, width, height, zoom, offset_x, offset_y, level,
+                                fetch_tile, cancel_check, tile_size)
+    if draft_max_iter is not None:
+        np.minimum(field, draft_max_iter, out=field)
+    return field, counts[0] / counts[1] if counts[1] else 0.0
+
+
+def cached_view_field(generator, width, height, cache, zoom=None, offset_x=None, offset_y=None,
+                      cancel_check=None, tile_size=TILE_SIZE, max_iter=None):
+    """Compone el cuadro definitivo de una vista si todas sus teselas están guardadas.
+
+    Usa el nivel de detalle de la vista (``detail_level_for_zoom``) y busca
+    las teselas en memoria y en disco sin calcular ninguna: si falta alguna
+    devuelve None. Las teselas se buscan con ``max_iter`` (las iteraciones
+    pedidas por el usuario) y el campo se recorta a ``generator.max_iter``.
+    """
+    if max_iter is None:
+        max_iter = generator.max_iter
+    if zoom is None:
+        zoom = generator.zoom
+    level = detail_level_for_zoom(zoom, tile_size)
+
+    def fetch_tile(tx, ty):
+        return cache.lookup(tile_key(generator, level, tx, ty, max_iter))
+
+    field = _compose_view_field(generator, width, height, zoom, offset_x, offset_y, level,
+                                fetch_tile, cancel_check, tile_size)
+    if field is not None and generator.max_iter < max_iter:
+        np.minimum(field, generator.max_iter, out=field)
+    return field
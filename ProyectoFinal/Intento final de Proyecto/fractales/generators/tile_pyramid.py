@@ -0,0 +1,289 @@
+"""
+Pirámide de Teselas para Zoom Profundo
+Genera teselas PNG con estructura z/x/y y un descriptor DZI para visores web
+"""
+
+import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.config import STAGE_RENDER, performance_monitor
+from ..utils.png_writer import StreamingPNGWriter
+from .fractal_generators import RenderCancelled
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+PYRAMID_TILE_SIZE = 256
+
+_DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile_size}" Overlap="0" Format="png">
+  <Size Width="{size}" Height="{size}"/>
+</Image>
+"""
+
+
+def downsample_tiles(children, tile_size):
+    """Reduce a la mitad cuatro teselas hijas ``[[sup_izq, sup_der], [inf_izq, inf_der]]``."""
+    block = np.empty((2 * tile_size, 2 * tile_size, 3), dtype=np.uint16)
+    for row in range(2):
+        for col in range(2):
+            block[row * tile_size:(row + 1) * tile_size,
+                  col * tile_size:(col + 1) * tile_size] = children[row][col]
+    # Promedio de cada bloque de 2x2 píxeles
+    reduced = (block[0::2, 0::2] + block[1::2, 0::2] + block[0::2, 1::2] + block[1::2, 1::2] + 2) // 4
+    return reduced.astype(np.uint8)
+
+
+class TilePyramid:
+    """Genera una pirámide de teselas de un fractal de tiempo de escape.
+
+    La región es un cuadrado de lado ``extent`` centrado en (``center_x``,
+    ``center_y``); el nivel ``z`` la divide en ``2**z x 2**z`` teselas de
+    ``tile_size`` píxeles guardadas en ``directory/z/x/y.png``. Además se
+    escribe ``directory/<name>.dzi`` con su carpeta ``<name>_files`` (enlaces
+    a las mismas teselas) para visores Deep Zoom.
+
+    El quadtree se recorre en profundidad: solo se renderiza el nivel más
+    profundo y cada tesela padre se obtiene promediando sus cuatro hijas ya
+    en memoria, salvo que renderizarla resulte más barato (según el coste
+    medido de ambas operaciones). Los subárboles de un nivel intermedio se
+    reparten entre hilos. Las teselas que ya existen no se vuelven a
+    escribir, así que el trabajo se puede repetir o ampliar de forma
+    incremental.
+    """
+
+    def __init__(self, generator, directory, max_depth, center_x=None, center_y=None,
+                 extent=4.0, tile_size=PYRAMID_TILE_SIZE, name="fractal"):
+        if tile_size & (tile_size - 1):
+            raise ValueError("El tamaño de tesela debe ser una potencia de 2")
+        self.generator = generator
+        self.directory = Path(directory)
+        self.max_depth = max_depth
+        self.center_x = generator.offset_x if center_x is None else center_x
+        self.center_y = generator.offset_y if center_y is None else center_y
+        self.extent = extent
+        self.tile_size = tile_size
+        self.name = name
+        self._lock = threading.Lock()
+
+        # Tiempo total (s) dedicado a renderizar y a reducir teselas
+        self.render_time = 0.0
+        self.downsample_time = 0.0
+
+        # Estadísticas
+        self.rendered_tiles = 0
+        self.downsampled_tiles = 0
+        self.skipped_tiles = 0
+
+    @property
+    def total_tiles(self):
+        """Número de teselas de la pirámide completa."""
+        return sum(4 ** level for level in range(self.max_depth + 1))
+
+    def tile_path(self, level, tx, ty):
+        """Ruta de una tesela."""
+        return self.directory / str(level) / str(tx) / f"{ty}.png"
+
+    def tile_view(self, level, tx, ty):
+        """Devuelve ``(zoom, offset_x, offset_y)`` de una tesela."""
+        tile_extent = self.extent / 2 ** level
+        zoom = self.tile_size / tile_extent
+        offset_x = self.center_x - self.extent / 2 + (tx + 0.5) * tile_extent
+        offset_y = self.center_y - self.extent / 2 + (ty + 0.5) * tile_extent
+        return zoom, offset_x, offset_y
+
+    def generate(self, workers=None, progress=None, cancel_check=None):
+        """Genera las teselas que faltan y el descriptor DZI.
+
+        ``progress(teselas_procesadas, total)`` se llama tras cada tesela.
+        """
+        workers = workers or os.cpu_count() or 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._progress = progress
+        self._cancel_check = cancel_check
+        self._processed = 0
+
+        # Nivel a partir del cual cada subárbol es una tarea independiente
+        split = 0
+        while split < self.max_depth and 4 ** split < 4 * workers:
+            split += 1
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {(tx, ty): executor.submit(self._build, split, tx, ty)
+                       for tx in range(2 ** split) for ty in range(2 ** split)}
+            try:
+                images = {key: future.result() for key, future in futures.items()}
+            finally:
+                for future in futures.values():
+                    future.cancel()
+
+        # Los niveles superiores al de reparto se construyen a partir de sus hijas
+        for level in range(split - 1, -1, -1):
+            images = {(tx, ty): self._combine(level, tx, ty,
+                                              [[images[(2 * tx, 2 * ty)], images[(2 * tx + 1, 2 * ty)]],
+                                               [images[(2 * tx, 2 * ty + 1)],
+                                                images[(2 * tx + 1, 2 * ty + 1)]]])
+                      for tx in range(2 ** level) for ty in range(2 ** level)}
+
+        self.write_dzi(images[(0, 0)])
+        return self.get_statistics()
+
+    def _build(self, level, tx, ty):
+        """Genera el subárbol de una tesela y devuelve su imagen (o None si no hace falta)."""
+        if self._cancel_check is not None and self._cancel_check():
+            raise RenderCancelled()
+        if level == self.max_depth:
+            if self.tile_path(level, tx, ty).exists():
+                self._count_skipped()
+                return None
+            image = self._render(level, tx, ty)
+            self._write(level, tx, ty, image)
+            return image
+
+        children = [[self._build(level + 1, 2 * tx + col, 2 * ty + row) for col in range(2)]
+                    for row in range(2)]
+        return self._combine(level, tx, ty, children)
+
+    def _combine(self, level, tx, ty, children):
+        """Obtiene una tesela padre a partir de sus hijas (o renderizándola)."""
+        if self.tile_path(level, tx, ty).exists():
+            self._count_skipped()
+            return None
+        if self._should_render():
+            image = self._render(level, tx, ty)
+        else:
+            # Las hijas que ya existían en disco se leen (o se recalculan sin PIL)
+            start = time.perf_counter()
+            for row in range(2):
+                for col in range(2):
+                    if children[row][col] is None:
+                        children[row][col] = self._load(level + 1, 2 * tx + col, 2 * ty + row)
+            image = downsample_tiles(children, self.tile_size)
+            with self._lock:
+                self.downsample_time += time.perf_counter() - start
+                self.downsampled_tiles += 1
+        self._write(level, tx, ty, image)
+        return image
+
+    @property
+    def render_cost(self):
+        """Coste medio (s) de renderizar una tesela, o None si aún no se midió."""
+        return self.render_time / self.rendered_tiles if self.rendered_tiles else None
+
+    @property
+    def downsample_cost(self):
+        """Coste medio (s) de reducir cuatro teselas hijas, o None si aún no se midió."""
+        return self.downsample_time / self.downsampled_tiles if self.downsampled_tiles else None
+
+    def _should_render(self):
+        """Indica si renderizar una tesela padre sale más barato que reducir sus hijas."""
+        with self._lock:
+            render_cost, downsample_cost = self.render_cost, self.downsample_cost
+        if render_cost is None or downsample_cost is None:
+            return False
+        return render_cost < downsample_cost
+
+    def _render(self, level, tx, ty):
+        """Renderiza una tesela."""
+        start = time.perf_counter()
+        zoom, offset_x, offset_y = self.tile_view(level, tx, ty)
+        field = self.generator.compute_field(self.tile_size, self.tile_size,
+                                             zoom, offset_x, offset_y)
+        performance_monitor.record_stage(STAGE_RENDER, time.perf_counter() - start,
+                                         pixels=field.size,
+                                         iterations=int(field.sum(dtype=np.int64)))
+        image = self.generator.colorize_field(field)
+        with self._lock:
+            self.render_time += time.perf_counter() - start
+            self.rendered_tiles += 1
+        return image
+
+    def _load(self, level, tx, ty):
+        """Lee una tesela del disco."""
+        if PIL_AVAILABLE:
+            with Image.open(self.tile_path(level, tx, ty)) as image:
+                return np.asarray(image.convert("RGB"))
+        return self._render(level, tx, ty)
+
+    def _write(self, level, tx, ty, image):
+        """Guarda una tesela (de forma atómica)."""
+        path = self.tile_path(level, tx, ty)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with StreamingPNGWriter(path, self.tile_size, self.tile_size) as writer:
+            writer.write_rows(image)
+        self._advance()
+
+    def _count_skipped(self):
+        """Cuenta una tesela que ya existía."""
+        with self._lock:
+            self.skipped_tiles += 1
+        self._advance()
+
+    def _advance(self):
+        """Notifica el avance."""
+        with self._lock:
+            self._processed += 1
+            processed = self._processed
+        if self._progress is not None:
+            self._progress(processed, self.total_tiles)
+
+    def write_dzi(self, root_image=None):
+        """Escribe el descriptor DZI y su carpeta de teselas.
+
+        Los niveles DZI con teselas completas son enlaces a las teselas
+        z/x/y; los niveles más pequeños que una tesela se reducen a partir
+        de la tesela raíz.
+        """
+        base_level = int(math.log2(self.tile_size))
+        files = self.directory / f"{self.name}_files"
+        for level in range(self.max_depth + 1):
+            for tx in range(2 ** level):
+                for ty in range(2 ** level):
+                    target = files / str(base_level + level) / f"{tx}_{ty}.png"
+                    if not target.exists():
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        _link(self.tile_path(level, tx, ty), target)
+
+        image = root_image if root_image is not None else self._load(0, 0, 0)
+        for level in range(base_level - 1, -1, -1):
+            size = 2 ** level
+            target = files / str(level) / "0_0.png"
+            image = downsample_tiles([[image[:size, :size], image[:size, size:]],
+                                      [image[size:, :size], image[size:, size:]]], size)
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with StreamingPNGWriter(target, size, size) as writer:
+                    writer.write_rows(image)
+
+        descriptor = _DZI_TEMPLATE.format(tile_size=self.tile_size,
+                                          size=self.tile_size * 2 ** self.max_depth)
+        (self.directory / f"{self.name}.dzi").write_text(descriptor, encoding="utf-8")
+
+    def get_statistics(self):
+        """Devuelve las estadísticas de la generación."""
+        return {
+            'total_tiles': self.total_tiles,
+            'rendered_tiles': self.rendered_tiles,
+            'downsampled_tiles': self.downsampled_tiles,
+            'skipped_tiles': self.skipped_tiles,
+            'render_cost': self.render_cost,
+            'downsample_cost': self.downsample_cost,
+        }
+
+
+def _link(source, target):
+    """Enlaza un archivo (o lo copia si el sistema no admite enlaces)."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
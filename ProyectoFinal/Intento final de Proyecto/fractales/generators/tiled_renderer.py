@@ -0,0 +1,168 @@
+"""
+Renderizador por Teselas Multiproceso
+Reparte la vista en teselas entre varios procesos que escriben en memoria compartida
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..utils.config import STAGE_RENDER, TILE_SIZE, performance_monitor
+from .formulas import compile_formula
+from .fractal_generators import RenderCancelled
+
+class TiledRenderer:
+    """Renderiza fractales de tiempo de escape con un pool de procesos.
+
+    La vista se divide en teselas de ``tile_size`` píxeles. Cada tesela es
+    una tarea independiente del pool, así que los procesos que terminan
+    antes (teselas exteriores, baratas) toman las siguientes de la cola
+    mientras otros siguen con las del interior del conjunto. Los procesos
+    escriben el campo de iteraciones directamente en un bloque de
+    ``multiprocessing.shared_memory``: solo viajan entre procesos los
+    parámetros de cada tesela.
+
+    Funciona con cualquier ``EscapeTimeGenerator`` (Mandelbrot, Julia o
+    fórmulas personalizadas). Cada proceso usa ``threads_per_process`` hilos
+    de numba para no saturar los núcleos.
+    """
+
+    def __init__(self, processes=None, tile_size=TILE_SIZE, threads_per_process=1):
+        self.processes = processes or os.cpu_count() or 1
+        self.tile_size = tile_size
+        self.threads_per_process = threads_per_process
+        self._executor = None
+
+        # Estadísticas
+        self.rendered_tiles = 0
+        self.last_render_time = 0.0
+
+    def start(self):
+        """Arranca el pool de procesos (se hace solo en el primer render)."""
+        if self._executor is None:
+            # spawn: hacer fork de un proceso con hilos de Qt o numba no es seguro
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=context,
+                initializer=_init_worker, initargs=(self.threads_per_process,)
+            )
+        return self
+
+    def shutdown(self):
+        """Detiene el pool de procesos."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def tiles(self, width, height):
+        """Devuelve las teselas ``(x0, y0, cols, rows)`` que cubren la vista."""
+        size = self.tile_size
+        return [(x0, y0, min(size, width - x0), min(size, height - y0))
+                for y0 in range(0, height, size)
+                for x0 in range(0, width, size)]
+
+    def render_field(self, generator, width, height, zoom=None, offset_x=None, offset_y=None,
+                     max_iter=None, cancel_check=None, on_tile=None):
+        """Calcula el campo de iteraciones de la vista repartido en teselas.
+
+        ``on_tile(x0, y0, cols, rows)`` se llama en este proceso cada vez que
+        termina una tesela. Si ``cancel_check`` devuelve True se descartan
+        las teselas pendientes y se lanza ``RenderCancelled``.
+        """
+        if zoom is None:
+            zoom = generator.zoom
+        if offset_x is None:
+            offset_x = generator.offset_x
+        if offset_y is None:
+            offset_y = generator.offset_y
+        if max_iter is None:
+            max_iter = generator.max_iter
+        julia, c_real, c_imag = generator._kernel_parameters()
+
+        self.start()
+        start = time.perf_counter()
+        shm = shared_memory.SharedMemory(create=True, size=width * height * 4)
+        futures = []
+        try:
+            view = (generator.formula, julia, c_real, c_imag, float(zoom), float(offset_x),
+                    float(offset_y), float(generator.rotation), int(max_iter))
+            futures = [self._executor.submit(_render_tile, shm.name, width, height, view, tile)
+                       for tile in self.tiles(width, height)]
+
+            for future in as_completed(futures):
+                if cancel_check is not None and cancel_check():
+                    raise RenderCancelled()
+                tile = future.result()
+                self.rendered_tiles += 1
+                if on_tile is not None:
+                    on_tile(*tile)
+
+            field = np.ndarray((height, width), dtype=np.int32, buffer=shm.buf).copy()
+        finally:
+            for future in futures:
+                future.cancel()
+            # Las teselas que ya estaban en marcha siguen escribiendo en el
+            # bloque: se esperan antes de liberarlo
+            wait(futures)
+            shm.close()
+            shm.unlink()
+
+        self.last_render_time = time.perf_counter() - start
+        performance_monitor.record_stage(STAGE_RENDER, self.last_render_time,
+                                         pixels=width * height,
+                                         iterations=int(field.sum(dtype=np.int64)))
+        return field
+
+    def render(self, generator, width, height, zoom=None, offset_x=None, offset_y=None,
+               cancel_check=None):
+        """Renderiza la vista y la colorea con la paleta del generador."""
+        field = self.render_field(generator, width, height, zoom, offset_x, offset_y,
+                                  cancel_check=cancel_check)
+        return generator.colorize_field(field)
+
+    def get_statistics(self):
+        """Devuelve las estadísticas del renderizador."""
+        return {
+            'processes': self.processes,
+            'tile_size': self.tile_size,
+            'rendered_tiles': self.rendered_tiles,
+            'last_render_time': self.last_render_time,
+        }
+
+
+def _init_worker(threads):
+    """Configura cada proceso del pool."""
+    try:
+        import numba
+        numba.set_num_threads(max(1, min(threads, numba.config.NUMBA_NUM_THREADS)))
+    except ImportError:
+        pass
+
+
+def _render_tile(shm_name, width, height, view, tile):
+    """Calcula una tesela directamente en la memoria compartida (en un proceso del pool)."""
+    formula, julia, c_real, c_imag, zoom, offset_x, offset_y, rotation, max_iter = view
+    x0, y0, cols, rows = tile
+
+    # El proceso principal es el dueño del bloque y quien lo libera (unlink)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        field = np.ndarray((height, width), dtype=np.int32, buffer=shm.buf)
+        # El kernel escribe sobre la vista de la tesela: no hay copia intermedia
+        compile_formula(formula).compute(field[y0:y0 + rows, x0:x0 + cols], x0, y0, width, height,
+                                         zoom, offset_x, offset_y, rotation, max_iter,
+                                         julia, c_real, c_imag)
+        del field
+    finally:
+        shm.close()
+    return tile
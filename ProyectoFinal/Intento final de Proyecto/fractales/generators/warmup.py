@@ -0,0 +1,99 @@
+"""
+Precalentamiento de Kernels
+Compila (o carga de la caché en disco) los kernels numba antes del primer render
+"""
+
+import threading
+import time
+
+from ..utils.config import WARMUP_SIZE, format_time, performance_monitor
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+def _warmup_steps():
+    """Devuelve ``[(nombre, función)]`` con las variantes de kernel que usan las ventanas.
+
+    Cada función ejecuta las mismas rutas que un render real (con imágenes
+    diminutas), así se compilan exactamente las firmas que se usarán.
+    """
+    # Importación diferida: carga numba (y detecta CUDA) ya en el hilo de fondo
+    from .fractal_generators import JuliaGenerator, MandelbrotGenerator
+
+    size = WARMUP_SIZE
+    mandelbrot = MandelbrotGenerator()
+    julia = JuliaGenerator()
+
+    def field(generator):
+        generator.compute_field(size, size)
+        generator.generate_fractal(size, size)
+
+    def progressive(generator):
+        for _ in generator.generate_progressive(size, size):
+            pass
+
+    def refine(generator):
+        iters = generator.compute_field(size, size)
+        for _ in generator.refine_iterations(iters, size, size,
+                                             max_iter_cap=2 * generator.max_iter,
+                                             min_escaped=0.0):
+            pass
+
+    def batch(generator):
+        generator.generate_batch([(generator.c_real, generator.c_imag)], size, size)
+
+    def tile(generator):
+        # Los procesos del render por teselas escriben sobre vistas no contiguas
+        import numpy as np
+        field = np.empty((size, size), dtype=np.int32)
+        half = size // 2
+        generator.compute_field(size, size, cols=half, rows=half, out=field[:half, :half])
+
+    return [
+        ("Mandelbrot: campo", lambda: field(mandelbrot)),
+        ("Mandelbrot: pasadas progresivas", lambda: progressive(mandelbrot)),
+        ("Mandelbrot: refinado", lambda: refine(mandelbrot)),
+        ("Mandelbrot: teselas", lambda: tile(mandelbrot)),
+        ("Julia: campo", lambda: field(julia)),
+        ("Julia: lote", lambda: batch(julia)),
+    ]
+
+
+def warm_up_kernels(monitor=performance_monitor):
+    """Compila todas las variantes de kernel y devuelve ``{nombre: segundos}``.
+
+    El avance y el tiempo de cada paso se registran en ``monitor``.
+    """
+    steps = _warmup_steps()
+    times = {}
+    monitor.record_warmup_progress(0, len(steps))
+    for index, (name, function) in enumerate(steps, 1):
+        start = time.perf_counter()
+        function()
+        times[name] = time.perf_counter() - start
+        monitor.record_compile(name, times[name])
+        monitor.record_warmup_progress(index, len(steps))
+    return times
+
+
+def start_kernel_warmup():
+    """Lanza el precalentamiento en un hilo de fondo (una sola vez por proceso)."""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_run_warmup, name="KernelWarmup",
+                                              daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def _run_warmup():
+    """Cuerpo del hilo de precalentamiento."""
+    start = time.perf_counter()
+    try:
+        warm_up_kernels()
+    except Exception as e:
+        print(f"Error precalentando kernels: {e}")
+        return
+    print(f"🔥 Kernels listos en {format_time(time.perf_counter() - start)}")
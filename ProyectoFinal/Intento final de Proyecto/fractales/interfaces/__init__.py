@@ -3,8 +3,15 @@ Módulo de Interfaces de Usuario para Fractales
 Contiene todas las ventanas y controles de la aplicación
 """
 
-# Solo importar el menú principal para evitar importaciones circulares
-from .menu_principal import SimpleFractalMenu
+
+def __getattr__(name):
+    """Importa el menú principal (y PyQt6) solo cuando se usa."""
+    # Importación diferida: evita ciclos y no carga Qt al importar el paquete
+    if name == 'SimpleFractalMenu':
+        from .menu_principal import SimpleFractalMenu
+        return SimpleFractalMenu
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'SimpleFractalMenu'
@@ -0,0 +1,129 @@
+"""
+Planificador de Cuadros
+Fusiona las peticiones de render de una ventana: uno en curso y uno pendiente
+"""
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from ..utils.config import INTERACTION_IDLE_MS
+
+
+class FrameScheduler(QObject):
+    """Coordina los renders de una ventana con política "la última gana".
+
+    Los eventos de ratón y de controles solo modifican el estado de la ventana
+    y llaman a ``request``. Como mucho hay un render en curso y uno pendiente:
+    las peticiones que llegan mientras ya hay una pendiente se fusionan con
+    ella (el render leerá el estado más reciente) y se cuentan como
+    descartadas.
+
+    Con ``asynchronous=False`` el callback dibuja el cuadro completo y el
+    render termina al volver. Con ``asynchronous=True`` el callback solo
+    lanza el trabajo (en un ``RenderWorker``) y la ventana debe llamar a
+    ``frame_done`` cada vez que termina uno. En ese modo una petición no
+    espera al render en curso: en la siguiente vuelta del bucle de eventos
+    se lanza el nuevo, que sustituye y cancela al anterior (se cuenta en
+    ``superseded_renders``).
+
+    Las peticiones con ``interactive=True`` (arrastre, rueda, deslizadores)
+    activan ``interactive`` hasta que pasan ``idle_ms`` sin nuevas; entonces
+    se emite ``idle`` para que la ventana pida el cuadro definitivo.
+    """
+
+    # Se emite cuando termina una ráfaga de peticiones interactivas
+    idle = pyqtSignal()
+
+    def __init__(self, render_callback, asynchronous=False, parent=None,
+                 idle_ms=INTERACTION_IDLE_MS):
+        super().__init__(parent)
+        self._render_callback = render_callback
+        self._asynchronous = asynchronous
+        self._in_flight = 0
+        self._pending = False
+        self._dispatch_queued = False
+
+        # Estado de interacción
+        self.interactive = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(idle_ms)
+        self._idle_timer.timeout.connect(self._on_idle)
+
+        # Estadísticas
+        self.requested_frames = 0
+        self.rendered_frames = 0
+        self.dropped_requests = 0
+        self.superseded_renders = 0
+
+    @property
+    def busy(self):
+        """Indica si hay un render en curso o pendiente."""
+        return bool(self._in_flight) or self._pending
+
+    def request(self, interactive=False):
+        """Pide un cuadro nuevo, fusionándolo con el pendiente si ya existe."""
+        if interactive:
+            self.interactive = True
+            self._idle_timer.start()
+
+        self.requested_frames += 1
+        if self._pending:
+            self.dropped_requests += 1
+            return
+
+        self._pending = True
+        if not self._in_flight or self._asynchronous:
+            self._queue_dispatch()
+
+    def frame_done(self, *args):
+        """Marca como terminado un render y lanza el pendiente."""
+        if not self._in_flight:
+            return
+        self._in_flight -= 1
+        # Terminó un render sustituido: el más reciente sigue en curso
+        if self._in_flight:
+            return
+        self.rendered_frames += 1
+        if self._pending:
+            self._queue_dispatch()
+
+    def get_statistics(self):
+        """Devuelve las estadísticas del planificador."""
+        return {
+            'requested_frames': self.requested_frames,
+            'rendered_frames': self.rendered_frames,
+            'dropped_requests': self.dropped_requests,
+            'superseded_renders': self.superseded_renders,
+        }
+
+    def _on_idle(self):
+        """Fin de la interacción: la ventana puede pedir el cuadro definitivo."""
+        self.interactive = False
+        self.idle.emit()
+
+    def _queue_dispatch(self):
+        """Lanza el render en la próxima vuelta del bucle de eventos."""
+        # Así se fusionan todos los eventos que Qt entregue en la misma vuelta
+        if not self._dispatch_queued:
+            self._dispatch_queued = True
+            QTimer.singleShot(0, self._dispatch)
+
+    def _dispatch(self):
+        """Ejecuta el render pendiente."""
+        self._dispatch_queued = False
+        if not self._pending or (self._in_flight and not self._asynchronous):
+            return
+
+        if self._in_flight:
+            self.superseded_renders += 1
+        self._pending = False
+        self._in_flight += 1
+        try:
+            self._render_callback()
+        except Exception as e:
+            print(f"Error en renderizado: {e}")
+            self.frame_done()
+            return
+
+        if not self._asynchronous:
+            self.frame_done()
@@ -0,0 +1,118 @@
+"""
+Progreso de Trabajos en Segundo Plano
+Widget para la barra de estado que sigue las exportaciones de la cola de trabajos
+"""
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QProgressBar, QPushButton, QWidget
+
+from ..utils.job_queue import RenderJob
+
+# Texto que acompaña al nombre del trabajo según su estado
+STATE_LABELS = {
+    RenderJob.PENDING: "en cola",
+    RenderJob.RUNNING: "",
+    RenderJob.WAITING: "en espera",
+    RenderJob.PAUSED: "pausado",
+}
+
+
+class JobProgressWidget(QWidget):
+    """Muestra el avance de los trabajos en segundo plano de una ventana.
+
+    Los trabajos avisan desde su propio hilo; la señal ``job_changed`` lleva
+    cada aviso al hilo de Qt. Permite pausar, reanudar y cancelar el trabajo
+    que se muestra, y se oculta cuando no queda ninguno.
+    """
+
+    job_changed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = []
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedWidth(160)
+        self.pause_button = QPushButton("⏸")
+        self.pause_button.setToolTip("Pausar o reanudar")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button = QPushButton("✖")
+        self.cancel_button.setToolTip("Cancelar")
+        self.cancel_button.clicked.connect(self.cancel_current)
+        for widget in (self.label, self.progress_bar, self.pause_button, self.cancel_button):
+            layout.addWidget(widget)
+
+        # Mismo objeto al registrar y al quitar el oyente
+        self._notify = self.job_changed.emit
+        self.job_changed.connect(self._update)
+        self.hide()
+
+    def track(self, job, on_finished=None):
+        """Sigue un trabajo; ``on_finished(trabajo)`` se llama en el hilo de Qt al terminar."""
+        self._jobs.append((job, on_finished))
+        job.add_listener(self._notify)
+        self._update(job)
+
+    def current_job(self):
+        """Trabajo que se muestra (el primero sin terminar), o None."""
+        for job, _ in self._jobs:
+            if not job.is_done:
+                return job
+        return None
+
+    def toggle_pause(self):
+        """Pausa o reanuda el trabajo que se muestra."""
+        job = self.current_job()
+        if job is None:
+            return
+        if job.is_paused:
+            job.resume()
+        else:
+            job.pause()
+        self._refresh()
+
+    def cancel_current(self):
+        """Cancela el trabajo que se muestra."""
+        job = self.current_job()
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        """Cancela todos los trabajos seguidos y deja de escucharlos (al cerrar la ventana)."""
+        for job, _ in self._jobs:
+            job.remove_listener(self._notify)
+            job.cancel()
+        self._jobs = []
+
+    def _update(self, job):
+        """Atiende el aviso de un trabajo."""
+        if job.is_done:
+            for entry in list(self._jobs):
+                if entry[0] is job:
+                    self._jobs.remove(entry)
+                    job.remove_listener(self._notify)
+                    if entry[1] is not None:
+                        entry[1](job)
+        self._refresh()
+
+    def _refresh(self):
+        """Actualiza la barra con el trabajo actual."""
+        job = self.current_job()
+        if job is None:
+            self.hide()
+            return
+        state = "pausado" if job.is_paused else STATE_LABELS.get(job.state, "")
+        pending = len(self._jobs) - 1
+        text = job.name
+        if state:
+            text += f" ({state})"
+        if pending:
+            text += f" +{pending}"
+        self.label.setText(text)
+        self.progress_bar.setValue(int(100 * job.progress))
+        self.pause_button.setText("▶" if job.is_paused else "⏸")
+        self.show()
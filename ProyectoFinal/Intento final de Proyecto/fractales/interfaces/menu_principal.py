@@ -7,6 +7,8 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
+from ..generators.warmup import start_kernel_warmup
+
 
 class SimpleFractalMenu(QMainWindow):
     """Menú simple con solo botones para acceder a cada fractal."""
@@ -19,6 +21,9 @@ class SimpleFractalMenu(QMainWindow):
         self.tree_window = None
         self.sierpinski_window = None
         self.setup_ui()
+        
+        # Compilar los kernels mientras el usuario elige un fractal
+        start_kernel_warmup()
     
     def setup_ui(self):
         """Configura la interfaz simple con solo botones."""
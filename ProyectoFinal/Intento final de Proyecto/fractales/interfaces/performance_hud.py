@@ -0,0 +1,147 @@
+"""
+Panel de Rendimiento
+Superposición sobre el lienzo con los datos en vivo del monitor de rendimiento
+"""
+
+import time
+
+from PyQt6.QtCore import QRectF, Qt, QTimer
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QKeySequence, QPainter, QPixmap, QShortcut
+from PyQt6.QtWidgets import QWidget
+
+from ..utils.config import (HUD_FPS_WINDOW, HUD_MARGIN, HUD_REFRESH_MS, HUD_SHORTCUT,
+                            STAGE_FRAME, STAGE_HUD, format_number, performance_monitor)
+
+_PADDING = 6
+_BACKGROUND = QColor(0, 0, 0, 170)
+_TEXT = QColor(120, 255, 160)
+
+
+class PerformanceHUD(QWidget):
+    """Panel con el rendimiento de los últimos cuadros, encima del lienzo.
+
+    Muestra el tiempo de cuadro, los FPS, el ritmo (píxeles/s o, con
+    ``elements_name``, elementos/s), el backend, la calidad efectiva y la
+    tasa de aciertos de la caché. Los cuadros se leen de ``frame_stage``, la
+    etapa propia de la ventana, para no mezclar los de otras ventanas
+    abiertas. ``status()`` devuelve
+    ``(backend, calidad, tasa_de_aciertos)``; sin caché la tasa es None y
+    no se muestra. Los datos se leen del monitor cada ``HUD_REFRESH_MS`` y
+    el texto se dibuja entonces en un pixmap: al repintarse con cada cuadro
+    el panel solo copia ese pixmap. ``HUD_SHORTCUT`` lo muestra u oculta.
+    """
+
+    def __init__(self, canvas, status, elements_name=None, frame_stage=STAGE_FRAME,
+                 monitor=performance_monitor):
+        super().__init__(canvas)
+        self.status = status
+        self.elements_name = elements_name
+        self.frame_stage = frame_stage
+        self.monitor = monitor
+        self._lines = []
+        self._pixmap = QPixmap()
+        self._font = QFont("Monospace", 9)
+        self._font.setStyleHint(QFont.StyleHint.TypeWriter)
+
+        # El panel no intercepta el ratón: arrastrar y hacer zoom siguen igual
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.move(HUD_MARGIN, HUD_MARGIN)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(HUD_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._shortcut = QShortcut(QKeySequence(HUD_SHORTCUT), canvas)
+        self._shortcut.activated.connect(self.toggle)
+        self.hide()
+
+    def toggle(self):
+        """Muestra u oculta el panel."""
+        self.setVisible(not self.isVisible())
+
+    def showEvent(self, event):
+        """Empieza a leer el monitor al mostrarse (oculto no cuesta nada)."""
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        """Deja de leer el monitor al ocultarse."""
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def lines(self):
+        """Líneas de texto del panel con los datos actuales."""
+        frame = self.monitor.stage_statistics(self.frame_stage)
+        backend, quality, hit_rate = self.status()
+        if frame is None:
+            lines = ["Cuadro   -", "FPS      -", "Ritmo    -"]
+        else:
+            fps = self.monitor.recent_rate(self.frame_stage, HUD_FPS_WINDOW)
+            if self.elements_name is None:
+                rate = f"{format_number(frame['pixels_per_second'])} píxeles/s"
+            else:
+                rate = f"{format_number(frame['elements_per_second'])} {self.elements_name}/s"
+            lines = [
+                f"Cuadro   {frame['last'] * 1000:.1f} ms (p95 {frame['p95'] * 1000:.1f} ms)",
+                f"FPS      {fps:.1f}" if fps else "FPS      - (en reposo)",
+                f"Ritmo    {rate}",
+            ]
+        lines += [f"Backend  {backend}", f"Calidad  {quality}"]
+        if hit_rate is not None:
+            lines.append(f"Caché    {hit_rate:.0%} aciertos")
+        return lines
+
+    def refresh(self):
+        """Relee los datos y, si cambiaron, vuelve a dibujar el texto del panel."""
+        lines = self.lines()
+        if lines == self._lines:
+            return
+        self._lines = lines
+        metrics = QFontMetrics(self._font)
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 2 * _PADDING
+        height = metrics.lineSpacing() * len(lines) + 2 * _PADDING
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(_BACKGROUND)
+        painter.drawRoundedRect(QRectF(0, 0, width, height), 4, 4)
+        painter.setFont(self._font)
+        painter.setPen(_TEXT)
+        for index, line in enumerate(lines):
+            painter.drawText(_PADDING, _PADDING + metrics.ascent() + index * metrics.lineSpacing(),
+                             line)
+        painter.end()
+
+        self._pixmap = pixmap
+        self.resize(width, height)
+        self.update()
+
+    def paintEvent(self, event):
+        """Copia el pixmap del panel (se repinta con cada cuadro del lienzo)."""
+        start = time.perf_counter()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+        self.monitor.record_stage(STAGE_HUD, time.perf_counter() - start)
+
+
+def escape_time_quality(plan, max_iter=None):
+    """Calidad de un cuadro de tiempo de escape: iteraciones y resolución."""
+    if plan is None:
+        return "-"
+    text = f"{plan.max_iter if max_iter is None else max_iter} iteraciones"
+    if plan.scale < 1:
+        text += f", resolución {plan.scale:.0%}"
+    return text
+
+
+def depth_quality(plan):
+    """Calidad de un cuadro geométrico: nivel de recursión efectivo."""
+    if plan is None:
+        return "-"
+    return f"nivel {plan.depth}" + (" (provisional)" if plan.provisional else "")
@@ -0,0 +1,138 @@
+"""
+Hilo de Renderizado en Segundo Plano
+Ejecuta peticiones de render fuera del hilo de Qt con política "la última gana"
+"""
+
+import inspect
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from ..generators.fractal_generators import RenderCancelled
+from ..utils.job_queue import PRIORITY_INTERACTIVE, get_job_queue
+
+
+class RenderWorker(QThread):
+    """Hilo que ejecuta funciones de render y entrega solo el cuadro más reciente.
+
+    Cada petición recibe un número de generación creciente. Solo existe una
+    petición pendiente: cada ``submit`` sustituye a la anterior si todavía no
+    empezó y cancela la que esté en curso. Las funciones de render reciben un
+    argumento ``cancel_check`` que devuelve True en cuanto su generación queda
+    obsoleta; al comprobarlo pueden lanzar ``RenderCancelled``.
+
+    Si la función de render es un generador (render progresivo), cada valor
+    que produce se entrega como un cuadro mientras la petición siga vigente.
+
+    Cada petición cuenta como actividad de prioridad ``priority`` en la cola
+    de trabajos del proceso, así que las exportaciones ceden mientras tanto.
+    """
+
+    # (generación, resultado) del último cuadro terminado
+    frame_ready = pyqtSignal(int, object)
+    # Se emite al terminar cada petición, se haya entregado o no su cuadro
+    request_finished = pyqtSignal(int)
+
+    def __init__(self, parent=None, priority=PRIORITY_INTERACTIVE):
+        super().__init__(parent)
+        self.priority = priority
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._running = True
+
+        # Contadores para diagnóstico
+        self.dropped_requests = 0
+        self.cancelled_renders = 0
+        self.delivered_frames = 0
+
+    @property
+    def latest_generation(self):
+        """Generación de la petición más reciente."""
+        return self._generation
+
+    def is_stale(self, generation):
+        """Indica si una generación ya fue superada por otra petición."""
+        return generation != self._generation or not self._running
+
+    def submit(self, render_func, *args, **kwargs):
+        """Encola una petición de render y devuelve su número de generación."""
+        with self._condition:
+            self._generation += 1
+            generation = self._generation
+            dropped, self._pending = self._pending, (generation, render_func, args, kwargs)
+            if dropped is not None:
+                self.dropped_requests += 1
+            self._condition.notify()
+        # Toda petición termina con request_finished, también la sustituida
+        if dropped is not None:
+            self.request_finished.emit(dropped[0])
+
+        if not self.isRunning():
+            self.start()
+        return generation
+
+    def cancel(self):
+        """Cancela la petición pendiente y la que esté en curso."""
+        with self._condition:
+            self._generation += 1
+            dropped, self._pending = self._pending, None
+        if dropped is not None:
+            self.request_finished.emit(dropped[0])
+
+    def stop(self):
+        """Detiene el hilo cancelando el cuadro en curso."""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        """Bucle principal del hilo de render."""
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                generation, render_func, args, kwargs = self._pending
+                self._pending = None
+
+            with get_job_queue().activity(self.priority):
+                self._process(generation, render_func, args, kwargs)
+            self.request_finished.emit(generation)
+
+    def _process(self, generation, render_func, args, kwargs):
+        """Ejecuta una petición y entrega su cuadro si sigue vigente."""
+        def cancel_check():
+            return self.is_stale(generation)
+
+        try:
+            result = render_func(*args, cancel_check=cancel_check, **kwargs)
+            if inspect.isgenerator(result):
+                # Render progresivo: se entrega cada pasada según termina
+                for partial in result:
+                    if not self._deliver(generation, partial):
+                        result.close()
+                        return
+                return
+        except RenderCancelled:
+            self.cancelled_renders += 1
+            return
+        except Exception as e:
+            print(f"Error en renderizado: {e}")
+            return
+
+        self._deliver(generation, result)
+
+    def _deliver(self, generation, result):
+        """Emite un cuadro si su generación sigue vigente."""
+        # Un cuadro terminado después de otra petición ya está obsoleto
+        if self.is_stale(generation):
+            self.cancelled_renders += 1
+            return False
+
+        self.delivered_frames += 1
+        self.frame_ready.emit(generation, result)
+        return True
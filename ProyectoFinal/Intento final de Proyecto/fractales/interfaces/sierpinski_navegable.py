@@ -9,9 +9,15 @@ import math
 import time
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QSlider, QFrame, QApplication)
-from PyQt6.QtCore import Qt, QTimer, QPointF
+from PyQt6.QtCore import Qt, QPointF
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QPolygonF
 
+from .frame_scheduler import FrameScheduler
+from .performance_hud import PerformanceHUD, depth_quality
+from ..utils.config import (INTERACTIVE_TIME_BUDGET, STAGE_PAINT, STAGE_QIMAGE, frame_stage,
+                            performance_monitor)
+from ..utils.render_governor import RenderGovernor
+
 class SierpinskiNavigableWindow(QMainWindow):
     """🔺 SIERPINSKI NAVEGABLE - ZOOM INFINITO Y MOVIMIENTO FLUIDO"""
     
@@ -32,16 +38,22 @@ class SierpinskiNavigableWindow(QMainWindow):
         self.mouse_pressed = False
         self.last_mouse_pos = None
         
-        # Timer para actualizaciones ultra-fluidas
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.safe_generate)
-        self.update_timer.setSingleShot(True)
+        # Planificador: fusiona los eventos en un render en curso y uno pendiente
+        self.frame_scheduler = FrameScheduler(self.safe_generate, parent=self)
+        self.frame_scheduler.idle.connect(self.refine_provisional_frame)
+        
+        # Limita el nivel adaptativo al presupuesto de tiempo y de triángulos
+        self.render_governor = RenderGovernor()
+        self.last_plan = None
         
         # Control de fluidez
-        self.last_update_time = 0
         self.render_quality = "high"  # high, medium, fast
         
         self.setup_ui()
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status, "triángulos",
+                                              frame_stage=self.frame_stage)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -427,32 +439,28 @@ class SierpinskiNavigableWindow(QMainWindow):
     
     def schedule_ultra_fluid_update(self):
         """Programar actualización SÚPER-FLUIDA optimizada para zoom alto."""
-        import time
-        current_time = time.time()
-        
         # Determinar calidad de render OPTIMIZADA para zoom alto
         if self.zoom_level < 10:
             self.render_quality = "high"
-            delay = 16  # 16ms = ~60 FPS
         elif self.zoom_level < 50:
             self.render_quality = "medium"
-            delay = 12  # 12ms = ~80 FPS
         elif self.zoom_level < 200:
             self.render_quality = "fast"
-            delay = 8   # 8ms = ~120 FPS
         else:
             # NUEVO: Ultra-fast para zoom extremo
             self.render_quality = "ultra_fast"
-            delay = 6   # 6ms = ~160 FPS para máxima fluidez
-        
-        # Evitar actualizaciones muy frecuentes con mejor control
-        time_since_last = current_time - self.last_update_time
-        if time_since_last > delay / 1000.0:
-            self.last_update_time = current_time
-            delay = max(2, int(delay * 0.3))  # Actualización más rápida
         
-        self.update_timer.stop()
-        self.update_timer.start(delay)
+        # Los eventos seguidos se fusionan en un único render pendiente
+        self.frame_scheduler.request(interactive=True)
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        return "QPainter", depth_quality(self.last_plan), None
+    
+    def refine_provisional_frame(self):
+        """Al terminar la navegación, repite el cuadro si se dibujó a menor nivel."""
+        if self.last_plan is not None and self.last_plan.provisional:
+            self.frame_scheduler.request()
     
     def schedule_update(self):
         """Compatibilidad con función anterior."""
@@ -489,6 +497,12 @@ class SierpinskiNavigableWindow(QMainWindow):
             
         adaptive_level = min(max_level, adaptive_level)
         
+        # El gobernador recorta el nivel que no cabe en el presupuesto
+        time_budget = INTERACTIVE_TIME_BUDGET if self.frame_scheduler.interactive else None
+        plan = self.render_governor.plan_depth(adaptive_level, 3, time_budget=time_budget)
+        adaptive_level = plan.depth
+        start = time.perf_counter()
+        
         # Crear imagen con fondo visible
         width, height = 800, 700
         image = QImage(width, height, QImage.Format.Format_RGB888)
@@ -529,13 +543,22 @@ class SierpinskiNavigableWindow(QMainWindow):
         self.draw_natural_sierpinski(painter, p1, p2, p3, adaptive_level, fractional_part)
         
         painter.end()
+        triangles = 3 ** adaptive_level
+        performance_monitor.record_stage(STAGE_PAINT, time.perf_counter() - start,
+                                         elements=triangles)
         
         # Mostrar en canvas
-        pixmap = QPixmap.fromImage(image)
+        with performance_monitor.measure(STAGE_QIMAGE, pixels=width * height):
+            pixmap = QPixmap.fromImage(image)
         self.canvas.setPixmap(pixmap)
+        elapsed = time.perf_counter() - start
+        self.render_governor.record_geometry(triangles, elapsed)
+        performance_monitor.record_frame(self.frame_stage, elapsed, elements=triangles)
+        self.last_plan = plan
         
         # Actualizar info
         self.update_position_info()
+        self.statusBar().showMessage(plan.describe())
         print(f"🔺 FLUIDO-Fractal - Zoom: {self.zoom_level:.1f}x - Nivel: {adaptive_level} - Calidad: {self.render_quality}")
     
     def draw_natural_sierpinski(self, painter, p1, p2, p3, level, opacity_factor=1.0):
@@ -642,6 +665,11 @@ class SierpinskiNavigableWindow(QMainWindow):
                 print(f"✅ Vista exportada como: {filename}")
         except Exception as e:
             print(f"Error al exportar: {e}")
+    
+    def closeEvent(self, event):
+        """Libera la etapa de cuadro de la ventana en el monitor al cerrarla."""
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
 
 def main():
     """Función principal."""
@@ -0,0 +1,117 @@
+"""
+Precarga de Teselas en Segundo Plano
+Calcula durante la inactividad las teselas que rodean la vista actual
+"""
+
+import threading
+import time
+
+from PyQt6.QtCore import QThread
+
+from ..generators.tile_cache import prefetch_tiles, tile_key
+from ..utils.config import STAGE_PREFETCH, TILE_PREFETCH_CPU_SHARE, TILE_SIZE, performance_monitor
+from ..utils.job_queue import PRIORITY_PREFETCH, get_job_queue
+
+
+class TilePrefetcher(QThread):
+    """Hilo que rellena la caché de teselas alrededor de la vista.
+
+    La ventana llama a ``prefetch`` cuando la vista queda quieta y a
+    ``pause`` en cuanto llega una petición de render: el trabajo en curso
+    se abandona al terminar la tesela actual. Entre tesela y tesela el hilo
+    descansa lo necesario para no usar más de ``cpu_share`` de la CPU y
+    espera mientras haya renders interactivos en cualquier ventana.
+    """
+
+    def __init__(self, tile_cache, cpu_share=TILE_PREFETCH_CPU_SHARE, parent=None):
+        super().__init__(parent)
+        self.tile_cache = tile_cache
+        self.cpu_share = cpu_share
+        self._condition = threading.Condition()
+        self._job = None
+        self._generation = 0
+        self._running = True
+
+        # Estadísticas
+        self.prefetched_tiles = 0
+        self.skipped_tiles = 0
+        self.abandoned_jobs = 0
+
+    def prefetch(self, generator, width, height, zoom, offset_x, offset_y,
+                 direction=(0.0, 0.0), detail_zoom=None):
+        """Empieza a precalcular las teselas alrededor de una vista.
+
+        ``generator`` debe ser una copia (``snapshot``) que no cambie después,
+        con las iteraciones pedidas por el usuario. ``detail_zoom`` es el zoom
+        del cuadro definitivo (ver ``prefetch_tiles``).
+        """
+        tiles = prefetch_tiles(width, height, zoom, offset_x, offset_y, direction,
+                               detail_zoom=detail_zoom)
+        with self._condition:
+            self._generation += 1
+            self._job = (self._generation, generator, tiles)
+            self._condition.notify()
+
+        if not self.isRunning():
+            self.start()
+
+    def pause(self):
+        """Abandona la precarga en curso para dejar paso a un render."""
+        with self._condition:
+            self._generation += 1
+            self._job = None
+            self._condition.notify()
+
+    def stop(self):
+        """Detiene el hilo."""
+        with self._condition:
+            self._running = False
+            self._job = None
+            self._condition.notify()
+        self.wait()
+
+    def get_statistics(self):
+        """Devuelve las estadísticas de la precarga."""
+        return {
+            'prefetched_tiles': self.prefetched_tiles,
+            'skipped_tiles': self.skipped_tiles,
+            'abandoned_jobs': self.abandoned_jobs,
+        }
+
+    def _is_current(self, generation):
+        """Indica si un trabajo sigue siendo el vigente."""
+        return generation == self._generation and self._running
+
+    def run(self):
+        """Bucle principal del hilo de precarga."""
+        while True:
+            with self._condition:
+                while self._job is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                generation, generator, tiles = self._job
+                self._job = None
+
+            queue = get_job_queue()
+            for level, tx, ty in tiles:
+                if queue.wait_turn(PRIORITY_PREFETCH, lambda: not self._is_current(generation)):
+                    self.abandoned_jobs += 1
+                    break
+                if tile_key(generator, level, tx, ty) in self.tile_cache:
+                    self.skipped_tiles += 1
+                    continue
+
+                start = time.perf_counter()
+                with queue.activity(PRIORITY_PREFETCH):
+                    self.tile_cache.get_or_compute(generator, level, tx, ty, TILE_SIZE)
+                elapsed = time.perf_counter() - start
+                performance_monitor.record_stage(STAGE_PREFETCH, elapsed,
+                                                 pixels=TILE_SIZE * TILE_SIZE)
+                self.prefetched_tiles += 1
+
+                # Pausa proporcional al trabajo hecho; pause() la interrumpe
+                rest = elapsed * (1.0 / self.cpu_share - 1.0)
+                with self._condition:
+                    if self._is_current(generation) and rest > 0:
+                        self._condition.wait(rest)
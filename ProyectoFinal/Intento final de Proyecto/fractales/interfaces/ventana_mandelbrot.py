@@ -5,13 +5,27 @@ Incluye navegación fluida, zoom y rotación usando la GPU.
 
 import sys
 import math
+import time
 import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QSlider, QPushButton, QComboBox,
-                             QFrame, QFileDialog, QMessageBox)
+                             QFrame, QFileDialog, QMessageBox, QCheckBox)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QColor
-from fractales.generators.fractal_generators import MandelbrotGenerator
+from fractales.generators.fractal_generators import MandelbrotGenerator, JuliaGenerator
+from fractales.generators.disk_tile_store import get_disk_tile_store
+from fractales.generators.streaming_export import submit_export_png
+from fractales.generators.tile_cache import TileCache, cached_view_field, render_view_field
+from fractales.interfaces.render_worker import RenderWorker
+from fractales.interfaces.tile_prefetcher import TilePrefetcher
+from fractales.interfaces.frame_scheduler import FrameScheduler
+from fractales.interfaces.job_progress import JobProgressWidget
+from fractales.interfaces.performance_hud import PerformanceHUD, escape_time_quality
+from fractales.utils.config import (INTERACTIVE_TIME_BUDGET, STAGE_COLORIZE, STAGE_COMPUTE,
+                                    STAGE_PAINT, STAGE_QIMAGE, STAGE_SCALE, frame_stage,
+                                    performance_monitor)
+from fractales.utils.job_queue import PRIORITY_PREFETCH, RenderJob
+from fractales.utils.resolution_scaler import ResolutionScaler
 
 
 class MandelbrotMainWindow(QMainWindow):
@@ -34,7 +48,57 @@ class MandelbrotMainWindow(QMainWindow):
         self.current_image = None
         self.zoom_factor = 1.1
         
+        # Render del fractal en segundo plano (solo se muestra el cuadro más reciente)
+        self.render_worker = RenderWorker(self)
+        self.render_worker.frame_ready.connect(self.display_frame)
+        
+        # Fusiona los cambios de vista: un render en curso y uno pendiente
+        self.frame_scheduler = FrameScheduler(self.render_frame, asynchronous=True, parent=self)
+        self.render_worker.request_finished.connect(self.frame_scheduler.frame_done)
+        # Al terminar la navegación se pide el cuadro definitivo
+        self.frame_scheduler.idle.connect(self.generate_fractal)
+        
+        # Resolución reducida mientras se arrastra o se usa la rueda
+        self.resolution_scaler = ResolutionScaler()
+        # Presupuesto de tiempo: resolución e iteraciones que caben en cada cuadro
+        self.render_governor = self.generator.get_render_governor()
+        # Teselas ya calculadas: volver a una zona visitada (también en otra
+        # sesión, gracias al almacén en disco) no recalcula nada
+        self.tile_cache = TileCache(disk_store=get_disk_tile_store())
+        # Precarga de teselas alrededor de la vista mientras está quieta
+        self.tile_prefetcher = TilePrefetcher(self.tile_cache, parent=self)
+        self.pan_direction = (0.0, 0.0)
+        # Refinamiento de iteraciones del cuadro definitivo mientras la vista está quieta
+        self.refine_worker = RenderWorker(self, priority=PRIORITY_PREFETCH)
+        self.refine_worker.frame_ready.connect(self.display_refinement)
+        # Plan e iteraciones del cuadro en pantalla (para el panel de rendimiento)
+        self.last_plan = None
+        self.displayed_max_iter = None
+        
+        # Vista previa de Julia bajo el cursor
+        self.preview_width = 200
+        self.preview_height = 150
+        self.preview_max_iter = 100
+        self.preview_enabled = True
+        self.preview_c = None
+        self.preview_generator = JuliaGenerator()
+        self.preview_worker = RenderWorker(self)
+        self.preview_worker.frame_ready.connect(self.show_julia_preview)
+        
+        # Limitar las peticiones de la vista previa a ~30 por segundo
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(30)
+        self.preview_timer.timeout.connect(self.request_julia_preview)
+        
         self.setup_ui()
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas_label, self.hud_status,
+                                              frame_stage=self.frame_stage)
+        # Avance de las exportaciones, que corren en la cola de trabajos
+        self.job_progress = JobProgressWidget(self)
+        self.statusBar().addPermanentWidget(self.job_progress)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -120,6 +184,20 @@ class MandelbrotMainWindow(QMainWindow):
         self.canvas_label.mouseMoveEvent = self.mouse_move_event
         self.canvas_label.mouseReleaseEvent = self.mouse_release_event
         self.canvas_label.wheelEvent = self.wheel_event
+        self.canvas_label.leaveEvent = self.canvas_leave_event
+        self.canvas_label.setMouseTracking(True)
+        
+        # Recuadro con la vista previa de Julia (hijo del canvas)
+        self.preview_label = QLabel(self.canvas_label)
+        self.preview_label.setFixedSize(self.preview_width + 4, self.preview_height + 4)
+        self.preview_label.setStyleSheet("""
+            QLabel {
+                border: 2px solid #6666ff;
+                background-color: #000000;
+            }
+        """)
+        self.preview_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.preview_label.hide()
         
         main_layout.addWidget(self.canvas_label, 4)
         
@@ -205,6 +283,12 @@ class MandelbrotMainWindow(QMainWindow):
         self.rotation_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.rotation_label)
         
+        # Vista previa de Julia
+        self.preview_checkbox = QCheckBox("🌀 Vista previa Julia")
+        self.preview_checkbox.setChecked(self.preview_enabled)
+        self.preview_checkbox.toggled.connect(self.toggle_julia_preview)
+        layout.addWidget(self.preview_checkbox)
+        
         # Botón de exportar
         export_btn = QPushButton("💾 Exportar PNG")
         export_btn.clicked.connect(self.export_image)
@@ -220,6 +304,8 @@ class MandelbrotMainWindow(QMainWindow):
 • Arrastrar: Mover vista
 • Rueda: Zoom in/out
 • Click derecho: Zoom out
+• Cursor: Julia para ese c
+• F3: Panel de rendimiento
 • CUDA: Aceleración GPU""")
         help_text.setStyleSheet("font-size: 10px; color: #cccccc; margin: 5px;")
         help_text.setWordWrap(True)
@@ -230,30 +316,191 @@ class MandelbrotMainWindow(QMainWindow):
         return controls_frame
     
     def generate_fractal(self):
-        """Genera el fractal de Mandelbrot usando CUDA."""
+        """Pide un nuevo cuadro de Mandelbrot al planificador."""
+        self.frame_scheduler.request()
+    
+    def render_frame(self):
+        """Envía al hilo de render el cuadro con la vista actual."""
+        # Los renders tienen prioridad sobre la precarga y el refinamiento
+        self.tile_prefetcher.pause()
+        self.refine_worker.cancel()
         width = max(800, self.canvas_label.width())
         height = max(600, self.canvas_label.height())
         
-        # Usar el método generate del MandelbrotGenerator (ya devuelve imagen RGB coloreada)
-        colored_image = self.generator.generate(
-            width, height, self.xmin, self.xmax, 
-            self.ymin, self.ymax, self.max_iter
+        # Mientras se navega se renderiza a la fracción que cabe en el tiempo objetivo
+        if self.frame_scheduler.interactive:
+            scale = self.resolution_scaler.get_scale(width, height)
+            plan = self.render_governor.plan_escape_time(width, height, self.max_iter, scale,
+                                                         INTERACTIVE_TIME_BUDGET)
+        else:
+            plan = self.render_governor.plan_escape_time(width, height, self.max_iter)
+        width, height = self.resolution_scaler.scaled_size(width, height, plan.scale)
+        
+        # El hilo trabaja sobre una copia: la interfaz puede seguir cambiando la vista.
+        # El cuadro definitivo se entrega por pasadas de grueso a fino.
+        self.render_worker.submit(
+            self.render_timed, self.generator.snapshot(),
+            width, height, self.xmin, self.xmax,
+            self.ymin, self.ymax, plan,
+            progressive=not self.frame_scheduler.interactive,
+            requested_max_iter=self.max_iter
         )
-        
-        # Convertir a QImage
+    
+    def render_timed(self, generator, width, height, xmin, xmax, ymin, ymax, plan,
+                     progressive=False, requested_max_iter=None, cancel_check=None):
+        """Renderiza midiendo el tiempo (se ejecuta en el hilo de render).
+
+        Produce ``(imagen, segundos, plan, paso, campo, cálculo, calculado)``
+        por cada pasada, donde ``cálculo`` son los segundos de cálculo sin
+        colorear y ``calculado`` la fracción del cuadro que se calculó (el
+        resto salió de la caché); sin render progresivo hay una sola pasada
+        de paso 1. Los cuadros no progresivos (navegación) se componen con la
+        caché de teselas. Si todas las teselas de detalle del definitivo están
+        guardadas se muestra primero su composición como cuadro provisional
+        (``calculado`` 0) y después se calcula el definitivo exacto en una
+        sola pasada. Las teselas se identifican por ``requested_max_iter``,
+        las iteraciones pedidas por el usuario. ``campo`` es el campo de
+        iteraciones del cuadro definitivo calculado en CPU (para refinarlo
+        después) y None en los demás casos.
+        """
+        # Pasado el tiempo máximo de generación el render se cancela
+        cancel_check = self.render_governor.deadline_check(cancel_check)
+        start = time.perf_counter()
+        generator.max_iter = plan.max_iter
+        zoom, offset_x, offset_y = generator.view_for_bounds(width, height,
+                                                             xmin, xmax, ymin, ymax)
+        strides = None
+        if progressive and not generator.uses_cuda:
+            field = cached_view_field(generator, width, height, self.tile_cache, zoom,
+                                      offset_x, offset_y, cancel_check=cancel_check,
+                                      max_iter=requested_max_iter)
+            if field is not None:
+                # La composición remuestrea las teselas: no es el cuadro exacto
+                compute_time = time.perf_counter() - start
+                yield (generator.colorize_field(field), time.perf_counter() - start, plan, 1,
+                       None, compute_time, 0.0)
+                start = time.perf_counter()
+                strides = (1,)
+        if progressive:
+            field = None if generator.uses_cuda else np.empty((height, width), dtype=np.int32)
+            for stride, image in generator.generate_progressive(
+                    width, height, zoom, offset_x, offset_y, cancel_check=cancel_check,
+                    strides=strides, out=field):
+                yield (image, time.perf_counter() - start, plan, stride, field,
+                       generator.last_compute_time, 1.0)
+        elif generator.uses_cuda:
+            image = generator.generate_fractal(width, height, zoom, offset_x, offset_y,
+                                               cancel_check=cancel_check)
+            elapsed = time.perf_counter() - start
+            yield image, elapsed, plan, 1, None, elapsed, 1.0
+        else:
+            field, computed = render_view_field(generator, width, height, self.tile_cache,
+                                                zoom, offset_x, offset_y,
+                                                cancel_check=cancel_check,
+                                                max_iter=requested_max_iter)
+            compute_time = time.perf_counter() - start
+            yield (generator.colorize_field(field), time.perf_counter() - start, plan, 1, None,
+                   compute_time, computed)
+    
+    def display_frame(self, generation, result):
+        """Muestra el cuadro terminado que entrega el hilo de render."""
+        colored_image, elapsed, plan, stride, field, compute_time, computed = result
+        self.last_plan = plan
+        self.displayed_max_iter = plan.max_iter
+        # Las pasadas gruesas no sirven para medir el coste del cuadro
+        if stride == 1:
+            pixel_count = colored_image.shape[0] * colored_image.shape[1]
+            # El coste se reparte solo entre los píxeles calculados, no los de la caché
+            computed_pixels = int(pixel_count * computed)
+            # Iteraciones del campo antes de que el refinamiento lo modifique
+            iterations = int(field.sum(dtype=np.int64)) if field is not None else 0
+            self.resolution_scaler.record_frame(computed_pixels, elapsed)
+            self.render_governor.record_escape_time(computed_pixels, plan.max_iter, elapsed)
+            self.statusBar().showMessage(plan.describe())
+            # Tras un cuadro provisional de la caché aún llega el definitivo
+            if not self.frame_scheduler.interactive and computed:
+                self.start_prefetch()
+                # Un cuadro que llega tras otra petición ya no corresponde a la vista
+                if field is not None and not self.render_worker.is_stale(generation):
+                    self.start_refinement(field, plan)
+        show_start = time.perf_counter()
+        self.show_image(colored_image)
+        if stride == 1:
+            # El resto del tiempo del hilo de render es el coloreado de las pasadas
+            if computed:
+                performance_monitor.record_stage(STAGE_COMPUTE, compute_time,
+                                                 pixels=computed_pixels, iterations=iterations)
+            if elapsed > compute_time:
+                performance_monitor.record_stage(STAGE_COLORIZE, elapsed - compute_time,
+                                                 pixels=pixel_count)
+            performance_monitor.record_frame(
+                self.frame_stage, elapsed + time.perf_counter() - show_start, pixels=pixel_count)
+    
+    def start_refinement(self, field, plan):
+        """Refina en segundo plano las iteraciones del cuadro definitivo."""
+        generator = self.generator.snapshot()
+        generator.max_iter = plan.max_iter
+        height, width = field.shape
+        zoom, offset_x, offset_y = generator.view_for_bounds(width, height, self.xmin, self.xmax,
+                                                             self.ymin, self.ymax)
+        self.refine_worker.submit(generator.refine_iterations, field, width, height,
+                                  zoom, offset_x, offset_y)
+    
+    def display_refinement(self, generation, result):
+        """Sustituye el cuadro por su versión con más iteraciones."""
+        if self.refine_worker.is_stale(generation):
+            return
+        max_iter, colored_image = result
+        self.displayed_max_iter = max_iter
+        self.statusBar().showMessage(f"Refinando: {max_iter} iteraciones")
+        self.show_image(colored_image)
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        backend = "CUDA" if self.generator.uses_cuda else "CPU (numba)"
+        return (backend, escape_time_quality(self.last_plan, self.displayed_max_iter),
+                self.tile_cache.get_statistics()['hit_rate'])
+    
+    def show_image(self, colored_image):
+        """Muestra una imagen RGB en el lienzo."""
+        # Convertir a QImage (los cuadros reducidos se amplían al escalar al canvas)
         height, width, channel = colored_image.shape
         bytes_per_line = 3 * width
-        q_image = QImage(colored_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        with performance_monitor.measure(STAGE_QIMAGE, pixels=width * height):
+            q_image = QImage(colored_image.data, width, height, bytes_per_line,
+                             QImage.Format.Format_RGB888)
+            pixmap = QPixmap.fromImage(q_image)
         
         # Actualizar la imagen
         self.current_image = q_image
-        pixmap = QPixmap.fromImage(q_image)
-        scaled_pixmap = pixmap.scaled(
-            self.canvas_label.size(), 
-            Qt.AspectRatioMode.KeepAspectRatio, 
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.canvas_label.setPixmap(scaled_pixmap)
+        canvas_size = self.canvas_label.size()
+        with performance_monitor.measure(STAGE_SCALE,
+                                         pixels=canvas_size.width() * canvas_size.height()):
+            scaled_pixmap = pixmap.scaled(
+                canvas_size, 
+                Qt.AspectRatioMode.KeepAspectRatio, 
+                Qt.TransformationMode.SmoothTransformation
+            )
+        with performance_monitor.measure(STAGE_PAINT):
+            self.canvas_label.setPixmap(scaled_pixmap)
+    
+    def start_prefetch(self):
+        """Precarga las teselas que usarán los próximos cuadros de navegación."""
+        if self.generator.uses_cuda:
+            return
+        width = max(800, self.canvas_label.width())
+        height = max(600, self.canvas_label.height())
+        generator = self.generator.snapshot()
+        generator.max_iter = self.max_iter
+        # Primero las teselas del cuadro definitivo, para componerlo al volver
+        detail_zoom, _, _ = generator.view_for_bounds(width, height, self.xmin, self.xmax,
+                                                      self.ymin, self.ymax)
+        scale = self.resolution_scaler.get_scale(width, height)
+        width, height = self.resolution_scaler.scaled_size(width, height, scale)
+        zoom, offset_x, offset_y = generator.view_for_bounds(width, height, self.xmin, self.xmax,
+                                                             self.ymin, self.ymax)
+        self.tile_prefetcher.prefetch(generator, width, height, zoom, offset_x, offset_y,
+                                      self.pan_direction, detail_zoom=detail_zoom)
     
     def mouse_press_event(self, event):
         """Maneja clicks del mouse."""
@@ -263,8 +510,94 @@ class MandelbrotMainWindow(QMainWindow):
             # Click derecho para zoom out
             self.zoom_out()
     
+    def canvas_to_complex(self, pos):
+        """Convierte una posición del canvas en su punto del plano complejo."""
+        width = max(800, self.canvas_label.width())
+        height = max(600, self.canvas_label.height())
+        
+        # La imagen se muestra escalada y centrada dentro del canvas
+        scale = min(self.canvas_label.width() / width, self.canvas_label.height() / height)
+        image_x = (pos.x() - (self.canvas_label.width() - width * scale) / 2) / scale
+        image_y = (pos.y() - (self.canvas_label.height() - height * scale) / 2) / scale
+        
+        # Mismo mapeo de píxeles que usa el generador
+        zoom = min(width / (self.xmax - self.xmin), height / (self.ymax - self.ymin))
+        real = (image_x - width / 2) / zoom + (self.xmin + self.xmax) / 2
+        imag = (image_y - height / 2) / zoom + (self.ymin + self.ymax) / 2
+        
+        rotation = self.generator.rotation
+        if rotation != 0.0:
+            cos_r = math.cos(rotation)
+            sin_r = math.sin(rotation)
+            real, imag = real * cos_r - imag * sin_r, real * sin_r + imag * cos_r
+        
+        return real, imag
+    
+    def schedule_julia_preview(self, pos):
+        """Programa la vista previa de Julia para el punto bajo el cursor."""
+        self.preview_c = self.canvas_to_complex(pos)
+        if not self.preview_timer.isActive():
+            self.preview_timer.start()
+    
+    def request_julia_preview(self):
+        """Envía al hilo de render la vista previa más reciente."""
+        if self.preview_enabled and self.preview_c is not None:
+            c_real, c_imag = self.preview_c
+            self.preview_worker.submit(
+                self.render_julia_preview, c_real, c_imag,
+                self.generator.current_palette_index
+            )
+    
+    def render_julia_preview(self, c_real, c_imag, palette_index, cancel_check=None):
+        """Calcula la vista previa de Julia (se ejecuta en el hilo de render)."""
+        self.preview_generator.set_color_scheme(palette_index)
+        self.preview_generator.set_julia_constant(c_real, c_imag)
+        return self.preview_generator.generate_fractal(
+            self.preview_width, self.preview_height,
+            zoom=self.preview_width / 3.2, offset_x=0.0, offset_y=0.0,
+            cancel_check=cancel_check
+        )
+    
+    def show_julia_preview(self, generation, image):
+        """Muestra en el recuadro la vista previa recibida del hilo de render."""
+        if not self.preview_enabled or self.preview_c is None:
+            return
+        
+        height, width, _ = image.shape
+        q_image = QImage(image.data, width, height, 3 * width, QImage.Format.Format_RGB888)
+        self.preview_label.setPixmap(QPixmap.fromImage(q_image))
+        self.position_julia_preview()
+        self.preview_label.show()
+    
+    def position_julia_preview(self):
+        """Coloca el recuadro de la vista previa en la esquina inferior derecha."""
+        margin = 10
+        self.preview_label.move(
+            self.canvas_label.width() - self.preview_label.width() - margin,
+            self.canvas_label.height() - self.preview_label.height() - margin
+        )
+    
+    def hide_julia_preview(self):
+        """Oculta la vista previa y descarta la petición pendiente."""
+        self.preview_c = None
+        self.preview_timer.stop()
+        self.preview_label.hide()
+    
+    def toggle_julia_preview(self, enabled):
+        """Activa o desactiva la vista previa de Julia."""
+        self.preview_enabled = enabled
+        if not enabled:
+            self.hide_julia_preview()
+    
+    def canvas_leave_event(self, event):
+        """Oculta la vista previa cuando el cursor sale del canvas."""
+        self.hide_julia_preview()
+    
     def mouse_move_event(self, event):
         """Maneja arrastre del mouse para navegación fluida."""
+        if self.preview_enabled and not (event.buttons() & Qt.MouseButton.LeftButton):
+            self.schedule_julia_preview(event.position())
+        
         if self.drag_start and (event.buttons() & Qt.MouseButton.LeftButton):
             # Calcular desplazamiento
             current_pos = event.position()
@@ -280,10 +613,14 @@ class MandelbrotMainWindow(QMainWindow):
             self.ymin += dy * y_range  # Invertir Y
             self.ymax += dy * y_range
             
+            # Dirección reciente del desplazamiento (para precargar por delante)
+            self.pan_direction = (0.7 * self.pan_direction[0] - dx * x_range,
+                                  0.7 * self.pan_direction[1] + dy * y_range)
+            
             self.drag_start = current_pos
             
-            # Regenerar fractal con navegación fluida
-            QTimer.singleShot(10, self.generate_fractal)
+            # El planificador fusiona los movimientos en un único render
+            self.frame_scheduler.request(interactive=True)
     
     def mouse_release_event(self, event):
         """Maneja liberación del mouse."""
@@ -318,7 +655,7 @@ class MandelbrotMainWindow(QMainWindow):
         self.ymax = fractal_y + y_range * (1 - mouse_y)
         
         # Regenerar fractal
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def zoom_in(self):
         """Zoom in centrado."""
@@ -385,37 +722,60 @@ class MandelbrotMainWindow(QMainWindow):
         self.generate_fractal()
     
     def export_image(self):
-        """Exporta la imagen actual en alta resolución."""
+        """Exporta la imagen actual en alta resolución.
+
+        La exportación se encola como trabajo en segundo plano: la ventana
+        sigue respondiendo y la exportación cede la CPU mientras se navega.
+        """
         try:
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "Guardar Fractal", "mandelbrot_hd.png", "PNG Files (*.png)"
             )
             
             if file_path:
-                # Generar en alta resolución
+                # Generar en alta resolución por franjas escritas directamente en el PNG
                 width, height = 4000, 4000
-                colored_image = self.generator.generate(
-                    width, height, self.xmin, self.xmax, 
-                    self.ymin, self.ymax, self.max_iter
+                generator = self.generator.snapshot()
+                generator.max_iter = self.max_iter
+                zoom, offset_x, offset_y = generator.view_for_bounds(
+                    width, height, self.xmin, self.xmax, self.ymin, self.ymax
                 )
-                
-                # Convertir y guardar
-                height, width, channel = colored_image.shape
-                bytes_per_line = 3 * width
-                q_image = QImage(colored_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-                
-                q_image.save(file_path)
-                
-                QMessageBox.information(self, "Éxito", f"Imagen guardada en:\n{file_path}")
+                job = submit_export_png(generator, file_path, width, height,
+                                        zoom, offset_x, offset_y)
+                self.job_progress.track(job, self.export_finished)
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al guardar imagen:\n{e}")
     
+    def export_finished(self, job):
+        """Informa del resultado de una exportación."""
+        if job.state == RenderJob.FINISHED:
+            self.statusBar().showMessage(f"Exportado: {job.result}")
+            QMessageBox.information(self, "Éxito", f"Imagen guardada en:\n{job.result}")
+        elif job.state == RenderJob.FAILED:
+            QMessageBox.critical(self, "Error", f"Error al guardar imagen:\n{job.error}")
+        else:
+            self.statusBar().showMessage("Exportación cancelada")
+    
     def resizeEvent(self, event):
         """Maneja el redimensionamiento."""
         super().resizeEvent(event)
+        # El planificador fusiona los eventos de redimensionado en un solo render
         if hasattr(self, 'current_image') and self.current_image:
-            QTimer.singleShot(100, self.generate_fractal)
+            self.frame_scheduler.request(interactive=True)
+        if hasattr(self, 'preview_label'):
+            self.position_julia_preview()
+    
+    def closeEvent(self, event):
+        """Detiene los hilos de render y las exportaciones al cerrar la ventana."""
+        self.job_progress.cancel_all()
+        self.render_worker.stop()
+        self.preview_worker.stop()
+        self.refine_worker.stop()
+        self.tile_prefetcher.stop()
+        self.tile_cache.flush()
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
 
 
 def main():
@@ -6,12 +6,26 @@ Interfaces fluidas y minimalistas para todos los fractales
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QSlider, QSpinBox, QComboBox,
                              QFrame, QApplication, QFileDialog, QMessageBox, QDoubleSpinBox)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint
-from PyQt6.QtGui import QPixmap, QImage, QPainter, QFont, QPen, QColor
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint, QSize
+from PyQt6.QtGui import QPixmap, QImage, QPainter, QFont, QPen, QColor, QIcon
 
 import numpy as np
 import math
-from ..generators.fractal_generators import JuliaGenerator
+import time
+from ..generators.fractal_generators import JULIA_PRESETS, JuliaGenerator
+from ..generators.disk_tile_store import get_disk_tile_store
+from ..generators.streaming_export import submit_export_png
+from ..generators.tile_cache import TileCache, cached_view_field, render_view_field
+from ..utils.config import (INTERACTIVE_TIME_BUDGET, STAGE_COLORIZE, STAGE_COMPUTE, STAGE_PAINT,
+                            STAGE_QIMAGE, STAGE_SCALE, frame_stage, performance_monitor)
+from ..utils.job_queue import PRIORITY_PREFETCH, RenderJob
+from ..utils.resolution_scaler import ResolutionScaler
+from ..utils.render_governor import RenderGovernor
+from .render_worker import RenderWorker
+from .tile_prefetcher import TilePrefetcher
+from .frame_scheduler import FrameScheduler
+from .job_progress import JobProgressWidget
+from .performance_hud import PerformanceHUD, depth_quality, escape_time_quality
 
 
 class JuliaMainWindow(QMainWindow):
@@ -20,9 +34,45 @@ class JuliaMainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.generator = JuliaGenerator()
+        
+        # Render en segundo plano: solo se muestra el cuadro más reciente
+        self.render_worker = RenderWorker(self)
+        self.render_worker.frame_ready.connect(self.display_frame)
+        
+        # Fusiona los cambios de parámetros: un render en curso y uno pendiente
+        self.frame_scheduler = FrameScheduler(self.render_frame, asynchronous=True, parent=self)
+        self.render_worker.request_finished.connect(self.frame_scheduler.frame_done)
+        # Al terminar la navegación se pide el cuadro definitivo
+        self.frame_scheduler.idle.connect(self.update_fractal)
+        
+        # Resolución reducida mientras se arrastra o se usa la rueda
+        self.resolution_scaler = ResolutionScaler()
+        # Presupuesto de tiempo: resolución e iteraciones que caben en cada cuadro
+        self.render_governor = self.generator.get_render_governor()
+        # Teselas ya calculadas: volver a una zona visitada (también en otra
+        # sesión, gracias al almacén en disco) no recalcula nada
+        self.tile_cache = TileCache(disk_store=get_disk_tile_store())
+        # Precarga de teselas alrededor de la vista mientras está quieta
+        self.tile_prefetcher = TilePrefetcher(self.tile_cache, parent=self)
+        self.pan_direction = (0.0, 0.0)
+        # Refinamiento de iteraciones del cuadro definitivo mientras la vista está quieta
+        self.refine_worker = RenderWorker(self, priority=PRIORITY_PREFETCH)
+        self.refine_worker.frame_ready.connect(self.display_refinement)
+        # Plan e iteraciones del cuadro en pantalla (para el panel de rendimiento)
+        self.last_plan = None
+        self.displayed_max_iter = None
+        
         self.setup_ui()
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status,
+                                              frame_stage=self.frame_stage)
         self.setup_mouse_interaction()
         self.setup_presets()
+        # Avance de las exportaciones, que corren en la cola de trabajos
+        self.job_progress = JobProgressWidget(self)
+        self.statusBar().addPermanentWidget(self.job_progress)
+        self.update_preset_thumbnails()
         self.update_fractal()
     
     def setup_ui(self):
@@ -82,10 +132,7 @@ class JuliaMainWindow(QMainWindow):
         # Presets de Julia
         controls_layout1.addWidget(QLabel("Preset:"))
         self.preset_combo = QComboBox()
-        self.preset_combo.addItems([
-            "Clásico", "Dragón", "Espiral", "Hoja", "Rayo", 
-            "Coral", "Tormenta", "Galaxia", "Personalizado"
-        ])
+        self.preset_combo.addItems(list(JULIA_PRESETS) + ["Personalizado"])
         self.preset_combo.currentIndexChanged.connect(self.change_preset)
         controls_layout1.addWidget(self.preset_combo)
         
@@ -194,17 +241,27 @@ class JuliaMainWindow(QMainWindow):
     
     def setup_presets(self):
         """Configura los presets de Julia."""
-        self.julia_presets = {
-            0: (-0.7, 0.27015),    # Clásico
-            1: (-0.835, -0.2321),  # Dragón
-            2: (-0.8, 0.156),      # Espiral
-            3: (-0.75, 0.11),      # Hoja
-            4: (-0.4, 0.6),        # Rayo
-            5: (0.285, 0.01),      # Coral
-            6: (-0.123, 0.745),    # Tormenta
-            7: (-0.194, 0.6557),   # Galaxia
-            8: (-0.7, 0.27015)     # Personalizado (valor inicial)
-        }
+        self.julia_presets = dict(enumerate(JULIA_PRESETS.values()))
+        # Personalizado (valor inicial)
+        self.julia_presets[len(self.julia_presets)] = JULIA_PRESETS["Clásico"]
+    
+    def update_preset_thumbnails(self):
+        """Renderiza en un solo lote las miniaturas de los presets."""
+        thumb_width, thumb_height = 48, 36
+        c_values = [self.julia_presets[index] for index in range(len(self.julia_presets))]
+        
+        # Vista completa del conjunto (unas 3.2 unidades de ancho) con pocas iteraciones
+        thumbnails = self.generator.generate_batch(
+            c_values, thumb_width, thumb_height,
+            zoom=thumb_width / 3.2, offset_x=0.0, offset_y=0.0,
+            max_iter=min(self.generator.max_iter, 150)
+        )
+        
+        self.preset_combo.setIconSize(QSize(thumb_width, thumb_height))
+        for index, thumbnail in enumerate(thumbnails):
+            q_image = QImage(thumbnail.data, thumb_width, thumb_height,
+                           3 * thumb_width, QImage.Format.Format_RGB888).copy()
+            self.preset_combo.setItemIcon(index, QIcon(QPixmap.fromImage(q_image)))
     
     def change_preset(self, index):
         """Cambia el preset de Julia."""
@@ -256,11 +313,13 @@ class JuliaMainWindow(QMainWindow):
     def change_color_scheme(self, index):
         """Cambia el esquema de color."""
         self.generator.set_color_scheme(index)
+        self.update_preset_thumbnails()
         self.update_fractal()
     
     def change_color_mode(self, index):
         """Cambia el modo de coloración."""
         self.generator.set_color_mode(index)
+        self.update_preset_thumbnails()
         self.update_fractal()
     
     def reset_view(self):
@@ -291,8 +350,12 @@ class JuliaMainWindow(QMainWindow):
             sensitivity = 0.5
             self.generator.move(delta.x() * sensitivity, delta.y() * sensitivity)
             
-            # Actualizar fractal con un pequeño delay para fluidez
-            QTimer.singleShot(10, self.update_fractal)
+            # Dirección reciente del desplazamiento (para precargar por delante)
+            self.pan_direction = (0.7 * self.pan_direction[0] - delta.x(),
+                                  0.7 * self.pan_direction[1] - delta.y())
+            
+            # El planificador fusiona los movimientos en un único render
+            self.frame_scheduler.request(interactive=True)
     
     def mouseReleaseEvent(self, event):
         """Detecta cuando se suelta el mouse."""
@@ -317,53 +380,236 @@ class JuliaMainWindow(QMainWindow):
             else:
                 self.generator.zoom_out(zoom_factor)
             
-            self.update_fractal()
+            self.frame_scheduler.request(interactive=True)
     
     def update_fractal(self):
-        """Actualiza el fractal en tiempo real."""
+        """Pide un nuevo cuadro del fractal al planificador."""
+        self.frame_scheduler.request()
+    
+    def render_frame(self):
+        """Envía al hilo de render el cuadro con los parámetros actuales."""
+        # Los renders tienen prioridad sobre la precarga y el refinamiento
+        self.tile_prefetcher.pause()
+        self.refine_worker.cancel()
+        width, height = 900, 700
+        if self.frame_scheduler.interactive:
+            scale = self.resolution_scaler.get_scale(width, height)
+            plan = self.render_governor.plan_escape_time(width, height, self.generator.max_iter,
+                                                         scale, INTERACTIVE_TIME_BUDGET)
+        else:
+            plan = self.render_governor.plan_escape_time(width, height, self.generator.max_iter)
+        # El hilo trabaja sobre una copia: la interfaz puede seguir cambiando la vista
+        generator = self.generator.snapshot()
+        generator.max_iter = plan.max_iter
+        # El cuadro definitivo se entrega por pasadas de grueso a fino
+        self.render_worker.submit(self.render_scaled, generator, width, height, plan,
+                                  progressive=not self.frame_scheduler.interactive,
+                                  requested_max_iter=self.generator.max_iter)
+    
+    def render_scaled(self, generator, width, height, plan, progressive=False,
+                      requested_max_iter=None, cancel_check=None):
+        """Renderiza a una fracción de la resolución (se ejecuta en el hilo de render).
+
+        Produce ``(imagen, segundos, plan, paso, campo, cálculo, calculado)``
+        por cada pasada, donde ``cálculo`` son los segundos de cálculo sin
+        colorear y ``calculado`` la fracción del cuadro que se calculó (el
+        resto salió de la caché); sin render progresivo hay una sola pasada
+        de paso 1. Los cuadros no progresivos (navegación) se componen con la
+        caché de teselas. Si todas las teselas de detalle del definitivo están
+        guardadas se muestra primero su composición como cuadro provisional
+        (``calculado`` 0) y después se calcula el definitivo exacto en una
+        sola pasada. Las teselas se identifican por ``requested_max_iter``,
+        las iteraciones pedidas por el usuario. ``campo`` es el campo de
+        iteraciones del cuadro definitivo calculado en CPU (para refinarlo
+        después) y None en los demás casos.
+        """
+        render_width, render_height = self.resolution_scaler.scaled_size(width, height, plan.scale)
+        zoom = generator.zoom * render_width / width
+        # Pasado el tiempo máximo de generación el render se cancela
+        cancel_check = self.render_governor.deadline_check(cancel_check)
+        start = time.perf_counter()
+        strides = None
+        if progressive and not generator.uses_cuda:
+            field = cached_view_field(generator, render_width, render_height, self.tile_cache,
+                                      zoom=zoom, cancel_check=cancel_check,
+                                      max_iter=requested_max_iter)
+            if field is not None:
+                # La composición remuestrea las teselas: no es el cuadro exacto
+                compute_time = time.perf_counter() - start
+                yield (generator.colorize_field(field), time.perf_counter() - start, plan, 1,
+                       None, compute_time, 0.0)
+                start = time.perf_counter()
+                strides = (1,)
+        if progressive:
+            field = None
+            if not generator.uses_cuda:
+                field = np.empty((render_height, render_width), dtype=np.int32)
+            for stride, image in generator.generate_progressive(
+                    render_width, render_height, zoom=zoom, cancel_check=cancel_check,
+                    strides=strides, out=field):
+                yield (image, time.perf_counter() - start, plan, stride, field,
+                       generator.last_compute_time, 1.0)
+        elif generator.uses_cuda:
+            image = generator.generate_fractal(render_width, render_height, zoom=zoom,
+                                               cancel_check=cancel_check)
+            elapsed = time.perf_counter() - start
+            yield image, elapsed, plan, 1, None, elapsed, 1.0
+        else:
+            field, computed = render_view_field(generator, render_width, render_height,
+                                                self.tile_cache, zoom=zoom,
+                                                cancel_check=cancel_check,
+                                                max_iter=requested_max_iter)
+            compute_time = time.perf_counter() - start
+            yield (generator.colorize_field(field), time.perf_counter() - start, plan, 1, None,
+                   compute_time, computed)
+    
+    def start_prefetch(self):
+        """Precarga las teselas que usarán los próximos cuadros de navegación."""
+        if self.generator.uses_cuda:
+            return
+        width, height = 900, 700
+        scale = self.resolution_scaler.get_scale(width, height)
+        render_width, render_height = self.resolution_scaler.scaled_size(width, height, scale)
+        generator = self.generator.snapshot()
+        # Primero las teselas del cuadro definitivo, para componerlo al volver
+        self.tile_prefetcher.prefetch(generator, render_width, render_height,
+                                      generator.zoom * render_width / width,
+                                      generator.offset_x, generator.offset_y,
+                                      self.pan_direction, detail_zoom=generator.zoom)
+    
+    def display_frame(self, generation, result):
+        """Muestra el cuadro terminado que entrega el hilo de render."""
         try:
-            width, height = 900, 700
-            fractal_array = self.generator.generate_fractal(width, height)
+            fractal_array, elapsed, plan, stride, field, compute_time, computed = result
+            height, width, _ = fractal_array.shape
+            self.last_plan = plan
+            self.displayed_max_iter = plan.max_iter
+            # Las pasadas gruesas no sirven para medir el coste del cuadro
+            if stride == 1:
+                # El coste se reparte solo entre los píxeles calculados, no los de la caché
+                computed_pixels = int(width * height * computed)
+                # Iteraciones del campo antes de que el refinamiento lo modifique
+                iterations = int(field.sum(dtype=np.int64)) if field is not None else 0
+                self.resolution_scaler.record_frame(computed_pixels, elapsed)
+                self.render_governor.record_escape_time(computed_pixels, plan.max_iter, elapsed)
+                self.statusBar().showMessage(plan.describe())
+                # Tras un cuadro provisional de la caché aún llega el definitivo
+                if not self.frame_scheduler.interactive and computed:
+                    self.start_prefetch()
+                    # Un cuadro que llega tras otra petición ya no corresponde a la vista
+                    if field is not None and not self.render_worker.is_stale(generation):
+                        self.start_refinement(field, plan)
+            show_start = time.perf_counter()
+            self.show_image(fractal_array)
+            if stride == 1:
+                # El resto del tiempo del hilo de render es el coloreado de las pasadas
+                if computed:
+                    performance_monitor.record_stage(STAGE_COMPUTE, compute_time,
+                                                     pixels=computed_pixels,
+                                                     iterations=iterations)
+                if elapsed > compute_time:
+                    performance_monitor.record_stage(STAGE_COLORIZE, elapsed - compute_time,
+                                                     pixels=width * height)
+                performance_monitor.record_frame(
+                    self.frame_stage, elapsed + time.perf_counter() - show_start,
+                    pixels=width * height)
             
+        except Exception as e:
+            print(f"Error generando fractal: {e}")
+    
+    def start_refinement(self, field, plan):
+        """Refina en segundo plano las iteraciones del cuadro definitivo."""
+        generator = self.generator.snapshot()
+        generator.max_iter = plan.max_iter
+        height, width = field.shape
+        self.refine_worker.submit(generator.refine_iterations, field, width, height,
+                                  zoom=generator.zoom * width / 900)
+    
+    def display_refinement(self, generation, result):
+        """Sustituye el cuadro por su versión con más iteraciones."""
+        if self.refine_worker.is_stale(generation):
+            return
+        max_iter, fractal_array = result
+        self.displayed_max_iter = max_iter
+        self.statusBar().showMessage(f"Refinando: {max_iter} iteraciones")
+        self.show_image(fractal_array)
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        backend = "CUDA" if self.generator.uses_cuda else "CPU (numba)"
+        return (backend, escape_time_quality(self.last_plan, self.displayed_max_iter),
+                self.tile_cache.get_statistics()['hit_rate'])
+    
+    def show_image(self, fractal_array):
+        """Muestra una imagen RGB en el lienzo."""
+        try:
+            height, width, _ = fractal_array.shape
             # Convertir a QImage
-            q_image = QImage(fractal_array.data, width, height, 
-                           3 * width, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_image)
-            self.canvas.setPixmap(pixmap)
+            with performance_monitor.measure(STAGE_QIMAGE, pixels=width * height):
+                q_image = QImage(fractal_array.data, width, height, 
+                               3 * width, QImage.Format.Format_RGB888)
+                pixmap = QPixmap.fromImage(q_image)
+            
+            # Los cuadros interactivos se amplían al tamaño del lienzo
+            if width != 900:
+                with performance_monitor.measure(STAGE_SCALE, pixels=900 * 700):
+                    pixmap = pixmap.scaled(900, 700, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                           Qt.TransformationMode.SmoothTransformation)
+            with performance_monitor.measure(STAGE_PAINT):
+                self.canvas.setPixmap(pixmap)
             
         except Exception as e:
             print(f"Error generando fractal: {e}")
     
+    def closeEvent(self, event):
+        """Detiene el hilo de render y las exportaciones al cerrar la ventana."""
+        self.job_progress.cancel_all()
+        self.render_worker.stop()
+        self.refine_worker.stop()
+        self.tile_prefetcher.stop()
+        self.tile_cache.flush()
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
+    
     def export_high_res(self):
-        """Exporta el fractal en alta resolución."""
+        """Exporta el fractal en alta resolución.
+
+        La imagen se renderiza por franjas que se escriben directamente en el
+        PNG, así que la memoria no depende de la resolución. La exportación
+        corre en la cola de trabajos y cede la CPU mientras se navega.
+        """
         try:
             export_width = 4000
             export_height = 4000
             
-            print(f"Generando Julia en resolución {export_width}x{export_height}...")
-            
-            # Generar imagen de alta resolución
-            high_res_image = self.generator.generate_fractal(export_width, export_height)
-            
-            # Convertir a QImage
-            qimage = QImage(high_res_image.data, export_width, export_height, 
-                          3 * export_width, QImage.Format.Format_RGB888)
-            
             # Diálogo para guardar
             file_path, _ = QFileDialog.getSaveFileName(
-                self, "Exportar Julia", "julia.png", 
-                "PNG Files (*.png);;JPG Files (*.jpg);;All Files (*)"
+                self, "Exportar Julia", "julia.png", "PNG Files (*.png)"
             )
+            if not file_path:
+                return
             
-            if file_path:
-                qimage.save(file_path)
-                QMessageBox.information(self, "Éxito", 
-                                      f"Fractal exportado correctamente:\n{file_path}")
-                print(f"Imagen guardada en: {file_path}")
+            print(f"Generando Julia en resolución {export_width}x{export_height}...")
+            job = submit_export_png(self.generator.snapshot(), file_path,
+                                    export_width, export_height)
+            self.job_progress.track(job, self.export_finished)
         
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error al exportar: {str(e)}")
             print(f"Error en exportación: {e}")
+    
+    def export_finished(self, job):
+        """Informa del resultado de una exportación."""
+        if job.state == RenderJob.FINISHED:
+            self.statusBar().showMessage(f"Exportado: {job.result}")
+            QMessageBox.information(self, "Éxito", 
+                                  f"Fractal exportado correctamente:\n{job.result}")
+            print(f"Imagen guardada en: {job.result}")
+        elif job.state == RenderJob.FAILED:
+            QMessageBox.warning(self, "Error", f"Error al exportar: {job.error}")
+            print(f"Error en exportación: {job.error}")
+        else:
+            self.statusBar().showMessage("Exportación cancelada")
 
 
 # Clases básicas para los otros fractales (implementación simplificada)
@@ -375,6 +621,15 @@ class KochMainWindow(QMainWindow):
         self.points = []
         self.rotation = 0  # Agregar variable de rotación
         self.setup_ui()
+        self.frame_scheduler = FrameScheduler(self.generate_fractal, parent=self)
+        self.frame_scheduler.idle.connect(self.refine_provisional_frame)
+        # Limita el nivel de recursión al presupuesto de tiempo y de elementos
+        self.render_governor = RenderGovernor()
+        self.last_plan = None
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status, "segmentos",
+                                              frame_stage=self.frame_stage)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -514,14 +769,23 @@ class KochMainWindow(QMainWindow):
         """Actualiza el nivel."""
         level = self.level_slider.value()
         self.level_label.setText(f"Nivel: {level}")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_rotation(self):
         """Actualiza la rotación."""
         rotation = self.rotation_slider.value()
         self.rotation = rotation
         self.rotation_label.setText(f"Rotación: {rotation}°")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        return "QPainter", depth_quality(self.last_plan), None
+    
+    def refine_provisional_frame(self):
+        """Al terminar la interacción, repite el cuadro si se dibujó a menor nivel."""
+        if self.last_plan is not None and self.last_plan.provisional:
+            self.frame_scheduler.request()
     
     def rotate_point(self, x, y, center_x, center_y, angle_degrees):
         """Rota un punto alrededor de un centro."""
@@ -599,8 +863,14 @@ class KochMainWindow(QMainWindow):
     
     def generate_fractal(self):
         """Genera la curva de Koch."""
-        level = self.level_slider.value()
+        requested_level = self.level_slider.value()
         fractal_type = self.type_combo.currentText()
+        sides = 1 if fractal_type == "Línea Simple" else 3
+        time_budget = INTERACTIVE_TIME_BUDGET if self.frame_scheduler.interactive else None
+        plan = self.render_governor.plan_depth(requested_level, 4, sides, time_budget=time_budget)
+        level = plan.depth
+        num_segments = sides * (4 ** level)
+        start = time.perf_counter()
         
         # Crear imagen
         image = QImage(600, 600, QImage.Format.Format_RGB888)
@@ -612,9 +882,9 @@ class KochMainWindow(QMainWindow):
         
         if fractal_type == "Línea Simple":
             # Una sola línea horizontal
-            start = (50, 300)
-            end = (550, 300)
-            points = self.koch_line(start, end, level)
+            line_start = (50, 300)
+            line_end = (550, 300)
+            points = self.koch_line(line_start, line_end, level)
             
             # Aplicar rotación
             center_x, center_y = 300, 300
@@ -685,12 +955,18 @@ class KochMainWindow(QMainWindow):
                                    int(points[i+1][0]), int(points[i+1][1]))
         
         painter.end()
+        performance_monitor.record_stage(STAGE_PAINT, time.perf_counter() - start,
+                                         elements=num_segments)
         
-        pixmap = QPixmap.fromImage(image)
+        with performance_monitor.measure(STAGE_QIMAGE, pixels=600 * 600):
+            pixmap = QPixmap.fromImage(image)
         self.canvas.setPixmap(pixmap)
         
-        # Calcular número de segmentos
-        num_segments = 3 * (4 ** level)
+        elapsed = time.perf_counter() - start
+        self.render_governor.record_geometry(num_segments, elapsed)
+        performance_monitor.record_frame(self.frame_stage, elapsed, elements=num_segments)
+        self.last_plan = plan
+        self.statusBar().showMessage(plan.describe())
         self.setWindowTitle(f"❄️ Curva de Koch CORREGIDA - Nivel {level} - {num_segments} segmentos")
     
     def export_fractal(self):
@@ -747,6 +1023,11 @@ class KochMainWindow(QMainWindow):
             from PyQt6.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Error", f"Error al exportar: {e}")
 
+    def closeEvent(self, event):
+        """Libera la etapa de cuadro de la ventana en el monitor al cerrarla."""
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
+
 
 class TreeMainWindow(QMainWindow):
     """Ventana principal para el Árbol Fractal recursivo con navegación avanzada."""
@@ -763,6 +1044,15 @@ class TreeMainWindow(QMainWindow):
         self.last_mouse_pos = None
         
         self.setup_ui()
+        self.frame_scheduler = FrameScheduler(self.generate_fractal, parent=self)
+        self.frame_scheduler.idle.connect(self.refine_provisional_frame)
+        # Limita el nivel de recursión al presupuesto de tiempo y de elementos
+        self.render_governor = RenderGovernor()
+        self.last_plan = None
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status, "ramas",
+                                              frame_stage=self.frame_stage)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -839,7 +1129,7 @@ class TreeMainWindow(QMainWindow):
             self.offset_x += delta.x()
             self.offset_y += delta.y()
             self.last_mouse_pos = event.pos()
-            self.generate_fractal()
+            self.frame_scheduler.request(interactive=True)
     
     def mouse_release_event(self, event):
         """Maneja la liberación del mouse."""
@@ -851,7 +1141,7 @@ class TreeMainWindow(QMainWindow):
         delta = event.angleDelta().y()
         zoom_factor = 1.1 if delta > 0 else 0.9
         self.zoom *= zoom_factor
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def create_controls(self):
         """Crea los controles avanzados."""
@@ -1002,13 +1292,13 @@ class TreeMainWindow(QMainWindow):
         zoom_value = self.zoom_slider.value() / 100.0
         self.zoom = zoom_value
         self.zoom_label.setText(f"Zoom: {zoom_value:.1f}x")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_rotation(self):
         rotation = self.rotation_slider.value()
         self.rotation = rotation
         self.rotation_label.setText(f"Rotación: {rotation}°")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def reset_view(self):
         self.zoom = 1.0
@@ -1017,27 +1307,27 @@ class TreeMainWindow(QMainWindow):
         self.rotation = 0
         self.zoom_slider.setValue(100)
         self.rotation_slider.setValue(0)
-        self.generate_fractal()
+        self.frame_scheduler.request()
     
     def update_level(self):
         level = self.level_slider.value()
         self.level_label.setText(f"Nivel: {level}")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_angle(self):
         angle = self.angle_slider.value()
         self.angle_label.setText(f"Ángulo: {angle}°")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_factor(self):
         factor = self.factor_slider.value() / 100.0
         self.factor_label.setText(f"Factor: {factor:.2f}")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_thickness(self):
         thickness = self.thickness_slider.value()
         self.thickness_label.setText(f"Grosor: {thickness}")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def randomize(self):
         """Aleatoriza los parámetros."""
@@ -1045,7 +1335,16 @@ class TreeMainWindow(QMainWindow):
         self.angle_slider.setValue(random.randint(15, 45))
         self.factor_slider.setValue(random.randint(60, 85))
         self.thickness_slider.setValue(random.randint(2, 10))
-        self.generate_fractal()
+        self.frame_scheduler.request()
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        return "QPainter", depth_quality(self.last_plan), None
+    
+    def refine_provisional_frame(self):
+        """Al terminar la interacción, repite el cuadro si se dibujó a menor nivel."""
+        if self.last_plan is not None and self.last_plan.provisional:
+            self.frame_scheduler.request()
     
     def get_branch_color(self, level, max_level, style):
         """Obtiene el color de la rama."""
@@ -1138,10 +1437,15 @@ class TreeMainWindow(QMainWindow):
     
     def generate_fractal(self):
         """Genera el árbol fractal."""
-        level = self.level_slider.value()
+        requested_level = self.level_slider.value()
         style = self.style_combo.currentText()
         thickness = self.thickness_slider.value()
         tree_type = self.tree_type.currentText()
+        branching = 3 if tree_type in ("Ternario", "Natural") else 2
+        time_budget = INTERACTIVE_TIME_BUDGET if self.frame_scheduler.interactive else None
+        plan = self.render_governor.plan_depth(requested_level, branching, 1, time_budget=time_budget)
+        level = plan.depth
+        start = time.perf_counter()
         
         # Crear imagen
         canvas_size = 700
@@ -1162,9 +1466,18 @@ class TreeMainWindow(QMainWindow):
                         initial_length, initial_angle, level, level, style, thickness, tree_type)
         
         painter.end()
+        branches = branching ** level
+        performance_monitor.record_stage(STAGE_PAINT, time.perf_counter() - start,
+                                         elements=branches)
         
-        pixmap = QPixmap.fromImage(image)
+        with performance_monitor.measure(STAGE_QIMAGE, pixels=canvas_size * canvas_size):
+            pixmap = QPixmap.fromImage(image)
         self.canvas.setPixmap(pixmap)
+        elapsed = time.perf_counter() - start
+        self.render_governor.record_geometry(branches, elapsed)
+        performance_monitor.record_frame(self.frame_stage, elapsed, elements=branches)
+        self.last_plan = plan
+        self.statusBar().showMessage(plan.describe())
         
         # Actualizar título
         zoom_info = f"- Zoom: {self.zoom:.1f}x" if self.zoom != 1.0 else ""
@@ -1185,6 +1498,10 @@ class TreeMainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error: {e}")
 
+    def closeEvent(self, event):
+        """Libera la etapa de cuadro de la ventana en el monitor al cerrarla."""
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
 
 
 class SierpinskiMainWindow(QMainWindow):
@@ -1194,6 +1511,15 @@ class SierpinskiMainWindow(QMainWindow):
         super().__init__()
         self.rotation = 0  # Variable de rotación
         self.setup_ui()
+        self.frame_scheduler = FrameScheduler(self.generate_fractal, parent=self)
+        self.frame_scheduler.idle.connect(self.refine_provisional_frame)
+        # Limita el nivel de recursión al presupuesto de tiempo y de elementos
+        self.render_governor = RenderGovernor()
+        self.last_plan = None
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.frame_stage = frame_stage(self)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status, "triángulos",
+                                              frame_stage=self.frame_stage)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -1331,14 +1657,23 @@ class SierpinskiMainWindow(QMainWindow):
         """Actualiza el nivel."""
         level = self.level_slider.value()
         self.level_label.setText(f"Nivel: {level}")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
     
     def update_rotation(self):
         """Actualiza la rotación."""
         rotation = self.rotation_slider.value()
         self.rotation = rotation
         self.rotation_label.setText(f"Rotación: {rotation}°")
-        self.generate_fractal()
+        self.frame_scheduler.request(interactive=True)
+    
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        return "QPainter", depth_quality(self.last_plan), None
+    
+    def refine_provisional_frame(self):
+        """Al terminar la interacción, repite el cuadro si se dibujó a menor nivel."""
+        if self.last_plan is not None and self.last_plan.provisional:
+            self.frame_scheduler.request()
     
     def rotate_point(self, x, y, center_x, center_y, angle_degrees):
         """Rota un punto alrededor de un centro."""
@@ -1386,8 +1721,12 @@ class SierpinskiMainWindow(QMainWindow):
     
     def generate_fractal(self):
         """Genera el triángulo de Sierpinski con rotación."""
-        level = self.level_slider.value()
+        requested_level = self.level_slider.value()
         style = self.style_combo.currentText()
+        time_budget = INTERACTIVE_TIME_BUDGET if self.frame_scheduler.interactive else None
+        plan = self.render_governor.plan_depth(requested_level, 3, 1, time_budget=time_budget)
+        level = plan.depth
+        start = time.perf_counter()
         
         image = QImage(800, 600, QImage.Format.Format_RGB888)
         image.fill(QColor(0, 0, 0))
@@ -1415,8 +1754,17 @@ class SierpinskiMainWindow(QMainWindow):
         self.draw_sierpinski(painter, p1, p2, p3, level, level, style)
         
         painter.end()
-        pixmap = QPixmap.fromImage(image)
+        triangles = 3 ** level
+        performance_monitor.record_stage(STAGE_PAINT, time.perf_counter() - start,
+                                         elements=triangles)
+        with performance_monitor.measure(STAGE_QIMAGE, pixels=800 * 600):
+            pixmap = QPixmap.fromImage(image)
         self.canvas.setPixmap(pixmap)
+        elapsed = time.perf_counter() - start
+        self.render_governor.record_geometry(triangles, elapsed)
+        performance_monitor.record_frame(self.frame_stage, elapsed, elements=triangles)
+        self.last_plan = plan
+        self.statusBar().showMessage(plan.describe())
         
         # Actualizar título
         rot_info = f" - Rot: {self.rotation}°" if self.rotation != 0 else ""
@@ -1489,3 +1837,8 @@ class SierpinskiMainWindow(QMainWindow):
         except Exception as e:
             from PyQt6.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Error", f"Error al exportar: {e}")
+
+    def closeEvent(self, event):
+        """Libera la etapa de cuadro de la ventana en el monitor al cerrarla."""
+        performance_monitor.discard_stage(self.frame_stage)
+        super().closeEvent(event)
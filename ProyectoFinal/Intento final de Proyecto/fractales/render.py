@@ -0,0 +1,338 @@
+"""
+Renderizador sin Interfaz Gráfica
+Genera fractales a PNG o NPY desde la línea de comandos sin importar PyQt6
+
+Uso:
+    python -m fractales.render mandelbrot -W 1920 -H 1080 --zoom 600 -o mandelbrot.png
+    python -m fractales.render --params vista.json -o vista.npy
+    python -m fractales.render --manifest trabajos.json --jobs 4
+    python -m fractales.render julia -W 32000 -H 32000 --checkpoint julia_32k -o julia.png
+    python -m fractales.render mandelbrot --pyramid 8 -o teselas/
+
+Un archivo de parámetros es un objeto JSON con las mismas claves que las
+opciones (``fractal``, ``width``, ``height``, ``zoom``, ``center_x``...). Un
+manifiesto es una lista de esos objetos, o un objeto con ``defaults`` y
+``jobs``; cada trabajo indica su ``output``.
+
+Con ``checkpoint`` el campo de iteraciones se calcula en un directorio con
+puntos de control: si el proceso se interrumpe, la misma orden lo reanuda.
+Si el directorio ya contiene un render se usa su vista guardada, y la
+paleta y el tamaño de salida (``output_width``/``output_height``) se pueden
+cambiar para recolorearlo sin recalcular.
+
+Con ``pyramid`` la salida es un directorio con una pirámide de teselas
+``z/x/y.png`` (y un descriptor DZI) de la región visible hasta esa
+profundidad; repetir la orden solo genera las teselas que falten.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from .generators.fractal_generators import (
+    FormulaGenerator,
+    JuliaGenerator,
+    KochGenerator,
+    MandelbrotGenerator
+)
+from .generators.checkpoint import MANIFEST_FILE, CheckpointedRender
+from .generators.streaming_export import export_png
+from .generators.tile_pyramid import TilePyramid
+from .utils.config import STAGE_RENDER, performance_monitor
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+FRACTALS = ("mandelbrot", "julia", "formula", "koch")
+
+# Valores por defecto de un trabajo
+DEFAULT_JOB = {
+    "fractal": "mandelbrot",
+    "width": 1920,
+    "height": 1080,
+    "zoom": None,
+    "center_x": None,
+    "center_y": None,
+    "max_iter": 200,
+    "palette": 0,
+    "color_mode": 1,
+    "aura": 1.0,
+    "rotation": 0.0,
+    "c_real": -0.7,
+    "c_imag": 0.27015,
+    "formula": "z**2 + c",
+    "julia_mode": False,
+    "koch_type": 6,
+    "level": 4,
+    "output": None,
+    "checkpoint": None,
+    "output_width": None,
+    "output_height": None,
+    "pyramid": None,
+}
+
+
+def normalize_job(job, defaults=None, index=None):
+    """Completa un trabajo con los valores por defecto y lo valida.
+
+    Sin ``output`` se usa ``<fractal>.png`` (``<fractal>_<index>.png`` en un
+    manifiesto), o el directorio ``<fractal>_teselas`` para una pirámide.
+    """
+    merged = dict(DEFAULT_JOB)
+    merged.update(defaults or {})
+    merged.update({key: value for key, value in job.items() if value is not None})
+    unknown = set(merged) - set(DEFAULT_JOB)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    merged["fractal"] = str(merged["fractal"]).lower()
+    if merged["fractal"] not in FRACTALS:
+        raise ValueError(f"Fractal desconocido: {merged['fractal']} (use {', '.join(FRACTALS)})")
+    if merged["width"] <= 0 or merged["height"] <= 0:
+        raise ValueError("El ancho y el alto deben ser positivos")
+    if not merged["output"]:
+        suffix = "" if index is None else f"_{index}"
+        extension = "_teselas" if merged["pyramid"] is not None else ".png"
+        merged["output"] = f"{merged['fractal']}{suffix}{extension}"
+    return merged
+
+
+def create_generator(job):
+    """Crea y configura el generador de un trabajo."""
+    fractal = job["fractal"]
+    if fractal == "koch":
+        generator = KochGenerator()
+        generator.set_koch_type(job["koch_type"])
+        generator.set_iterations(job["level"])
+        generator.set_color_scheme(job["palette"])
+        if job["zoom"] is not None:
+            generator.set_zoom(job["zoom"])
+        generator.set_offset(job["center_x"] or 0.0, job["center_y"] or 0.0)
+        return generator
+
+    if fractal == "mandelbrot":
+        generator = MandelbrotGenerator()
+    elif fractal == "julia":
+        generator = JuliaGenerator()
+        generator.set_julia_constant(job["c_real"], job["c_imag"])
+    else:
+        generator = FormulaGenerator(job["formula"], job["julia_mode"])
+        generator.set_julia_constant(job["c_real"], job["c_imag"])
+
+    generator.set_max_iterations(job["max_iter"])
+    generator.set_color_scheme(job["palette"])
+    generator.set_color_mode(job["color_mode"])
+    generator.set_aura_intensity(job["aura"])
+    generator.set_rotation(job["rotation"])
+    # Sin zoom explícito se usa el de la ventana (300 px por unidad a 900 px de ancho)
+    zoom = job["zoom"] if job["zoom"] is not None else generator.zoom * job["width"] / 900
+    generator.set_zoom(zoom)
+    generator.set_offset(
+        generator.offset_x if job["center_x"] is None else job["center_x"],
+        generator.offset_y if job["center_y"] is None else job["center_y"]
+    )
+    return generator
+
+
+def save_image(image, path):
+    """Guarda una imagen RGB como PNG."""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Se necesita Pillow para guardar PNG (pip install pillow)")
+    Image.fromarray(np.ascontiguousarray(image), "RGB").save(path)
+
+
+def render_job(job):
+    """Renderiza un trabajo normalizado y guarda el resultado.
+
+    Con salida ``.npy`` los fractales de tiempo de escape guardan el campo de
+    iteraciones (sin colorear); el resto, la imagen RGB. Los PNG de tiempo de
+    escape se escriben por franjas, así que admiten cualquier resolución.
+    """
+    start = time.perf_counter()
+    generator = create_generator(job)
+    width, height = job["width"], job["height"]
+    path = Path(job["output"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if job["checkpoint"]:
+        render_checkpointed(job, generator, path)
+        return str(path), time.perf_counter() - start
+
+    if job["pyramid"] is not None:
+        render_pyramid(job, generator, path)
+        return str(path), time.perf_counter() - start
+
+    if isinstance(generator, KochGenerator):
+        result = generator.generate_fractal(width, height)
+    elif path.suffix.lower() == ".npy":
+        compute_start = time.perf_counter()
+        result = generator.compute_field(width, height)
+        performance_monitor.record_stage(STAGE_RENDER, time.perf_counter() - compute_start,
+                                         pixels=result.size,
+                                         iterations=int(result.sum(dtype=np.int64)))
+    else:
+        export_png(generator, path, width, height)
+        return str(path), time.perf_counter() - start
+
+    if path.suffix.lower() == ".npy":
+        np.save(path, result)
+    else:
+        save_image(result, path)
+    return str(path), time.perf_counter() - start
+
+
+def render_checkpointed(job, generator, path):
+    """Calcula (o reanuda) un render con puntos de control y guarda su salida."""
+    if isinstance(generator, KochGenerator):
+        raise ValueError("Los puntos de control solo admiten fractales de tiempo de escape")
+    directory = Path(job["checkpoint"])
+    if (directory / MANIFEST_FILE).exists():
+        render = CheckpointedRender.open(directory)
+    else:
+        render = CheckpointedRender.create(directory, generator, job["width"], job["height"])
+    render.run()
+
+    if path.suffix.lower() == ".npy":
+        np.save(path, render.field)
+    else:
+        render.export_png(path, generator, job["output_width"], job["output_height"])
+
+
+def render_pyramid(job, generator, directory):
+    """Genera la pirámide de teselas de la región visible del trabajo."""
+    if isinstance(generator, KochGenerator):
+        raise ValueError("La pirámide de teselas solo admite fractales de tiempo de escape")
+    # La región es el cuadrado que contiene la vista de width x height píxeles
+    extent = max(job["width"], job["height"]) / generator.zoom
+    pyramid = TilePyramid(generator, directory, job["pyramid"], extent=extent,
+                          name=job["fractal"])
+    pyramid.generate()
+
+
+def load_manifest(path):
+    """Lee un manifiesto de trabajos (lista o ``{"defaults", "jobs"}``)."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, list):
+        data = {"jobs": data}
+    defaults = data.get("defaults", {})
+    return [normalize_job(job, defaults, index) for index, job in enumerate(data["jobs"])]
+
+
+def run_jobs(jobs, processes=None):
+    """Renderiza varios trabajos en paralelo con un pool de procesos.
+
+    Devuelve ``(salida, segundos, error)`` por trabajo, en orden de término.
+    """
+    processes = max(1, min(processes or os.cpu_count() or 1, len(jobs)))
+    if processes == 1:
+        results = []
+        for job in jobs:
+            try:
+                results.append(render_job(job) + (None,))
+            except Exception as e:
+                results.append((job["output"], 0.0, e))
+        return results
+
+    # Cada proceso usa su parte de los núcleos para los kernels numba
+    threads = max(1, (os.cpu_count() or 1) // processes)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as executor:
+        futures = {executor.submit(render_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result() + (None,))
+            except Exception as e:
+                results.append((futures[future]["output"], 0.0, e))
+    return results
+
+
+def _init_worker(threads):
+    """Configura cada proceso del pool."""
+    try:
+        import numba
+        numba.set_num_threads(max(1, min(threads, numba.config.NUMBA_NUM_THREADS)))
+    except ImportError:
+        pass
+
+
+def build_parser():
+    """Crea el analizador de argumentos."""
+    parser = argparse.ArgumentParser(
+        prog="python -m fractales.render",
+        description="Renderiza fractales a PNG o NPY sin interfaz gráfica."
+    )
+    parser.add_argument("fractal", nargs="?", choices=FRACTALS, help="Tipo de fractal")
+    parser.add_argument("--params", help="Archivo JSON con los parámetros de un trabajo")
+    parser.add_argument("--manifest", help="Archivo JSON con una lista de trabajos")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Procesos en paralelo para el manifiesto (por defecto, uno por núcleo)")
+    parser.add_argument("-o", "--output", help="Archivo de salida (.png o .npy)")
+    parser.add_argument("-W", "--width", type=int)
+    parser.add_argument("-H", "--height", type=int)
+    parser.add_argument("--zoom", type=float, help="Píxeles por unidad del plano")
+    parser.add_argument("--center-x", type=float)
+    parser.add_argument("--center-y", type=float)
+    parser.add_argument("--max-iter", type=int)
+    parser.add_argument("--palette", type=int, help="Índice de paleta (0-6)")
+    parser.add_argument("--color-mode", type=int, choices=(0, 1))
+    parser.add_argument("--aura", type=float)
+    parser.add_argument("--rotation", type=float, help="Rotación en radianes")
+    parser.add_argument("--c-real", type=float)
+    parser.add_argument("--c-imag", type=float)
+    parser.add_argument("--formula", help="Fórmula de iteración (fractal 'formula')")
+    parser.add_argument("--julia-mode", action="store_true", default=None,
+                        help="Usa la fórmula en modo Julia")
+    parser.add_argument("--koch-type", type=int)
+    parser.add_argument("--level", type=int, help="Nivel de recursión (fractal 'koch')")
+    parser.add_argument("--checkpoint",
+                        help="Directorio del campo de iteraciones (reanuda o recolorea un render)")
+    parser.add_argument("--output-width", type=int, help="Ancho de la imagen recoloreada")
+    parser.add_argument("--output-height", type=int, help="Alto de la imagen recoloreada")
+    parser.add_argument("--pyramid", type=int, metavar="PROFUNDIDAD",
+                        help="Genera una pirámide de teselas z/x/y (la salida es un directorio)")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    options = {key: value for key, value in vars(args).items()
+               if key not in ("params", "manifest", "jobs")}
+
+    try:
+        if args.manifest:
+            jobs = load_manifest(args.manifest)
+        else:
+            job = {}
+            if args.params:
+                job.update(json.loads(Path(args.params).read_text(encoding="utf-8")))
+            # Las opciones de la línea de comandos tienen prioridad sobre el archivo
+            job.update({key: value for key, value in options.items() if value is not None})
+            jobs = [normalize_job(job)]
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(str(e))
+
+    failures = 0
+    for output, elapsed, error in run_jobs(jobs, args.jobs):
+        if error is None:
+            print(f"{output} ({elapsed:.2f} s)")
+        else:
+            failures += 1
+            print(f"Error en {output}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,413 @@
+"""
+Servidor de Teselas
+Sirve teselas PNG bajo demanda por HTTP con asyncio (solo biblioteca estándar)
+
+Uso:
+    python -m fractales.server --port 8765 --workers 4
+    curl -o tesela.png "http://127.0.0.1:8765/mandelbrot/3/4/2.png?palette=2"
+
+Las teselas siguen el esquema XYZ de los mapas web: en el nivel ``z`` el
+cuadrado [-2, 2] x [-2, 2] del plano complejo se divide en ``2**z x 2**z``
+teselas, con ``x`` hacia la derecha e ``y`` hacia abajo. Parámetros
+opcionales de la consulta: ``max_iter``, ``palette``, ``color_mode``,
+``aura`` y, para Julia, ``c_real`` y ``c_imag``. ``/stats`` devuelve las
+estadísticas del servidor en JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from .generators.fractal_generators import PaletteGenerator
+from .generators.tile_cache import MAX_TILE_LEVEL, TileCache, compute_tile, tile_key
+from .generators.disk_tile_store import get_disk_tile_store
+from .render import _init_worker, create_generator, normalize_job
+from .utils.config import (SERVER_HOST, SERVER_MAX_ITER, SERVER_PORT, SERVER_TILE_SIZE,
+                           STAGE_RENDER, TILE_SIZE, performance_monitor)
+from .utils.png_writer import encode_png
+
+TILE_FRACTALS = ("mandelbrot", "julia")
+
+# Parámetros admitidos en la consulta y su tipo
+QUERY_PARAMETERS = {
+    "max_iter": int,
+    "palette": int,
+    "color_mode": int,
+    "aura": float,
+    "c_real": float,
+    "c_imag": float,
+}
+
+# Paletas disponibles (``palette`` va de 0 a PALETTE_COUNT - 1)
+PALETTE_COUNT = len(PaletteGenerator().get_palette_names())
+
+# Modos de color admitidos
+COLOR_MODES = (0, 1)
+
+# Generadores distintos que se conservan (uno por combinación de parámetros)
+_MAX_GENERATORS = 32
+
+# Generadores de cada proceso del pool, por (fractal, c_real, c_imag)
+_worker_generators = {}
+
+
+class TileRequestError(Exception):
+    """Petición de tesela inválida; ``status`` es el código HTTP de la respuesta."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_tile_request(target):
+    """Interpreta ``/{fractal}/{z}/{x}/{y}.png?...``.
+
+    Devuelve ``(trabajo, z, x, y)``, donde el trabajo es el de
+    ``fractales.render`` con los parámetros de la consulta.
+    """
+    parts = urlsplit(target)
+    segments = parts.path.strip("/").split("/")
+    if len(segments) != 4 or not segments[3].endswith(".png"):
+        raise TileRequestError(HTTPStatus.NOT_FOUND, "Use /{fractal}/{z}/{x}/{y}.png")
+    fractal = segments[0].lower()
+    if fractal not in TILE_FRACTALS:
+        raise TileRequestError(HTTPStatus.NOT_FOUND, f"Fractal desconocido: {fractal}")
+    try:
+        z, x, y = int(segments[1]), int(segments[2]), int(segments[3][:-4])
+    except ValueError:
+        raise TileRequestError(HTTPStatus.NOT_FOUND, "Coordenadas de tesela inválidas")
+    if not (0 <= z <= MAX_TILE_LEVEL - 2 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise TileRequestError(HTTPStatus.NOT_FOUND, "Tesela fuera del rango")
+
+    job = {"fractal": fractal}
+    for name, value in parse_qsl(parts.query):
+        if name not in QUERY_PARAMETERS:
+            raise TileRequestError(HTTPStatus.BAD_REQUEST, f"Parámetro desconocido: {name}")
+        try:
+            job[name] = QUERY_PARAMETERS[name](value)
+        except ValueError:
+            raise TileRequestError(HTTPStatus.BAD_REQUEST, f"Valor inválido para {name}: {value}")
+    _validate_ranges(job)
+    if fractal == "mandelbrot":
+        # La constante no influye en Mandelbrot: así se comparten las teselas
+        job.pop("c_real", None)
+        job.pop("c_imag", None)
+    return normalize_job(job), z, x, y
+
+
+def _validate_ranges(job):
+    """Rechaza con 400 los parámetros de la consulta fuera de rango."""
+    def reject(name, allowed):
+        raise TileRequestError(HTTPStatus.BAD_REQUEST,
+                               f"Valor fuera de rango para {name}: {job[name]} ({allowed})")
+
+    if "max_iter" in job and not 1 <= job["max_iter"] <= SERVER_MAX_ITER:
+        reject("max_iter", f"de 1 a {SERVER_MAX_ITER}")
+    if "palette" in job and not 0 <= job["palette"] < PALETTE_COUNT:
+        reject("palette", f"de 0 a {PALETTE_COUNT - 1}")
+    if "color_mode" in job and job["color_mode"] not in COLOR_MODES:
+        reject("color_mode", " o ".join(map(str, COLOR_MODES)))
+    for name in ("aura", "c_real", "c_imag"):
+        if name in job and not math.isfinite(job[name]):
+            reject(name, "número finito")
+
+
+def _compute_tile(fractal, c_real, c_imag, max_iter, level, tx, ty, tile_size):
+    """Calcula una tesela del quadtree en un proceso del pool."""
+    params = (fractal, c_real, c_imag)
+    generator = _worker_generators.get(params)
+    if generator is None:
+        generator = create_generator(normalize_job(
+            {"fractal": fractal, "c_real": c_real, "c_imag": c_imag}
+        ))
+        _worker_generators[params] = generator
+    start = time.perf_counter()
+    field = compute_tile(generator, level, tx, ty, tile_size, max_iter)
+    return field, time.perf_counter() - start
+
+
+class TileServer:
+    """Servidor HTTP asíncrono que renderiza teselas bajo demanda.
+
+    Cada tesela servida se compone de varias teselas del quadtree de
+    ``TileCache`` (campos de iteraciones), así que los cambios de paleta
+    reutilizan el trabajo ya hecho. Las que faltan se calculan en un pool de
+    ``workers`` procesos con como mucho ``2 * workers`` en cola. Las
+    peticiones idénticas simultáneas comparten un único render, tanto de la
+    respuesta completa como de cada tesela del quadtree.
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, workers=None, cache=None,
+                 tile_size=SERVER_TILE_SIZE):
+        # Cada tesela servida son al menos 2x2 teselas del quadtree, de modo
+        # que el nivel 0 (centrado en el origen) queda alineado con ellas
+        self.subdivisions = max(2, tile_size // TILE_SIZE)
+        if tile_size % self.subdivisions or self.subdivisions & (self.subdivisions - 1):
+            raise ValueError("El tamaño de tesela debe ser una potencia de 2 mayor o igual a 2")
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache if cache is not None else TileCache()
+        self.tile_size = tile_size
+        self.sub_size = tile_size // self.subdivisions
+        self.level_offset = self.subdivisions.bit_length() - 1
+        self._executor = None
+        self._server = None
+        self._slots = None
+        self._pending_tiles = {}
+        self._pending_responses = {}
+        self._generators = OrderedDict()
+
+        # Estadísticas
+        self.requests = 0
+        self.rendered_tiles = 0
+        self.merged_requests = 0
+        self.render_time = 0.0
+
+    async def start(self):
+        """Arranca el pool de procesos y empieza a escuchar."""
+        # Un hilo de numba por proceso: el paralelismo lo da el pool
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(1,)
+        )
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Atiende peticiones hasta que se cancela la tarea."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Deja de escuchar y detiene el pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.cache.flush()
+
+    async def get_tile(self, job, z, x, y):
+        """Devuelve el PNG de una tesela (compartido entre peticiones idénticas)."""
+        key = (tuple(sorted(job.items())), z, x, y)
+        task = self._pending_responses.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render_tile(job, z, x, y))
+            self._pending_responses[key] = task
+            task.add_done_callback(lambda _: self._pending_responses.pop(key, None))
+        else:
+            self.merged_requests += 1
+        # shield: si un cliente se desconecta, el render sigue para los demás
+        return await asyncio.shield(task)
+
+    async def _render_tile(self, job, z, x, y):
+        """Compone, colorea y codifica una tesela."""
+        generator = self._generator(job)
+        level = z + self.level_offset
+        # Índices del quadtree de la primera tesela (el nivel 0 servido es [-2, 2]²)
+        first_x = self.subdivisions * x - 2 ** (level - 1)
+        first_y = self.subdivisions * y - 2 ** (level - 1)
+        fields = await asyncio.gather(*(
+            self._get_field(job, generator, level, first_x + col, first_y + row)
+            for row in range(self.subdivisions) for col in range(self.subdivisions)
+        ))
+        field = np.block([fields[row * self.subdivisions:(row + 1) * self.subdivisions]
+                          for row in range(self.subdivisions)])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: encode_png(generator.colorize_field(field))
+        )
+
+    async def _get_field(self, job, generator, level, tx, ty):
+        """Campo de una tesela del quadtree: de la caché, de un render en curso o del pool."""
+        key = tile_key(generator, level, tx, ty)
+        field = self.cache.get(key)
+        if field is not None:
+            return field
+        task = self._pending_tiles.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_field(job, key))
+            self._pending_tiles[key] = task
+            task.add_done_callback(lambda _: self._pending_tiles.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _compute_field(self, job, key):
+        """Busca una tesela en disco o la calcula en el pool y la guarda en la caché."""
+        loop = asyncio.get_running_loop()
+        disk_store = self.cache.disk_store
+        if disk_store is not None:
+            field = await loop.run_in_executor(None, disk_store.get, key)
+            if field is not None:
+                self.cache.put(key, field)
+                return field
+
+        async with self._slots:
+            field, elapsed = await loop.run_in_executor(
+                self._executor, _compute_tile, job["fractal"], key.c_real, key.c_imag,
+                key.max_iter, key.level, key.tx, key.ty, self.sub_size
+            )
+        self.rendered_tiles += 1
+        self.render_time += elapsed
+        performance_monitor.record_stage(STAGE_RENDER, elapsed, pixels=field.size,
+                                         iterations=int(field.sum(dtype=np.int64)))
+        self.cache.put(key, field)
+        if disk_store is not None and elapsed >= self.cache.disk_min_time:
+            await loop.run_in_executor(None, disk_store.put, key, field)
+        return field
+
+    def _generator(self, job):
+        """Generador (para las claves y el coloreado) de los parámetros de un trabajo."""
+        key = tuple(sorted(job.items()))
+        generator = self._generators.get(key)
+        if generator is None:
+            generator = create_generator(job)
+            self._generators[key] = generator
+            if len(self._generators) > _MAX_GENERATORS:
+                self._generators.popitem(last=False)
+        else:
+            self._generators.move_to_end(key)
+        return generator
+
+    async def handle_request(self, method, target):
+        """Atiende una petición y devuelve ``(estado, tipo de contenido, cuerpo)``."""
+        if method not in ("GET", "HEAD"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, "text/plain; charset=utf-8", b"Solo GET y HEAD"
+        if urlsplit(target).path.rstrip("/") == "/stats":
+            body = json.dumps(self.get_statistics(), indent=2).encode("utf-8")
+            return HTTPStatus.OK, "application/json", body
+        self.requests += 1
+        try:
+            job, z, x, y = parse_tile_request(target)
+            return HTTPStatus.OK, "image/png", await self.get_tile(job, z, x, y)
+        except TileRequestError as e:
+            return e.status, "text/plain; charset=utf-8", str(e).encode("utf-8")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, "text/plain; charset=utf-8", str(e).encode("utf-8")
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, "text/plain; charset=utf-8", str(e).encode("utf-8")
+
+    async def _handle_connection(self, reader, writer):
+        """Atiende las peticiones de una conexión (con keep-alive en HTTP/1.1)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    self._write_response(writer, HTTPStatus.BAD_REQUEST, "text/plain; charset=utf-8",
+                                         "Petición inválida".encode("utf-8"), keep_alive=False)
+                    await writer.drain()
+                    break
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                status, content_type, body = await self.handle_request(method, target)
+                self._write_response(writer, status, content_type, body, keep_alive,
+                                     include_body=method != "HEAD")
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            # Cliente desconectado o cabeceras demasiado largas
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, content_type, body, keep_alive, include_body=True):
+        """Escribe una respuesta HTTP/1.1."""
+        status = HTTPStatus(status)
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            # Las teselas solo dependen de la URL
+            "Cache-Control: public, max-age=86400" if status == HTTPStatus.OK
+            and content_type == "image/png" else "Cache-Control: no-store",
+            "Access-Control-Allow-Origin: *",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+        if include_body:
+            writer.write(body)
+
+    def get_statistics(self):
+        """Devuelve las estadísticas del servidor."""
+        return {
+            'requests': self.requests,
+            'merged_requests': self.merged_requests,
+            'rendered_tiles': self.rendered_tiles,
+            'average_render_time': self.render_time / self.rendered_tiles
+            if self.rendered_tiles else 0.0,
+            'pending_tiles': len(self._pending_tiles),
+            'workers': self.workers,
+            'cache': self.cache.get_statistics(),
+        }
+
+
+def build_parser():
+    """Crea el analizador de argumentos."""
+    parser = argparse.ArgumentParser(
+        prog="python -m fractales.server",
+        description="Sirve teselas de fractales por HTTP: /{fractal}/{z}/{x}/{y}.png"
+    )
+    parser.add_argument("--host", default=SERVER_HOST, help="Dirección de escucha")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Puerto (0: cualquiera libre)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos de render (por defecto, uno por núcleo)")
+    parser.add_argument("--tile-size", type=int, default=SERVER_TILE_SIZE,
+                        help="Lado de las teselas en píxeles")
+    parser.add_argument("--disk-cache", action="store_true",
+                        help="Guarda también las teselas costosas en la caché de disco")
+    return parser
+
+
+async def run_server(args):
+    """Arranca el servidor con los argumentos de la línea de comandos."""
+    cache = TileCache(disk_store=get_disk_tile_store() if args.disk_cache else None)
+    server = TileServer(args.host, args.port, args.workers, cache, args.tile_size)
+    await server.start()
+    print(f"Sirviendo teselas en http://{server.host}:{server.port}/{{fractal}}/{{z}}/{{x}}/{{y}}.png")
+    await server.serve_forever()
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
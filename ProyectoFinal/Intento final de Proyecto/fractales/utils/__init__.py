@@ -7,6 +7,7 @@ from .config import (
     performance_monitor,
     FractalConfig,
     PerformanceMonitor,
+    RingBuffer,
     clamp,
     safe_divide,
     validate_numeric_input,
@@ -16,12 +17,24 @@ from .config import (
     ensure_directories,
     get_project_root
 )
+from .resolution_scaler import ResolutionScaler
+from .render_governor import RenderGovernor, RenderPlan
+from .png_writer import StreamingPNGWriter, encode_png
+from .job_queue import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    PRIORITY_EXPORT,
+    RenderJob,
+    RenderJobQueue,
+    get_job_queue
+)
 
 __all__ = [
     'config',
     'performance_monitor', 
     'FractalConfig',
     'PerformanceMonitor',
+    'RingBuffer',
     'clamp',
     'safe_divide',
     'validate_numeric_input',
@@ -29,5 +42,16 @@ __all__ = [
     'format_number',
     'setup_project_path',
     'ensure_directories',
-    'get_project_root'
+    'get_project_root',
+    'ResolutionScaler',
+    'RenderGovernor',
+    'RenderPlan',
+    'StreamingPNGWriter',
+    'encode_png',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_PREFETCH',
+    'PRIORITY_EXPORT',
+    'RenderJob',
+    'RenderJobQueue',
+    'get_job_queue'
 ]
@@ -3,10 +3,18 @@ Utilidades y Configuraciones para Fractales
 Módulo consolidado de configuraciones y utilidades comunes
 """
 
+import csv
+import json
 import os
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 # Configuraciones por defecto
 DEFAULT_ZOOM = 1.0
 DEFAULT_OFFSET_X = 0.0
@@ -26,6 +34,61 @@ MAX_POINTS = 500000
 GENERATION_TIMEOUT = 20.0
 MAX_CALCULATION_TIME = 15.0
 
+# Configuraciones de interacción
+TARGET_FRAME_TIME = 1.0 / 30.0   # Tiempo objetivo por cuadro mientras se interactúa
+INTERACTION_IDLE_MS = 200        # Inactividad antes del render a resolución completa
+INTERACTIVE_TIME_BUDGET = 0.1    # Presupuesto máximo de un render interactivo (s)
+REFINE_MAX_ITER = 5000           # Límite de iteraciones del refinamiento en reposo
+REFINE_MIN_ESCAPED = 1e-4        # Fracción de píxeles que deben escapar para seguir refinando
+
+# Configuraciones de teselas
+TILE_SIZE = 128                        # Lado de una tesela en píxeles
+TILE_CACHE_BYTES = 256 * 1024 * 1024   # Memoria máxima de la caché de teselas
+TILE_DISK_BYTES = 1024 * 1024 * 1024   # Espacio máximo de las teselas en disco
+TILE_DISK_MAX_AGE = 30 * 24 * 3600     # Antigüedad máxima sin uso de una tesela en disco (s)
+TILE_DISK_MIN_TIME = 0.002             # Solo se guardan en disco las teselas más costosas (s)
+TILE_PREFETCH_CPU_SHARE = 0.5          # Fracción máxima de CPU para precargar teselas
+
+# Configuraciones de exportación
+EXPORT_BAND_PIXELS = 4 * 1024 * 1024   # Píxeles por franja al exportar (limita la memoria)
+CHECKPOINT_TILE_SIZE = 256             # Lado de las teselas de un render con puntos de control
+CHECKPOINT_INTERVAL = 5.0              # Segundos entre puntos de control
+
+# Configuraciones de la cola de trabajos
+JOB_RESUME_DELAY = 0.3                 # Espera tras la última actividad prioritaria antes de reanudar (s)
+JOB_SLICE_PIXELS = 256 * 1024          # Píxeles por porción de un trabajo expulsable
+
+# Configuraciones del servidor de teselas
+SERVER_HOST = "127.0.0.1"              # Dirección de escucha (solo local)
+SERVER_PORT = 8765                     # Puerto de escucha
+SERVER_TILE_SIZE = 256                 # Lado de las teselas servidas en píxeles
+SERVER_MAX_ITER = 5000                 # Iteraciones máximas admitidas en una petición
+
+# Configuraciones del precalentamiento de kernels
+WARMUP_SIZE = 32                       # Lado de las imágenes con que se compilan los kernels
+
+# Configuraciones del monitor de rendimiento
+PERFORMANCE_HISTORY = 1024             # Muestras que se conservan por etapa
+PERFORMANCE_PERCENTILES = (50, 95, 99) # Percentiles de tiempo que se informan
+
+# Etapas del monitor de rendimiento
+STAGE_COMPUTE = "compute"              # Cálculo del campo o de la geometría de un cuadro mostrado
+STAGE_COLORIZE = "colorize"            # Coloreado del campo de un cuadro mostrado
+STAGE_QIMAGE = "qimage"                # Conversión de la imagen a QImage/QPixmap
+STAGE_SCALE = "scale"                  # Escalado del pixmap al tamaño del lienzo
+STAGE_PAINT = "paint"                  # Dibujo con QPainter y entrega al lienzo
+STAGE_FRAME = "frame"                  # Cuadro completo, del render a la pantalla
+STAGE_HUD = "hud"                      # Dibujo del panel de rendimiento
+STAGE_PREFETCH = "prefetch"            # Tesela precalculada en segundo plano
+STAGE_EXPORT = "export"                # Exportación o render con puntos de control completo
+STAGE_RENDER = "render"                # Cálculo sin ventana: CLI, teselas, pirámide o servidor
+
+# Configuraciones del panel de rendimiento (HUD)
+HUD_SHORTCUT = "F3"                    # Tecla que muestra u oculta el panel
+HUD_REFRESH_MS = 250                   # Intervalo de actualización de los datos
+HUD_FPS_WINDOW = 1.0                   # Ventana con que se cuentan los cuadros por segundo (s)
+HUD_MARGIN = 8                         # Separación del panel respecto al borde del lienzo
+
 # Colores por defecto
 DEFAULT_BACKGROUND = (0, 0, 0)
 DEFAULT_FOREGROUND = (255, 255, 255)
@@ -36,7 +99,7 @@ CACHE_DIR = PROJECT_ROOT / "cache"
 EXPORTS_DIR = PROJECT_ROOT / "exports"
 
 def ensure_directories():
-    """Asegura que existan los directorios necesarios."""
+    """Asegura que existan los directorios necesarios (cada módulo crea los suyos al usarlos)."""
     CACHE_DIR.mkdir(exist_ok=True)
     EXPORTS_DIR.mkdir(exist_ok=True)
 
@@ -60,9 +123,6 @@ class FractalConfig:
         self.aura_intensity = DEFAULT_AURA_INTENSITY
         self.color_scheme = 2
         self.background_color = DEFAULT_BACKGROUND
-        
-        # Asegurar directorios
-        ensure_directories()
     
     def reset_to_defaults(self):
         """Resetea la configuración a valores por defecto."""
@@ -76,42 +136,224 @@ class FractalConfig:
         """Obtiene el tamaño por defecto del canvas."""
         return (DEFAULT_CANVAS_WIDTH, DEFAULT_CANVAS_HEIGHT)
 
+class RingBuffer:
+    """Buffer circular de muestras sobre un array de numpy.
+
+    Cada muestra es una fila de ``columns`` valores; al llenarse, las nuevas
+    sustituyen a las más antiguas sin mover memoria.
+    """
+    
+    def __init__(self, capacity, columns=1):
+        self._data = np.zeros((capacity, columns), dtype=np.float64)
+        self._next = 0
+        self._count = 0
+    
+    def __len__(self):
+        return self._count
+    
+    @property
+    def capacity(self):
+        """Número máximo de muestras."""
+        return self._data.shape[0]
+    
+    def append(self, *values):
+        """Añade una muestra (un valor por columna)."""
+        self._data[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+    
+    def values(self):
+        """Copia de las muestras en orden cronológico (``len x columns``)."""
+        if self._count < self.capacity:
+            return self._data[:self._count].copy()
+        return np.roll(self._data, -self._next, axis=0)
+    
+    def clear(self):
+        """Descarta todas las muestras."""
+        self._next = 0
+        self._count = 0
+
+# Columnas de las muestras de cada etapa
+_SAMPLE_COLUMNS = ("timestamp", "seconds", "pixels", "iterations", "elements")
+
 class PerformanceMonitor:
-    """Monitor de rendimiento para fractales."""
+    """Monitor de rendimiento para fractales.
+
+    Cada etapa del cuadro (``STAGE_COMPUTE``, ``STAGE_COLORIZE``...) guarda
+    sus últimas ``history`` muestras en un ``RingBuffer``: duración y, si se
+    conocen, píxeles, iteraciones y elementos (segmentos, triángulos)
+    procesados. Los generadores y las ventanas lo alimentan solos; se puede
+    usar desde varios hilos a la vez.
+    """
     
-    def __init__(self):
-        self.generation_times = []
-        self.point_counts = []
+    def __init__(self, history=PERFORMANCE_HISTORY):
+        self.history = history
+        self.stages = {}
+        self.counters = {}
         self.error_counts = 0
+        self.compile_times = {}
+        self.warmup_done = 0
+        self.warmup_total = 0
+        self._lock = threading.Lock()
+    
+    def record_stage(self, stage, seconds, pixels=0, iterations=0, elements=0):
+        """Registra una ejecución de una etapa."""
+        with self._lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                samples = self.stages[stage] = RingBuffer(self.history, len(_SAMPLE_COLUMNS))
+            samples.append(time.perf_counter(), seconds, pixels, iterations, elements)
+    
+    @contextmanager
+    def measure(self, stage, pixels=0, iterations=0, elements=0):
+        """Registra la duración del bloque ``with`` como una ejecución de ``stage``."""
+        start = time.perf_counter()
+        yield
+        self.record_stage(stage, time.perf_counter() - start, pixels, iterations, elements)
+    
+    def record_frame(self, stage, seconds, pixels=0, elements=0):
+        """Registra un cuadro en la etapa de su ventana y en ``STAGE_FRAME``.
+
+        Cada ventana usa su propia etapa (``frame_stage``) para que su panel
+        de rendimiento no mezcle cuadros de otras; ``STAGE_FRAME`` reúne los
+        de toda la aplicación.
+        """
+        self.record_stage(stage, seconds, pixels=pixels, elements=elements)
+        if stage != STAGE_FRAME:
+            self.record_stage(STAGE_FRAME, seconds, pixels=pixels, elements=elements)
     
     def record_generation(self, time_taken, point_count):
-        """Registra una generación."""
-        self.generation_times.append(time_taken)
-        self.point_counts.append(point_count)
-        
-        # Mantener solo las últimas 100 generaciones
-        if len(self.generation_times) > 100:
-            self.generation_times.pop(0)
-            self.point_counts.pop(0)
+        """Registra una generación (un cuadro completo de ``point_count`` puntos)."""
+        self.record_stage(STAGE_FRAME, time_taken, elements=point_count)
+    
+    def increment(self, counter, amount=1):
+        """Suma ``amount`` a un contador (aciertos de caché, cuadros descartados...)."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+    
+    def record_compile(self, name, time_taken):
+        """Registra lo que tardó en compilarse (o cargarse de la caché) un kernel."""
+        self.compile_times[name] = time_taken
+    
+    def record_warmup_progress(self, done, total):
+        """Registra el avance del precalentamiento de kernels."""
+        self.warmup_done = done
+        self.warmup_total = total
+    
+    def is_warmup_complete(self):
+        """Indica si el precalentamiento terminó (o no se inició)."""
+        return self.warmup_done >= self.warmup_total
     
     def record_error(self):
         """Registra un error."""
         self.error_counts += 1
     
+    def stage_samples(self, stage):
+        """Muestras de una etapa en orden cronológico (array con ``_SAMPLE_COLUMNS``)."""
+        with self._lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                return np.zeros((0, len(_SAMPLE_COLUMNS)))
+            return samples.values()
+    
+    def stage_statistics(self, stage):
+        """Resume una etapa: tiempos, percentiles y rendimiento (o None sin muestras).
+
+        Los rendimientos (por segundo) se calculan solo con las muestras que
+        informaron de esa cantidad.
+        """
+        samples = self.stage_samples(stage)
+        if not len(samples):
+            return None
+        seconds = samples[:, 1]
+        stats = {
+            'count': len(samples),
+            'last': float(seconds[-1]),
+            'mean': float(seconds.mean()),
+            'max': float(seconds.max()),
+        }
+        for percentile, value in zip(PERFORMANCE_PERCENTILES,
+                                     np.percentile(seconds, PERFORMANCE_PERCENTILES)):
+            stats[f'p{percentile}'] = float(value)
+        for column, name in ((2, 'pixels'), (3, 'iterations'), (4, 'elements')):
+            reported = samples[:, column] > 0
+            elapsed = seconds[reported].sum()
+            stats[f'{name}_per_second'] = (float(samples[reported, column].sum() / elapsed)
+                                           if elapsed > 0 else 0.0)
+        return stats
+    
+    def recent_rate(self, stage, window=1.0):
+        """Ejecuciones por segundo de una etapa durante los últimos ``window`` segundos."""
+        samples = self.stage_samples(stage)
+        since = time.perf_counter() - window
+        return float(np.count_nonzero(samples[:, 0] >= since)) / window
+    
     def get_average_time(self):
-        """Obtiene el tiempo promedio de generación."""
-        if not self.generation_times:
-            return 0.0
-        return sum(self.generation_times) / len(self.generation_times)
+        """Obtiene el tiempo promedio de generación de un cuadro."""
+        stats = self.stage_statistics(STAGE_FRAME)
+        return stats['mean'] if stats else 0.0
     
     def get_performance_stats(self):
         """Obtiene estadísticas de rendimiento."""
+        frames = self.stage_samples(STAGE_FRAME)
+        with self._lock:
+            stage_names = sorted(self.stages)
+            counters = dict(self.counters)
+        last_frame = frames[-1] if len(frames) else None
         return {
-            'avg_time': self.get_average_time(),
-            'total_generations': len(self.generation_times),
+            'avg_time': float(frames[:, 1].mean()) if len(frames) else 0.0,
+            'total_generations': len(frames),
             'error_count': self.error_counts,
-            'last_point_count': self.point_counts[-1] if self.point_counts else 0
+            'last_point_count': int(last_frame[4] or last_frame[2]) if last_frame is not None else 0,
+            'compile_time': sum(self.compile_times.values()),
+            'warmup_progress': (self.warmup_done, self.warmup_total),
+            'stages': {stage: self.stage_statistics(stage) for stage in stage_names},
+            'counters': counters
         }
+    
+    def export_json(self, path):
+        """Guarda las estadísticas en un archivo JSON."""
+        report = {'timestamp': datetime.now().isoformat(timespec="seconds"),
+                  'compile_times': dict(self.compile_times)}
+        report.update(self.get_performance_stats())
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return path
+    
+    def export_csv(self, path, samples=False):
+        """Guarda en CSV una fila de resumen por etapa (o, con ``samples``, cada muestra)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stage_names = sorted(self.stages)
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            if samples:
+                writer.writerow(("stage",) + _SAMPLE_COLUMNS)
+                for stage in stage_names:
+                    for row in self.stage_samples(stage):
+                        writer.writerow([stage] + row.tolist())
+            else:
+                summaries = [(stage, self.stage_statistics(stage)) for stage in stage_names]
+                summaries = [(stage, stats) for stage, stats in summaries if stats]
+                columns = list(summaries[0][1]) if summaries else []
+                writer.writerow(["stage"] + columns)
+                for stage, stats in summaries:
+                    writer.writerow([stage] + [stats[column] for column in columns])
+        return path
+    
+    def discard_stage(self, stage):
+        """Olvida las muestras de una etapa (p. ej. la de una ventana que se cierra)."""
+        with self._lock:
+            self.stages.pop(stage, None)
+    
+    def reset(self):
+        """Descarta las muestras, los contadores y los errores registrados."""
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.error_counts = 0
 
 # Instancia global de configuración
 config = FractalConfig()
@@ -162,3 +404,7 @@ def format_number(number):
         else:
             return str(int(number))
     return str(number)
+
+def frame_stage(window):
+    """Etapa de cuadro propia de una ventana (``frame:<id>``) para el monitor."""
+    return f"{STAGE_FRAME}:{id(window):x}"
@@ -0,0 +1,297 @@
+"""
+Cola de Trabajos de Render
+Reparte la CPU del proceso entre renders interactivos, precarga y exportaciones
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import JOB_RESUME_DELAY
+
+# Clases de prioridad (un valor menor es más prioritario)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 1
+PRIORITY_EXPORT = 2
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, PRIORITY_EXPORT)
+
+# Cada cuánto se revisa la cancelación mientras se espera turno (s)
+_POLL_INTERVAL = 0.05
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+class RenderJob:
+    """Trabajo en segundo plano de una ``RenderJobQueue``.
+
+    La función del trabajo recibe el propio trabajo. Entre porción y porción
+    debe llamar a ``checkpoint()``, que se detiene mientras haya trabajo más
+    prioritario o el trabajo esté pausado y devuelve True si se canceló (así
+    sirve como ``cancel_check``). ``report(hecho, total)`` publica el avance.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    WAITING = "waiting"
+    PAUSED = "paused"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    def __init__(self, queue, function, priority, name=""):
+        self.queue = queue
+        self.function = function
+        self.priority = priority
+        self.name = name
+        self.state = self.PENDING
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.preemptions = 0
+        self._cancelled = False
+        self._paused = False
+        self._done = threading.Event()
+        self._listeners = []
+
+    @property
+    def is_done(self):
+        """Indica si el trabajo terminó (bien, cancelado o con error)."""
+        return self._done.is_set()
+
+    @property
+    def is_cancelled(self):
+        """Indica si se pidió cancelar el trabajo."""
+        return self._cancelled
+
+    @property
+    def is_paused(self):
+        """Indica si el usuario pausó el trabajo."""
+        return self._paused
+
+    def add_listener(self, callback):
+        """Registra ``callback(trabajo)``; se llama desde el hilo del trabajo en cada cambio."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Elimina un oyente registrado con ``add_listener``."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def report(self, done, total):
+        """Publica el avance del trabajo."""
+        self.progress = done / total if total else 1.0
+        self._notify()
+
+    def checkpoint(self):
+        """Cede el turno si hace falta; devuelve True si el trabajo se canceló."""
+        return self.queue._checkpoint(self)
+
+    def pause(self):
+        """Detiene el trabajo en su próximo ``checkpoint`` hasta ``resume``."""
+        with self.queue._condition:
+            self._paused = True
+
+    def resume(self):
+        """Reanuda un trabajo pausado."""
+        with self.queue._condition:
+            self._paused = False
+            self.queue._condition.notify_all()
+
+    def cancel(self):
+        """Cancela el trabajo (si ya empezó, en su próximo ``checkpoint``)."""
+        with self.queue._condition:
+            self._cancelled = True
+            discarded = self.queue._discard(self)
+            self.queue._condition.notify_all()
+        if discarded:
+            self._finish(self.CANCELLED)
+
+    def wait(self, timeout=None):
+        """Espera a que el trabajo termine; devuelve False si se agotó el tiempo."""
+        return self._done.wait(timeout)
+
+    def _set_state(self, state):
+        """Cambia el estado y avisa a los oyentes."""
+        self.state = state
+        self._notify()
+
+    def _finish(self, state):
+        """Marca el trabajo como terminado."""
+        self.state = state
+        self._done.set()
+        self._notify()
+
+    def _notify(self):
+        """Avisa a los oyentes de un cambio."""
+        for listener in list(self._listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                print(f"Error notificando el trabajo {self.name}: {e}")
+
+
+class RenderJobQueue:
+    """Cola de trabajos de render con clases de prioridad para todo el proceso.
+
+    Los renders interactivos y la precarga corren en sus propios hilos y
+    declaran su trabajo con ``activity(prioridad)``. Los trabajos largos
+    (exportaciones) se encolan con ``submit`` y se ejecutan de uno en uno
+    en el hilo de la cola, por orden de prioridad y de llegada.
+
+    Un trabajo cede en cada ``checkpoint`` mientras haya actividad o
+    trabajos encolados de mayor prioridad, y hasta ``resume_delay`` segundos
+    después de la última actividad; luego continúa donde quedó. Así una
+    exportación no añade latencia a la interacción.
+    """
+
+    def __init__(self, resume_delay=JOB_RESUME_DELAY):
+        self.resume_delay = resume_delay
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._active = dict.fromkeys(PRIORITIES, 0)
+        self._last_activity = dict.fromkeys(PRIORITIES, 0.0)
+        self._thread = None
+
+        # Estadísticas
+        self.completed_jobs = 0
+        self.preemptions = 0
+
+    def submit(self, function, priority=PRIORITY_EXPORT, name=""):
+        """Encola ``function(trabajo)`` y devuelve su ``RenderJob``."""
+        job = RenderJob(self, function, priority, name)
+        with self._condition:
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._condition.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="RenderJobQueue",
+                                                daemon=True)
+                self._thread.start()
+        return job
+
+    @contextmanager
+    def activity(self, priority):
+        """Declara trabajo en curso de una prioridad (por ejemplo, un render interactivo)."""
+        with self._condition:
+            self._active[priority] += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active[priority] -= 1
+                self._last_activity[priority] = time.monotonic()
+                self._condition.notify_all()
+
+    def wait_turn(self, priority, cancel_check=None):
+        """Espera mientras haya actividad más prioritaria.
+
+        Devuelve True si ``cancel_check`` pidió cancelar durante la espera.
+        """
+        with self._condition:
+            while True:
+                if cancel_check is not None and cancel_check():
+                    return True
+                delay = self._busy_delay(priority)
+                if delay <= 0:
+                    return False
+                self._condition.wait(min(delay, _POLL_INTERVAL))
+
+    def get_statistics(self):
+        """Devuelve las estadísticas de la cola."""
+        with self._condition:
+            return {
+                'pending_jobs': len(self._queue),
+                'active': dict(self._active),
+                'completed_jobs': self.completed_jobs,
+                'preemptions': self.preemptions,
+            }
+
+    def _busy_delay(self, priority):
+        """Segundos que debe esperar un trabajo de la prioridad dada (0 si tiene turno)."""
+        now = time.monotonic()
+        delay = 0.0
+        for other in PRIORITIES[:priority]:
+            if self._active[other]:
+                return _POLL_INTERVAL
+            delay = max(delay, self._last_activity[other] + self.resume_delay - now)
+        return delay
+
+    def _checkpoint(self, job):
+        """Detiene ``job`` mientras no tenga turno; devuelve True si se canceló."""
+        waiting = False
+        while True:
+            # Los trabajos encolados más prioritarios se ejecutan aquí mismo
+            self._run_queued_above(job.priority)
+            with self._condition:
+                if job._cancelled:
+                    return True
+                delay = _POLL_INTERVAL if job._paused else self._busy_delay(job.priority)
+                if delay <= 0 and not (self._queue and self._queue[0][0] < job.priority):
+                    break
+                state = RenderJob.PAUSED if job._paused else RenderJob.WAITING
+                if not waiting and not job._paused:
+                    job.preemptions += 1
+                    self.preemptions += 1
+                waiting = True
+                self._condition.wait(min(delay, _POLL_INTERVAL) if delay > 0 else 0)
+            if job.state != state:
+                job._set_state(state)
+        if waiting:
+            job._set_state(RenderJob.RUNNING)
+        return False
+
+    def _run_queued_above(self, priority):
+        """Ejecuta los trabajos encolados con más prioridad que ``priority``."""
+        while True:
+            with self._condition:
+                if not self._queue or self._queue[0][0] >= priority:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+            self._execute(job)
+
+    def _discard(self, job):
+        """Quita un trabajo pendiente de la cola; devuelve True si estaba en ella."""
+        for index, (_, _, queued) in enumerate(self._queue):
+            if queued is job:
+                self._queue.pop(index)
+                heapq.heapify(self._queue)
+                return True
+        return False
+
+    def _execute(self, job):
+        """Ejecuta un trabajo y registra cómo terminó."""
+        job._set_state(RenderJob.RUNNING)
+        try:
+            job.result = job.function(job)
+            state = RenderJob.CANCELLED if job._cancelled else RenderJob.FINISHED
+        except Exception as e:
+            # La cancelación suele terminar en una excepción del propio trabajo
+            if job._cancelled:
+                state = RenderJob.CANCELLED
+            else:
+                job.error = e
+                state = RenderJob.FAILED
+        with self._condition:
+            self.completed_jobs += 1
+        job._finish(state)
+
+    def _run(self):
+        """Bucle del hilo de la cola."""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, job = heapq.heappop(self._queue)
+            self._execute(job)
+
+
+def get_job_queue():
+    """Devuelve la cola de trabajos compartida por todo el proceso."""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = RenderJobQueue()
+        return _shared_queue
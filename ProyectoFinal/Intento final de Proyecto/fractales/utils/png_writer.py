@@ -0,0 +1,141 @@
+"""
+Escritor de PNG por Franjas
+Escribe imágenes RGB fila a fila sin tenerlas completas en memoria
+"""
+
+import os
+import struct
+import zlib
+
+import numpy as np
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Cabecera zlib (deflate, ventana de 32 KiB, compresión por defecto)
+_ZLIB_HEADER = b"\x78\x9c"
+_ADLER_BASE = 65521
+
+
+def adler32_combine(adler1, adler2, length2):
+    """Combina los Adler-32 de dos bloques consecutivos (como ``adler32_combine`` de zlib)."""
+    remainder = length2 % _ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (remainder * sum1) % _ADLER_BASE
+    sum1 += (adler2 & 0xFFFF) + _ADLER_BASE - 1
+    sum2 += ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + _ADLER_BASE - remainder
+    sum1 %= _ADLER_BASE
+    sum2 %= _ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+def encode_png_band(rows, last=False, level=6):
+    """Comprime una franja de filas RGB para ``StreamingPNGWriter.write_band``.
+
+    Cada franja es un tramo deflate independiente terminado en un punto de
+    sincronización, así que varias franjas pueden comprimirse en paralelo
+    (en otros hilos: zlib libera el GIL) y concatenarse después. Devuelve
+    ``(datos, adler32, bytes_sin_comprimir, filas)``.
+    """
+    rows = np.ascontiguousarray(rows, dtype=np.uint8)
+    height, width = rows.shape[:2]
+    # Cada fila empieza con el byte de filtro 0 (sin filtro)
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = rows.reshape(height, width * 3)
+    data = raw.tobytes()
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data)
+    compressed += compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return compressed, zlib.adler32(data), len(data), height
+
+
+def encode_png(image, level=6):
+    """Codifica en memoria una imagen RGB completa como PNG (devuelve bytes)."""
+    height, width = image.shape[:2]
+    data, adler, _, _ = encode_png_band(image, last=True, level=level)
+    return b"".join((
+        _SIGNATURE,
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        _chunk(b"IDAT", _ZLIB_HEADER + data + struct.pack(">I", adler)),
+        _chunk(b"IEND", b""),
+    ))
+
+
+def _chunk(kind, data):
+    """Bloque PNG (longitud, tipo, datos y CRC)."""
+    return b"".join((struct.pack(">I", len(data)), kind, data,
+                     struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))))
+
+
+class StreamingPNGWriter:
+    """Escribe un PNG RGB de 8 bits por franjas de filas.
+
+    Solo se mantiene en memoria la franja que se escribe. El archivo se crea
+    con un nombre temporal y se renombra al cerrar, así que una exportación
+    interrumpida no deja un PNG a medias.
+    """
+
+    def __init__(self, path, width, height, level=6):
+        self.path = os.fspath(path)
+        self.width = width
+        self.height = height
+        self.level = level
+        self.rows_written = 0
+        self._adler = 1
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(_SIGNATURE)
+        # IHDR: ancho, alto, 8 bits, color RGB, deflate, filtro estándar, sin entrelazado
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        self._write_chunk(b"IDAT", _ZLIB_HEADER)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_rows(self, rows):
+        """Comprime y escribe las siguientes filas (array ``alto x ancho x 3``)."""
+        last = self.rows_written + rows.shape[0] >= self.height
+        self.write_band(encode_png_band(rows, last, self.level))
+
+    def write_band(self, band):
+        """Escribe una franja ya comprimida con ``encode_png_band``."""
+        data, adler, length, rows = band
+        if self.rows_written + rows > self.height:
+            raise ValueError("La franja excede el alto de la imagen")
+        self._write_chunk(b"IDAT", data)
+        self._adler = adler32_combine(self._adler, adler, length)
+        self.rows_written += rows
+
+    def close(self):
+        """Termina el archivo; falla si no se escribieron todas las filas."""
+        if self._file is None:
+            return
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"Se escribieron {self.rows_written} de {self.height} filas")
+        self._write_chunk(b"IDAT", struct.pack(">I", self._adler))
+        self._write_chunk(b"IEND", b"")
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Descarta el archivo a medio escribir."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def _write_chunk(self, kind, data):
+        """Escribe un bloque PNG con su CRC."""
+        self._file.write(_chunk(kind, data))
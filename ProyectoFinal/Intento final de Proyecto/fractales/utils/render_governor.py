@@ -0,0 +1,189 @@
+"""
+Gobernador de Presupuesto de Render
+Ajusta iteraciones, resolución o profundidad para cumplir los límites de tiempo
+"""
+
+import math
+import time
+
+from .config import MAX_CALCULATION_TIME, GENERATION_TIMEOUT, MAX_POINTS
+
+
+class RenderPlan:
+    """Parámetros de un render decididos por el gobernador."""
+
+    def __init__(self, max_iter=None, scale=1.0, depth=None, estimated_time=None,
+                 provisional=False, reason=""):
+        self.max_iter = max_iter
+        self.scale = scale
+        self.depth = depth
+        self.estimated_time = estimated_time
+        self.provisional = provisional
+        self.reason = reason
+
+    def describe(self):
+        """Texto breve para mostrar al usuario."""
+        if not self.provisional:
+            return ""
+        return f"Vista provisional: {self.reason}"
+
+    def __repr__(self):
+        return (f"RenderPlan(max_iter={self.max_iter}, scale={self.scale}, depth={self.depth}, "
+                f"provisional={self.provisional})")
+
+
+class RenderGovernor:
+    """Reparte un presupuesto de tiempo entre la calidad de cada render.
+
+    El coste se estima a partir de los renders anteriores: segundos por
+    píxel-iteración en los fractales de tiempo de escape y segundos por
+    elemento (segmento, rama o triángulo) en los geométricos. Si la calidad
+    pedida no cabe en el presupuesto se reduce (primero la resolución y luego
+    las iteraciones, o la profundidad de recursión) y el plan se marca como
+    provisional. ``max_points`` limita los elementos geométricos y
+    ``timeout`` es el límite duro tras el que se cancela un render.
+    """
+
+    def __init__(self, time_budget=MAX_CALCULATION_TIME, timeout=GENERATION_TIMEOUT,
+                 max_points=MAX_POINTS, min_iter=32, min_scale=0.125, smoothing=0.3):
+        self.time_budget = time_budget
+        self.timeout = timeout
+        self.max_points = max_points
+        self.min_iter = min_iter
+        self.min_scale = min_scale
+        self.smoothing = smoothing
+        self._escape_cost = None     # segundos por píxel-iteración
+        self._element_cost = None    # segundos por elemento geométrico
+
+        # Estadísticas
+        self.planned_frames = 0
+        self.provisional_frames = 0
+
+    @classmethod
+    def for_generator(cls, generator, **kwargs):
+        """Crea un gobernador con los límites configurados en un generador."""
+        return cls(time_budget=generator._max_calculation_time,
+                   timeout=generator._generation_timeout,
+                   max_points=generator._max_points, **kwargs)
+
+    def _budget(self, time_budget):
+        """Presupuesto efectivo: nunca mayor que el configurado."""
+        if time_budget is None:
+            return self.time_budget
+        return min(time_budget, self.time_budget)
+
+    def _update(self, current, sample):
+        """Media móvil exponencial."""
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def _finish(self, plan):
+        """Actualiza las estadísticas y devuelve el plan."""
+        self.planned_frames += 1
+        if plan.provisional:
+            self.provisional_frames += 1
+        return plan
+
+    # Fractales de tiempo de escape
+
+    def record_escape_time(self, pixel_count, max_iter, elapsed):
+        """Registra el tiempo de un render de tiempo de escape."""
+        work = pixel_count * max_iter
+        if work > 0 and elapsed > 0:
+            self._escape_cost = self._update(self._escape_cost, elapsed / work)
+
+    def plan_escape_time(self, width, height, max_iter, scale=1.0, time_budget=None):
+        """Elige escala y max_iter para que el render quepa en el presupuesto."""
+        budget = self._budget(time_budget)
+        if self._escape_cost is None:
+            return self._finish(RenderPlan(max_iter=max_iter, scale=scale))
+
+        def estimate(s, iterations):
+            return self._escape_cost * width * height * s * s * iterations
+
+        estimated = estimate(scale, max_iter)
+        reasons = []
+
+        # Primero se reduce la resolución, que se nota menos al navegar
+        if estimated > budget and scale > self.min_scale:
+            new_scale = math.floor(scale * math.sqrt(budget / estimated) * 32) / 32
+            new_scale = max(self.min_scale, new_scale)
+            if new_scale < scale:
+                scale = new_scale
+                reasons.append(f"resolución al {scale * 100:.0f}%")
+                estimated = estimate(scale, max_iter)
+
+        # Después las iteraciones, sin bajar del mínimo
+        if estimated > budget and max_iter > self.min_iter:
+            new_iter = max(self.min_iter, int(max_iter * budget / estimated))
+            if new_iter < max_iter:
+                max_iter = new_iter
+                reasons.append(f"iteraciones limitadas a {max_iter}")
+                estimated = estimate(scale, max_iter)
+
+        return self._finish(RenderPlan(max_iter=max_iter, scale=scale,
+                                       estimated_time=estimated,
+                                       provisional=bool(reasons),
+                                       reason=", ".join(reasons)))
+
+    # Fractales geométricos
+
+    def record_geometry(self, element_count, elapsed):
+        """Registra el tiempo de un render geométrico de ``element_count`` elementos."""
+        if element_count > 0 and elapsed > 0:
+            self._element_cost = self._update(self._element_cost, elapsed / element_count)
+
+    def plan_depth(self, depth, branching, base_elements=1, min_depth=0, time_budget=None):
+        """Elige la profundidad de recursión que respeta max_points y el presupuesto.
+
+        El número de elementos a profundidad ``d`` se estima como
+        ``base_elements * branching ** d``.
+        """
+        budget = self._budget(time_budget)
+
+        def elements(d):
+            return base_elements * branching ** d
+
+        requested = depth
+        reasons = []
+        while depth > min_depth and elements(depth) > self.max_points:
+            depth -= 1
+        if depth < requested:
+            reasons.append(f"máximo {self.max_points} elementos")
+
+        if self._element_cost is not None:
+            limited = depth
+            while depth > min_depth and self._element_cost * elements(depth) > budget:
+                depth -= 1
+            if depth < limited:
+                reasons.append("presupuesto de tiempo")
+
+        estimated = None if self._element_cost is None else self._element_cost * elements(depth)
+        reason = ""
+        if reasons:
+            reason = f"nivel {depth} de {requested} ({', '.join(reasons)})"
+        return self._finish(RenderPlan(depth=depth, estimated_time=estimated,
+                                       provisional=depth < requested, reason=reason))
+
+    # Límite duro
+
+    def deadline_check(self, cancel_check=None):
+        """Devuelve una comprobación de cancelación que vence tras ``timeout`` segundos."""
+        deadline = time.perf_counter() + self.timeout
+
+        def check():
+            if cancel_check is not None and cancel_check():
+                return True
+            return time.perf_counter() > deadline
+
+        return check
+
+    def get_statistics(self):
+        """Devuelve las estadísticas del gobernador."""
+        return {
+            'planned_frames': self.planned_frames,
+            'provisional_frames': self.provisional_frames,
+            'escape_cost': self._escape_cost,
+            'element_cost': self._element_cost,
+        }
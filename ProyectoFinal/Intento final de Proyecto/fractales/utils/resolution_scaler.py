@@ -0,0 +1,60 @@
+"""
+Escalado Dinámico de Resolución
+Elige la resolución de render interactivo a partir de los tiempos medidos
+"""
+
+import math
+
+from .config import TARGET_FRAME_TIME
+
+
+class ResolutionScaler:
+    """Calcula la fracción de resolución que cabe en un tiempo de cuadro objetivo.
+
+    Mantiene una media móvil exponencial del tiempo por píxel de los cuadros
+    ya renderizados, así que la escala se adapta sola a max_iter, a la zona
+    del fractal y a la velocidad de la máquina.
+    """
+
+    def __init__(self, target_frame_time=TARGET_FRAME_TIME, min_scale=0.125,
+                 max_scale=1.0, smoothing=0.3, initial_scale=0.5):
+        self.target_frame_time = target_frame_time
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.smoothing = smoothing
+        self.initial_scale = initial_scale
+        self._time_per_pixel = None
+
+    @property
+    def time_per_pixel(self):
+        """Tiempo por píxel estimado (None si aún no hay medidas)."""
+        return self._time_per_pixel
+
+    def record_frame(self, pixel_count, elapsed):
+        """Registra el tiempo que tardó un cuadro de ``pixel_count`` píxeles."""
+        if pixel_count <= 0 or elapsed <= 0:
+            return
+        sample = elapsed / pixel_count
+        if self._time_per_pixel is None:
+            self._time_per_pixel = sample
+        else:
+            self._time_per_pixel += self.smoothing * (sample - self._time_per_pixel)
+
+    def get_scale(self, width, height):
+        """Devuelve la escala (0-1] para renderizar un lienzo de width x height."""
+        if self._time_per_pixel is None:
+            return self.initial_scale
+
+        budget_pixels = self.target_frame_time / self._time_per_pixel
+        scale = math.sqrt(budget_pixels / max(1, width * height))
+        # Redondear hacia abajo a pasos de 1/32 para que el tamaño no oscile
+        scale = math.floor(scale * 32) / 32
+        return max(self.min_scale, min(self.max_scale, scale))
+
+    def scaled_size(self, width, height, scale):
+        """Tamaño en píxeles de un lienzo escalado (al menos 1x1)."""
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def reset(self):
+        """Olvida las medidas acumuladas."""
+        self._time_per_pixel = None
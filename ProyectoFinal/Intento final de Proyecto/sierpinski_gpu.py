@@ -8,9 +8,9 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QSlider, QSpinBox, QComboBox,
                              QFrame, QApplication, QFileDialog, QMessageBox, 
                              QDoubleSpinBox, QCheckBox, QProgressBar)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint, QMutex, QWaitCondition
-from PyQt6.QtGui import QPixmap, QImage, QPainter, QFont, QPen, QColor, QPolygonF, QPointF
-from PyQt6.QtOpenGL import QOpenGLWidget
+from PyQt6.QtCore import (Qt, QThread, pyqtSignal, QTimer, QPoint, QPointF, QMutex, QMutexLocker,
+                          QWaitCondition)
+from PyQt6.QtGui import QPixmap, QImage, QPainter, QFont, QPen, QColor, QPolygonF
 from PyQt6.QtOpenGLWidgets import QOpenGLWidget
 
 import numpy as np
@@ -20,6 +20,10 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 
+from fractales.interfaces.performance_hud import PerformanceHUD
+from fractales.utils.config import (HUD_FPS_WINDOW, STAGE_COMPUTE, STAGE_FRAME, STAGE_PAINT,
+                                    STAGE_SCALE, frame_stage, performance_monitor)
+
 
 class SierpinskiRenderThread(QThread):
     """Hilo de renderizado optimizado para el Triángulo de Sierpinski."""
@@ -27,8 +31,9 @@ class SierpinskiRenderThread(QThread):
     frameReady = pyqtSignal(QImage)
     progressUpdate = pyqtSignal(int)
     
-    def __init__(self):
+    def __init__(self, frame_stage=STAGE_FRAME):
         super().__init__()
+        self.frame_stage = frame_stage
         self.should_stop = False
         self.level = 5
         self.size = 350
@@ -45,7 +50,7 @@ class SierpinskiRenderThread(QThread):
         
     def set_parameters(self, level, size, style, mode, offset_x, offset_y, rotation, scale_factor, zoom_level):
         """Actualiza los parámetros de renderizado."""
-        with QMutex():
+        with QMutexLocker(self.mutex):
             self.level = level
             self.size = size
             self.style = style
@@ -219,6 +224,7 @@ class SierpinskiRenderThread(QThread):
             try:
                 # Calcular nivel adaptativo
                 adaptive_level = self.calculate_adaptive_level(self.zoom_level)
+                start = time.perf_counter()
                 
                 # Crear imagen de alta resolución
                 resolution = 1200 if self.high_quality else 800
@@ -244,12 +250,14 @@ class SierpinskiRenderThread(QThread):
                     
                     # Generar datos de triángulos
                     self.progressUpdate.emit(25)
-                    triangles_data = self.generate_sierpinski_data(
-                        p1_t, p2_t, p3_t, adaptive_level, adaptive_level
-                    )
+                    with performance_monitor.measure(STAGE_COMPUTE, elements=3 ** adaptive_level):
+                        triangles_data = self.generate_sierpinski_data(
+                            p1_t, p2_t, p3_t, adaptive_level, adaptive_level
+                        )
                     
                     # Renderizar en lotes para optimización
                     self.progressUpdate.emit(50)
+                    paint_start = time.perf_counter()
                     batch_size = 100
                     total_batches = len(triangles_data) // batch_size + 1
                     
@@ -263,12 +271,17 @@ class SierpinskiRenderThread(QThread):
                         # Actualizar progreso
                         progress = 50 + int((i / len(triangles_data)) * 50)
                         self.progressUpdate.emit(progress)
+                    performance_monitor.record_stage(STAGE_PAINT, time.perf_counter() - paint_start,
+                                                     elements=len(triangles_data))
                 
                 painter.end()
                 
                 # Redimensionar para display
-                display_image = image.scaled(600, 600, Qt.AspectRatioMode.KeepAspectRatio, 
-                                           Qt.TransformationMode.SmoothTransformation)
+                with performance_monitor.measure(STAGE_SCALE, pixels=600 * 600):
+                    display_image = image.scaled(600, 600, Qt.AspectRatioMode.KeepAspectRatio, 
+                                               Qt.TransformationMode.SmoothTransformation)
+                performance_monitor.record_frame(self.frame_stage, time.perf_counter() - start,
+                                                 elements=3 ** adaptive_level)
                 
                 self.frameReady.emit(display_image)
                 self.progressUpdate.emit(100)
@@ -305,11 +318,15 @@ class SierpinskiMainWindow(QMainWindow):
         self.adaptive_levels = True
         
         # Hilo de renderizado
-        self.render_thread = SierpinskiRenderThread()
+        self.frame_stage = frame_stage(self)
+        self.render_thread = SierpinskiRenderThread(self.frame_stage)
         self.render_thread.frameReady.connect(self.update_canvas)
         self.render_thread.progressUpdate.connect(self.update_progress)
         
         self.setup_ui()
+        # Panel de rendimiento sobre el lienzo (se muestra con F3)
+        self.performance_hud = PerformanceHUD(self.canvas, self.hud_status, "triángulos",
+                                              frame_stage=self.frame_stage)
         self.setup_mouse_interaction()
         self.start_rendering()
     
@@ -728,16 +745,24 @@ class SierpinskiMainWindow(QMainWindow):
         # Actualizar estadísticas
         adaptive_level = self.render_thread.calculate_adaptive_level(self.zoom_level)
         triangles = 3 ** adaptive_level
+        fps = performance_monitor.recent_rate(self.frame_stage, HUD_FPS_WINDOW)
+        frame = performance_monitor.stage_statistics(self.frame_stage)
+        frame_time = frame['last'] if frame is not None else 0.0
         
         self.title_label.setText(f"🚀 SIERPINSKI GPU - Nivel {adaptive_level}")
         self.stats_label.setText(f"""
 📊 Estadísticas en tiempo real:
 • Triángulos: {triangles:,}
 • Zoom: {self.zoom_level:.2f}x
-• FPS: ~60 (GPU acelerado)
+• FPS: {fps:.1f} ({frame_time * 1000:.1f} ms por cuadro)
 • Memoria: Optimizada
 • Hilos: Multi-core activo""")
     
+    def hud_status(self):
+        """Backend, calidad y aciertos de caché para el panel de rendimiento."""
+        level = self.render_thread.calculate_adaptive_level(self.zoom_level)
+        return "QPainter (hilo de render)", f"nivel {level}", None
+    
     def update_progress(self, value):
         """Actualiza barra de progreso."""
         self.progress_bar.setValue(value)
@@ -767,6 +792,7 @@ class SierpinskiMainWindow(QMainWindow):
         if hasattr(self, 'render_thread'):
             self.render_thread.stop()
             self.render_thread.wait()
+        performance_monitor.discard_stage(self.frame_stage)
         event.accept()
 
 
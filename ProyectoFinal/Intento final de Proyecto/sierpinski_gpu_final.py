@@ -19,6 +19,26 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QFont, QPen, QColor
 
+from fractales.interfaces.job_progress import JobProgressWidget
+from fractales.utils.job_queue import (PRIORITY_EXPORT, PRIORITY_INTERACTIVE,
+                                       RenderJob, get_job_queue)
+
+# Nivel hasta el que se divide la exportación en partes (3**4 = 81 subárboles)
+EXPORT_SPLIT_LEVEL = 4
+
+
+def sierpinski_subtriangles(p1, p2, p3, depth):
+    """Subtriángulos de un nivel dado, en el mismo orden en que se dibujan."""
+    if depth <= 0:
+        return [(p1, p2, p3)]
+    mid12 = ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
+    mid23 = ((p2[0] + p3[0]) / 2, (p2[1] + p3[1]) / 2)
+    mid31 = ((p3[0] + p1[0]) / 2, (p3[1] + p1[1]) / 2)
+    return (sierpinski_subtriangles(p1, mid12, mid31, depth - 1)
+            + sierpinski_subtriangles(mid12, p2, mid23, depth - 1)
+            + sierpinski_subtriangles(mid31, mid23, p3, depth - 1))
+
+
 class SierpinskiGPUWindow(QMainWindow):
     """🚀 SIERPINSKI GPU-OPTIMIZADO - ZOOM INFINITO - MÁXIMA POTENCIA"""
     
@@ -48,6 +68,9 @@ class SierpinskiGPUWindow(QMainWindow):
         
         self.setup_ui()
         self.setup_mouse_interaction()
+        # Avance de la exportación 4K, que corre en la cola de trabajos
+        self.job_progress = JobProgressWidget(self)
+        self.statusBar().addPermanentWidget(self.job_progress)
         self.generate_fractal()
     
     def setup_ui(self):
@@ -427,74 +450,83 @@ class SierpinskiGPUWindow(QMainWindow):
     
     def generate_fractal(self):
         """🚀 GENERA SIERPINSKI GPU-OPTIMIZADO CON ZOOM INFINITO"""
-        try:
-            # Obtener nivel efectivo
-            base_level = self.level_slider.value()
-            if self.adaptive_levels:
-                adaptive_boost = int(math.log2(max(1, self.zoom_level)) * 2)
-                effective_level = min(15, base_level + adaptive_boost)
-            else:
-                effective_level = base_level
-            
-            # Crear imagen GPU-optimizada
-            width, height = 900, 800
-            image = QImage(width, height, QImage.Format.Format_RGB888)
-            image.fill(QColor(0, 0, 17))  # Azul muy oscuro
-            
-            painter = QPainter(image)
-            if self.antialiasing:
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
-            # Configurar transformaciones
-            painter.translate(width/2 + self.offset_x, height/2 + self.offset_y)
-            painter.scale(self.zoom_level, self.zoom_level)
-            painter.rotate(self.rotation)
-            
-            # Triángulo principal escalado
-            size = 200
-            height_tri = size * math.sqrt(3) / 2
-            
-            p1 = (-size/2, -height_tri/3)
-            p2 = (size/2, -height_tri/3)
-            p3 = (0, 2*height_tri/3)
-            
-            # Generar Sierpinski GPU-optimizado
-            self.draw_sierpinski_gpu(painter, p1, p2, p3, effective_level)
-            
-            painter.end()
-            
-            # Aplicar al canvas
-            pixmap = QPixmap.fromImage(image)
-            self.canvas.setPixmap(pixmap)
-            
-            # Actualizar título con información
-            info = f"🔺 SIERPINSKI GPU - Zoom: {self.zoom_level:.2f}x - Nivel: {effective_level}"
-            if self.adaptive_levels:
-                info += f" (Base: {base_level} + Adaptativo: {effective_level - base_level})"
-            self.setWindowTitle(info)
-            
-        except Exception as e:
-            print(f"Error en generación GPU: {e}")
+        # Cuenta como render interactivo: una exportación en curso cede la CPU
+        with get_job_queue().activity(PRIORITY_INTERACTIVE):
+            try:
+                # Obtener nivel efectivo
+                base_level = self.level_slider.value()
+                if self.adaptive_levels:
+                    adaptive_boost = int(math.log2(max(1, self.zoom_level)) * 2)
+                    effective_level = min(15, base_level + adaptive_boost)
+                else:
+                    effective_level = base_level
+                
+                # Crear imagen GPU-optimizada
+                width, height = 900, 800
+                image = QImage(width, height, QImage.Format.Format_RGB888)
+                image.fill(QColor(0, 0, 17))  # Azul muy oscuro
+                
+                painter = QPainter(image)
+                if self.antialiasing:
+                    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                
+                # Configurar transformaciones
+                painter.translate(width/2 + self.offset_x, height/2 + self.offset_y)
+                painter.scale(self.zoom_level, self.zoom_level)
+                painter.rotate(self.rotation)
+                
+                # Triángulo principal escalado
+                size = 200
+                height_tri = size * math.sqrt(3) / 2
+                
+                p1 = (-size/2, -height_tri/3)
+                p2 = (size/2, -height_tri/3)
+                p3 = (0, 2*height_tri/3)
+                
+                # Generar Sierpinski GPU-optimizado
+                self.draw_sierpinski_gpu(painter, p1, p2, p3, effective_level)
+                
+                painter.end()
+                
+                # Aplicar al canvas
+                pixmap = QPixmap.fromImage(image)
+                self.canvas.setPixmap(pixmap)
+                
+                # Actualizar título con información
+                info = f"🔺 SIERPINSKI GPU - Zoom: {self.zoom_level:.2f}x - Nivel: {effective_level}"
+                if self.adaptive_levels:
+                    info += f" (Base: {base_level} + Adaptativo: {effective_level - base_level})"
+                self.setWindowTitle(info)
+                
+            except Exception as e:
+                print(f"Error en generación GPU: {e}")
     
-    def draw_sierpinski_gpu(self, painter, p1, p2, p3, level):
-        """Dibuja Sierpinski con optimizaciones GPU."""
+    def leaf_color(self, level=0):
+        """Color de los triángulos según la intensidad y el modo actuales."""
+        # Generar color dinámico basado en intensidad
+        intensity = self.color_slider.value()
+        
+        # Colores vibrantes con gradientes
+        if self.gpu_mode:
+            colors = [
+                QColor(intensity, 100, 255),  # Azul-violeta
+                QColor(255, intensity, 100),  # Naranja
+                QColor(100, 255, intensity),  # Verde
+                QColor(255, 100, intensity),  # Rosa
+                QColor(intensity, 255, 100),  # Verde-amarillo
+            ]
+            return colors[level % len(colors)]
+        return QColor(intensity, int(intensity * 0.7), 0)
+    
+    def draw_sierpinski_gpu(self, painter, p1, p2, p3, level, color=None):
+        """Dibuja Sierpinski con optimizaciones GPU.
+
+        Con ``color`` no se consultan los controles, así que se puede llamar
+        desde otro hilo.
+        """
+        if color is None:
+            color = self.leaf_color()
         if level <= 0:
-            # Generar color dinámico basado en intensidad
-            intensity = self.color_slider.value()
-            
-            # Colores vibrantes con gradientes
-            if self.gpu_mode:
-                colors = [
-                    QColor(intensity, 100, 255),  # Azul-violeta
-                    QColor(255, intensity, 100),  # Naranja
-                    QColor(100, 255, intensity),  # Verde
-                    QColor(255, 100, intensity),  # Rosa
-                    QColor(intensity, 255, 100),  # Verde-amarillo
-                ]
-                color = colors[level % len(colors)]
-            else:
-                color = QColor(intensity, int(intensity * 0.7), 0)
-            
             painter.setBrush(color)
             painter.setPen(QPen(color, 1))
             
@@ -511,12 +543,17 @@ class SierpinskiGPUWindow(QMainWindow):
         mid31 = ((p3[0] + p1[0]) / 2, (p3[1] + p1[1]) / 2)
         
         # Recursión GPU-optimizada
-        self.draw_sierpinski_gpu(painter, p1, mid12, mid31, level - 1)
-        self.draw_sierpinski_gpu(painter, mid12, p2, mid23, level - 1)
-        self.draw_sierpinski_gpu(painter, mid31, mid23, p3, level - 1)
+        self.draw_sierpinski_gpu(painter, p1, mid12, mid31, level - 1, color)
+        self.draw_sierpinski_gpu(painter, mid12, p2, mid23, level - 1, color)
+        self.draw_sierpinski_gpu(painter, mid31, mid23, p3, level - 1, color)
     
     def export_fractal(self):
-        """Exporta fractal en 4K."""
+        """Exporta fractal en 4K.
+
+        La imagen se dibuja en la cola de trabajos, por subárboles: entre uno
+        y otro la exportación cede la CPU mientras se navega, muestra su
+        avance y se puede pausar o cancelar.
+        """
         try:
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "Exportar Sierpinski 4K", "sierpinski_gpu_4k.png", 
@@ -524,40 +561,73 @@ class SierpinskiGPUWindow(QMainWindow):
             )
             
             if file_path:
-                # Generar en 4K
-                image_4k = QImage(3840, 2160, QImage.Format.Format_RGB888)
-                image_4k.fill(QColor(0, 0, 17))
-                
-                painter_4k = QPainter(image_4k)
-                if self.antialiasing:
-                    painter_4k.setRenderHint(QPainter.RenderHint.Antialiasing)
-                
-                # Escalar para 4K
-                scale_4k = 3840 / 900
-                painter_4k.translate(1920 + self.offset_x * scale_4k, 
-                                    1080 + self.offset_y * scale_4k)
-                painter_4k.scale(self.zoom_level * scale_4k, self.zoom_level * scale_4k)
-                painter_4k.rotate(self.rotation)
-                
-                # Triángulo para 4K
-                size_4k = 400
-                height_4k = size_4k * math.sqrt(3) / 2
-                
-                p1_4k = (-size_4k/2, -height_4k/3)
-                p2_4k = (size_4k/2, -height_4k/3)
-                p3_4k = (0, 2*height_4k/3)
-                
+                # Los parámetros se copian aquí: el trabajo no toca los controles
+                offset_x, offset_y = self.offset_x, self.offset_y
+                zoom_level, rotation = self.zoom_level, self.rotation
+                antialiasing = self.antialiasing
+                color = self.leaf_color()
                 # Nivel alto para 4K
                 level_4k = self.level_slider.value() + 3
-                self.draw_sierpinski_gpu(painter_4k, p1_4k, p2_4k, p3_4k, level_4k)
                 
-                painter_4k.end()
-                image_4k.save(file_path)
+                def render(job):
+                    # Generar en 4K
+                    image_4k = QImage(3840, 2160, QImage.Format.Format_RGB888)
+                    image_4k.fill(QColor(0, 0, 17))
+                    
+                    painter_4k = QPainter(image_4k)
+                    if antialiasing:
+                        painter_4k.setRenderHint(QPainter.RenderHint.Antialiasing)
+                    
+                    # Escalar para 4K
+                    scale_4k = 3840 / 900
+                    painter_4k.translate(1920 + offset_x * scale_4k, 
+                                        1080 + offset_y * scale_4k)
+                    painter_4k.scale(zoom_level * scale_4k, zoom_level * scale_4k)
+                    painter_4k.rotate(rotation)
+                    
+                    # Triángulo para 4K
+                    size_4k = 400
+                    height_4k = size_4k * math.sqrt(3) / 2
+                    
+                    p1_4k = (-size_4k/2, -height_4k/3)
+                    p2_4k = (size_4k/2, -height_4k/3)
+                    p3_4k = (0, 2*height_4k/3)
+                    
+                    split = min(level_4k, EXPORT_SPLIT_LEVEL)
+                    parts = sierpinski_subtriangles(p1_4k, p2_4k, p3_4k, split)
+                    try:
+                        for index, (p1, p2, p3) in enumerate(parts):
+                            if job.checkpoint():
+                                return None
+                            self.draw_sierpinski_gpu(painter_4k, p1, p2, p3,
+                                                     level_4k - split, color)
+                            job.report(index + 1, len(parts))
+                    finally:
+                        painter_4k.end()
+                    if not image_4k.save(file_path):
+                        raise OSError(f"No se pudo guardar {file_path}")
+                    return file_path
                 
-                QMessageBox.information(self, "✅ Exportado", 
-                                      f"Sierpinski GPU exportado en 4K:\n{file_path}")
+                job = get_job_queue().submit(render, PRIORITY_EXPORT,
+                                             f"Exportando {os.path.basename(file_path)}")
+                self.job_progress.track(job, self.export_finished)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al exportar: {e}")
+    
+    def export_finished(self, job):
+        """Informa del resultado de la exportación 4K."""
+        if job.state == RenderJob.FINISHED:
+            QMessageBox.information(self, "✅ Exportado", 
+                                  f"Sierpinski GPU exportado en 4K:\n{job.result}")
+        elif job.state == RenderJob.FAILED:
+            QMessageBox.critical(self, "Error", f"Error al exportar: {job.error}")
+        else:
+            self.statusBar().showMessage("Exportación cancelada")
+    
+    def closeEvent(self, event):
+        """Cancela la exportación en curso al cerrar la ventana."""
+        self.job_progress.cancel_all()
+        super().closeEvent(event)
 
 def main():
     """Función principal."""
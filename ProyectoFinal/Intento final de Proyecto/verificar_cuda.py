@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+VERIFICACIÓN DE CUDA
+Comprueba el camino CUDA de los generadores con el simulador de numba
+
+Se ejecuta con ``NUMBA_ENABLE_CUDASIM=1`` (salvo que la variable ya esté
+definida), así que no necesita GPU. Verifica que:
+- los buffers del dispositivo se reutilizan entre cuadros del mismo tamaño,
+- la paleta solo se vuelve a subir cuando set_color_scheme la cambia,
+- la imagen de CUDA coincide con la de CPU (compute_field + colorize_field),
+- y las copias (``snapshot``) comparten los recursos del original aunque
+  rendericen a la vez desde varios hilos.
+Termina con código 1 si alguna comprobación falla.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Tiene que fijarse antes de que se importe numba
+os.environ.setdefault("NUMBA_ENABLE_CUDASIM", "1")
+
+import numpy as np
+
+
+def check_buffer_reuse(width, height):
+    """El buffer de imagen se reserva una vez por tamaño de cuadro."""
+    from fractales.generators import MandelbrotGenerator
+
+    generator = MandelbrotGenerator()
+    for _ in range(3):
+        generator.generate_fractal(width, height)
+    resources = generator._cuda_resources
+    failures = []
+    if resources.image_allocations != 1:
+        failures.append(f"{resources.image_allocations} reservas para 3 cuadros iguales")
+    generator.generate_fractal(width + 8, height)
+    generator.generate_fractal(width + 8, height)
+    if resources.image_allocations != 2:
+        failures.append(f"{resources.image_allocations} reservas tras cambiar de tamaño (2)")
+    return failures
+
+
+def check_palette_uploads(width, height):
+    """La paleta solo se sube de nuevo cuando cambia el esquema de colores."""
+    from fractales.generators import MandelbrotGenerator
+
+    generator = MandelbrotGenerator()
+    generator.generate_fractal(width, height)
+    generator.generate_fractal(width, height)
+    resources = generator._cuda_resources
+    failures = []
+    if resources.palette_uploads != 1:
+        failures.append(f"{resources.palette_uploads} subidas de paleta sin cambiarla")
+    generator.set_color_scheme(generator.current_palette_index)
+    generator.generate_fractal(width, height)
+    if resources.palette_uploads != 1:
+        failures.append("set_color_scheme con la misma paleta la vuelve a subir")
+    generator.set_color_scheme(generator.current_palette_index + 1)
+    generator.generate_fractal(width, height)
+    generator.generate_fractal(width, height)
+    if resources.palette_uploads != 2:
+        failures.append(f"{resources.palette_uploads} subidas tras cambiar de paleta (2)")
+    return failures
+
+
+def check_matches_cpu(width, height):
+    """La imagen de CUDA es la misma que la de CPU en ambos modos de color."""
+    from fractales.generators import JuliaGenerator, MandelbrotGenerator
+
+    failures = []
+    for generator_class in (MandelbrotGenerator, JuliaGenerator):
+        generator = generator_class()
+        generator.set_max_iterations(100)
+        generator.rotation = 0.3
+        for color_mode in (0, 1):
+            generator.set_color_mode(color_mode)
+            gpu = generator.generate_fractal(width, height)
+            cpu = generator.colorize_field(generator.compute_field(width, height))
+            if gpu.shape != cpu.shape:
+                failures.append(f"{generator_class.__name__} modo {color_mode}: "
+                                f"forma {gpu.shape} frente a {cpu.shape}")
+                continue
+            difference = np.abs(gpu.astype(np.int16) - cpu)
+            if difference.any():
+                failures.append(f"{generator_class.__name__} modo {color_mode}: "
+                                f"{np.count_nonzero(difference.any(axis=2))} píxeles distintos "
+                                f"(diferencia máxima {difference.max()})")
+    return failures
+
+
+def check_snapshots(width, height):
+    """Las copias comparten recursos y renderizan bien desde varios hilos."""
+    from fractales.generators import MandelbrotGenerator
+
+    generator = MandelbrotGenerator()
+    expected = generator.generate_fractal(width, height)
+    resources = generator._cuda_resources
+    snapshots = [generator.snapshot() for _ in range(4)]
+    results = [None] * len(snapshots)
+
+    def render(index):
+        results[index] = snapshots[index].generate_fractal(width, height)
+
+    threads = [threading.Thread(target=render, args=(index,)) for index in range(len(snapshots))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    failures = []
+    if any(snapshot._cuda_resources is not resources for snapshot in snapshots):
+        failures.append("las copias crean sus propios recursos")
+    if resources.image_allocations != 1 or resources.palette_uploads != 1:
+        failures.append(f"{resources.image_allocations} reservas y {resources.palette_uploads} "
+                        "subidas de paleta con 5 cuadros iguales (1 y 1)")
+    if any(result is None or not np.array_equal(result, expected) for result in results):
+        failures.append("las copias producen imágenes distintas a la del original")
+
+    # Una copia de un generador que aún no renderizó también comparte recursos
+    fresh = MandelbrotGenerator()
+    fresh.snapshot().generate_fractal(width, height)
+    if fresh._cuda_resources is None:
+        failures.append("la copia de un generador nuevo no comparte sus recursos")
+    return failures
+
+
+CHECKS = [
+    ("reutilización de buffers", check_buffer_reuse),
+    ("subidas de paleta", check_palette_uploads),
+    ("CUDA coincide con CPU", check_matches_cpu),
+    ("copias (snapshot) entre hilos", check_snapshots),
+]
+
+
+def main():
+    """Ejecuta todas las comprobaciones e informa del resultado."""
+    parser = argparse.ArgumentParser(description="Verifica el camino CUDA con el simulador")
+    parser.add_argument("--width", type=int, default=48, help="ancho de los cuadros de prueba")
+    parser.add_argument("--height", type=int, default=32, help="alto de los cuadros de prueba")
+    args = parser.parse_args()
+
+    print("🔍 VERIFICACIÓN DE CUDA")
+    print("=" * 60)
+    from fractales.generators import cuda_available
+    if not cuda_available():
+        print("❌ numba.cuda no está disponible (ni siquiera el simulador)")
+        return 1
+
+    failed = False
+    for name, check in CHECKS:
+        start = time.perf_counter()
+        try:
+            failures = check(args.width, args.height)
+        except Exception as e:
+            failures = [f"error: {e}"]
+        elapsed = time.perf_counter() - start
+        status = "❌" if failures else "✅"
+        print(f"{status} {name:<40} {elapsed * 1000:8.1f} ms")
+        for failure in failures:
+            print(f"     - {failure}")
+        failed = failed or bool(failures)
+
+    print("=" * 60)
+    print("❌ Hay regresiones en el camino CUDA" if failed else "✅ Camino CUDA correcto")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+VERIFICACIÓN DE IMPORTACIÓN
+Comprueba que importar el paquete sea rápido y no tenga efectos secundarios
+
+Cada módulo se importa en un intérprete nuevo y se verifica que:
+- no escriba nada en la salida estándar,
+- no cree ni modifique archivos o directorios,
+- no cargue módulos pesados que no necesita (numba, numba.cuda, PyQt6),
+- y, si tiene presupuesto, que tarde menos que ese tiempo.
+Termina con código 1 si alguna comprobación falla.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent
+
+# (módulo, presupuesto en segundos o None, módulos que no debe cargar)
+CHECKS = [
+    ("fractales", 0.05,
+     ("numba", "numpy", "PyQt6", "fractales.generators", "fractales.interfaces")),
+    ("fractales.generators", 0.05, ("numba", "numpy")),
+    ("fractales.interfaces", 0.05, ("PyQt6",)),
+    # Entradas de la CLI, del servidor y de los procesos de trabajo
+    ("fractales.render", None, ("PyQt6", "numba.cuda")),
+    ("fractales.server", None, ("PyQt6", "numba.cuda")),
+    ("fractales.generators.tiled_renderer", None, ("PyQt6", "numba.cuda")),
+]
+
+# Código que se ejecuta en el intérprete nuevo
+_CHILD_CODE = """
+import contextlib, io, json, os, sys, time
+
+writes = []
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+def audit(event, args):
+    if event == "open":
+        path, mode, flags = args
+        if (mode and any(c in mode for c in "wax+")) or (mode is None and flags & WRITE_FLAGS):
+            writes.append(str(path))
+    elif event in ("os.mkdir", "os.rename", "os.remove", "os.link", "shutil.rmtree"):
+        writes.append(str(args[0]))
+
+sys.addaudithook(audit)
+output = io.StringIO()
+start = time.perf_counter()
+with contextlib.redirect_stdout(output):
+    import {module}
+elapsed = time.perf_counter() - start
+# Las cachés de compilación (.pyc y numba cache=True) viven en __pycache__
+writes = sorted(set(path for path in writes if "__pycache__" not in path))
+print(json.dumps({{
+    "time": elapsed,
+    "output": output.getvalue(),
+    "writes": writes,
+    "loaded": [name for name in {forbidden!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(module, forbidden):
+    """Importa ``module`` en un intérprete nuevo y devuelve lo observado."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    code = _CHILD_CODE.format(module=module, forbidden=tuple(forbidden))
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check(module, budget, forbidden, repeat):
+    """Devuelve ``(mejor_tiempo, lista_de_fallos)`` de un módulo."""
+    runs = [measure(module, forbidden) for _ in range(repeat)]
+    best = min(run["time"] for run in runs)
+    failures = []
+    first = runs[0]
+    if first["output"]:
+        failures.append(f"escribe en la salida: {first['output'].strip()!r}")
+    if first["writes"]:
+        failures.append(f"escribe en disco: {', '.join(first['writes'])}")
+    if first["loaded"]:
+        failures.append(f"carga {', '.join(first['loaded'])}")
+    if budget is not None and best > budget:
+        failures.append(f"tarda {best * 1000:.0f} ms (máximo {budget * 1000:.0f} ms)")
+    return best, failures
+
+
+def main():
+    """Ejecuta todas las comprobaciones e informa del resultado."""
+    parser = argparse.ArgumentParser(description="Verifica el coste de importar fractales")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="importaciones por módulo; se toma la más rápida")
+    args = parser.parse_args()
+
+    print("🔍 VERIFICACIÓN DE IMPORTACIÓN")
+    print("=" * 60)
+    failed = False
+    for module, budget, forbidden in CHECKS:
+        try:
+            best, failures = check(module, budget, forbidden, max(1, args.repeat))
+        except RuntimeError as e:
+            best, failures = float("nan"), [f"error al importar: {e}"]
+        status = "❌" if failures else "✅"
+        print(f"{status} {module:<40} {best * 1000:8.1f} ms")
+        for failure in failures:
+            print(f"     - {failure}")
+        failed = failed or bool(failures)
+
+    print("=" * 60)
+    print("❌ Hay regresiones de importación" if failed else "✅ Importación rápida y sin efectos")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())